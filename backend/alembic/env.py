@@ -16,7 +16,7 @@ from app.db.base import Base
 from app.core.config import settings
 
 # Import all models to ensure they're registered with Base
-from app.models import user, session, domain_whitelist, activity_log
+from app.models import user, session, domain_whitelist, activity_dictionary, activity_log, activity_rollup, activity_counter
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,43 @@
+"""Activity keyset pagination indexes
+
+Replaces the single-column user_email and timestamp indexes on
+activity_logs with composites matching ORDER BY timestamp DESC, id DESC.
+Tables themselves are created by init_db.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 02:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_activity_logs_user_email_timestamp_id",
+        "activity_logs",
+        ["user_email", "timestamp", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_activity_logs_timestamp_id",
+        "activity_logs",
+        ["timestamp", "id"],
+        if_not_exists=True,
+    )
+    op.drop_index("ix_activity_logs_user_email", table_name="activity_logs", if_exists=True)
+    op.drop_index("ix_activity_logs_timestamp", table_name="activity_logs", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_activity_logs_timestamp", "activity_logs", ["timestamp"])
+    op.create_index("ix_activity_logs_user_email", "activity_logs", ["user_email"])
+    op.drop_index("ix_activity_logs_timestamp_id", table_name="activity_logs")
+    op.drop_index("ix_activity_logs_user_email_timestamp_id", table_name="activity_logs")
@@ -0,0 +1,91 @@
+"""Time-sortable activity IDs
+
+Re-keys legacy ``act_{unix}_{hex}`` activity IDs to the time-sortable
+format (derived from each row's timestamp), then replaces the
+(timestamp, id) indexes: ordering by the primary key alone is now
+ordering by time.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 03:00:00
+
+"""
+import os
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+PREFIX = "act_"
+ID_LENGTH = len(PREFIX) + 26
+
+# Frozen copy of the app's ID encoding as of this revision
+ID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def id_for_time(when: datetime) -> str:
+    """Build a time-sortable ID: 48 bits of Unix milliseconds, 80 random bits."""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    value = (int(when.timestamp() * 1000) << 80) | int.from_bytes(os.urandom(10), "big")
+    chars = []
+    for _ in range(26):
+        chars.append(ID_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    activity_logs = sa.table(
+        "activity_logs",
+        sa.column("id", sa.String),
+        sa.column("timestamp", sa.DateTime(timezone=True)),
+    )
+
+    # Re-key legacy rows in batches; new IDs never match the legacy length
+    while True:
+        rows = bind.execute(
+            sa.select(activity_logs.c.id, activity_logs.c.timestamp)
+            .where(sa.func.length(activity_logs.c.id) != ID_LENGTH)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            activity_logs.update()
+            .where(activity_logs.c.id == sa.bindparam("old_id"))
+            .values(id=sa.bindparam("new_id")),
+            [{"old_id": row.id, "new_id": PREFIX + id_for_time(row.timestamp)} for row in rows],
+        )
+
+    op.create_index(
+        "ix_activity_logs_user_email_id",
+        "activity_logs",
+        ["user_email", "id"],
+        if_not_exists=True,
+    )
+    op.drop_index("ix_activity_logs_user_email_timestamp_id", table_name="activity_logs", if_exists=True)
+    op.drop_index("ix_activity_logs_timestamp_id", table_name="activity_logs", if_exists=True)
+    # Redundant with the primary key
+    op.drop_index("ix_activity_logs_id", table_name="activity_logs", if_exists=True)
+
+
+def downgrade() -> None:
+    # Re-keyed IDs are kept; they remain valid primary keys
+    op.create_index("ix_activity_logs_id", "activity_logs", ["id"])
+    op.create_index("ix_activity_logs_timestamp_id", "activity_logs", ["timestamp", "id"])
+    op.create_index(
+        "ix_activity_logs_user_email_timestamp_id",
+        "activity_logs",
+        ["user_email", "timestamp", "id"],
+    )
+    op.drop_index("ix_activity_logs_user_email_id", table_name="activity_logs")
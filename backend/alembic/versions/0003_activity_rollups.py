@@ -0,0 +1,51 @@
+"""Activity rollup tables
+
+Hourly and daily (bucket, app_id, action, user_domain) counts, maintained
+at ingest. Existing history can be backfilled with
+POST /api/admin/analytics/rebuild.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 04:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "activity_rollups",
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("app_id", sa.String(), nullable=False),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("user_domain", sa.String(), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("distinct_users", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("period", "bucket", "app_id", "action", "user_domain"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "activity_rollup_users",
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("app_id", sa.String(), nullable=False),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("user_domain", sa.String(), nullable=False),
+        sa.Column("user_email", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("period", "bucket", "app_id", "action", "user_domain", "user_email"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("activity_rollup_users")
+    op.drop_table("activity_rollups")
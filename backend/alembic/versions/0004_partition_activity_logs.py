@@ -0,0 +1,139 @@
+"""Partition activity_logs by month (PostgreSQL)
+
+Rebuilds activity_logs as a table range-partitioned on id, one partition
+per month from the oldest row through the partitions the app creates
+ahead of time, and copies existing rows over. SQLite is left as is.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 05:00:00
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of the app's settings and helpers as of this revision
+PARTITIONS_AHEAD = 3
+ID_PREFIX = "act_"
+ID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+OLD_INDEXES = (
+    "ix_activity_logs_user_id",
+    "ix_activity_logs_user_domain",
+    "ix_activity_logs_app_id",
+    "ix_activity_logs_action",
+    "ix_activity_logs_user_email_id",
+)
+
+
+def month_start(value: datetime) -> datetime:
+    """Get the (naive UTC) start of the month containing ``value``."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    """Shift a month start by ``count`` months."""
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _lower_bound(month: datetime) -> str:
+    """Get the smallest activity ID generated at the start of ``month``."""
+    value = int(month.replace(tzinfo=timezone.utc).timestamp() * 1000) << 80
+    chars = []
+    for _ in range(26):
+        chars.append(ID_ALPHABET[value & 31])
+        value >>= 5
+    return ID_PREFIX + "".join(reversed(chars))
+
+
+def partition_ddl(month: datetime) -> str:
+    """Get the CREATE statement for the partition holding ``month``."""
+    name = f"activity_logs_y{month.year:04d}m{month.month:02d}"
+    lower, upper = _lower_bound(month), _lower_bound(add_months(month, 1))
+    return (
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF activity_logs "
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+
+
+def _create_table(partitioned: bool) -> None:
+    kwargs = {"postgresql_partition_by": "RANGE (id)"} if partitioned else {}
+    op.create_table(
+        "activity_logs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("user_email", sa.String(), nullable=False),
+        sa.Column("user_role", sa.String(), nullable=False),
+        sa.Column("user_domain", sa.String(), nullable=False),
+        sa.Column("app_id", sa.String(), nullable=False),
+        sa.Column("app_name", sa.String(), nullable=False),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("action_metadata", sa.JSON(), nullable=True),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+        **kwargs,
+    )
+    op.create_index("ix_activity_logs_user_id", "activity_logs", ["user_id"])
+    op.create_index("ix_activity_logs_user_domain", "activity_logs", ["user_domain"])
+    op.create_index("ix_activity_logs_app_id", "activity_logs", ["app_id"])
+    op.create_index("ix_activity_logs_action", "activity_logs", ["action"])
+    op.create_index("ix_activity_logs_user_email_id", "activity_logs", ["user_email", "id"])
+
+
+def _swap_table() -> None:
+    """Rename the current table and its indexes out of the way."""
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_old")
+    op.execute("ALTER TABLE activity_logs_old RENAME CONSTRAINT activity_logs_pkey TO activity_logs_old_pkey")
+    for index in OLD_INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_old")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    relkind = bind.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE relname = 'activity_logs'")
+    ).scalar()
+    if relkind == "p":
+        return
+
+    _swap_table()
+    _create_table(partitioned=True)
+
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM activity_logs_old")).scalar()
+    current = month_start(datetime.utcnow())
+    month = month_start(oldest) if oldest else current
+    last = add_months(current, PARTITIONS_AHEAD)
+    while month <= last:
+        op.execute(partition_ddl(month))
+        month = add_months(month, 1)
+
+    op.execute("INSERT INTO activity_logs SELECT * FROM activity_logs_old")
+    op.execute("DROP TABLE activity_logs_old")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    _swap_table()
+    _create_table(partitioned=False)
+    op.execute("INSERT INTO activity_logs SELECT * FROM activity_logs_old")
+    op.execute("DROP TABLE activity_logs_old CASCADE")
@@ -0,0 +1,123 @@
+"""Dictionary-encode activity apps, actions and domains
+
+Moves app_id/app_name, action and user_domain out of activity_logs into
+lookup tables referenced by small-integer keys.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 06:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+SmallKey = sa.SmallInteger().with_variant(sa.Integer(), "sqlite")
+
+KEYS = (
+    ("app_key", "activity_apps", "ix_activity_logs_app_key"),
+    ("action_key", "activity_actions", "ix_activity_logs_action_key"),
+    ("domain_key", "activity_domains", "ix_activity_logs_domain_key"),
+)
+
+
+def upgrade() -> None:
+    # init_db's create_all may have created the lookup tables already
+    op.create_table(
+        "activity_apps",
+        sa.Column("id", SmallKey, primary_key=True, autoincrement=True),
+        sa.Column("app_id", sa.String(), nullable=False),
+        sa.Column("app_name", sa.String(), nullable=False),
+        sa.UniqueConstraint("app_id", "app_name", name="uq_activity_apps_app_id_app_name"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "activity_actions",
+        sa.Column("id", SmallKey, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "activity_domains",
+        sa.Column("id", SmallKey, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+        if_not_exists=True,
+    )
+
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("activity_logs")}
+    if "app_key" in columns:
+        return
+
+    op.execute(
+        "INSERT INTO activity_apps (app_id, app_name) "
+        "SELECT DISTINCT app_id, app_name FROM activity_logs"
+    )
+    op.execute("INSERT INTO activity_actions (name) SELECT DISTINCT action FROM activity_logs")
+    op.execute("INSERT INTO activity_domains (name) SELECT DISTINCT user_domain FROM activity_logs")
+
+    for column, _, _ in KEYS:
+        op.add_column("activity_logs", sa.Column(column, SmallKey, nullable=True))
+
+    op.execute(
+        "UPDATE activity_logs SET "
+        "app_key = (SELECT a.id FROM activity_apps a "
+        "WHERE a.app_id = activity_logs.app_id AND a.app_name = activity_logs.app_name), "
+        "action_key = (SELECT a.id FROM activity_actions a WHERE a.name = activity_logs.action), "
+        "domain_key = (SELECT d.id FROM activity_domains d WHERE d.name = activity_logs.user_domain)"
+    )
+
+    op.drop_index("ix_activity_logs_app_id", table_name="activity_logs", if_exists=True)
+    op.drop_index("ix_activity_logs_action", table_name="activity_logs", if_exists=True)
+    op.drop_index("ix_activity_logs_user_domain", table_name="activity_logs", if_exists=True)
+
+    with op.batch_alter_table("activity_logs") as batch_op:
+        batch_op.drop_column("app_id")
+        batch_op.drop_column("app_name")
+        batch_op.drop_column("action")
+        batch_op.drop_column("user_domain")
+        for column, table, _ in KEYS:
+            batch_op.alter_column(column, existing_type=SmallKey, nullable=False)
+            batch_op.create_foreign_key(f"fk_activity_logs_{column}", table, [column], ["id"])
+
+    for column, _, index in KEYS:
+        op.create_index(index, "activity_logs", [column])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("activity_logs") as batch_op:
+        batch_op.add_column(sa.Column("user_domain", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("app_id", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("app_name", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("action", sa.String(), nullable=True))
+
+    op.execute(
+        "UPDATE activity_logs SET "
+        "app_id = (SELECT a.app_id FROM activity_apps a WHERE a.id = activity_logs.app_key), "
+        "app_name = (SELECT a.app_name FROM activity_apps a WHERE a.id = activity_logs.app_key), "
+        "action = (SELECT a.name FROM activity_actions a WHERE a.id = activity_logs.action_key), "
+        "user_domain = (SELECT d.name FROM activity_domains d WHERE d.id = activity_logs.domain_key)"
+    )
+
+    for _, _, index in KEYS:
+        op.drop_index(index, table_name="activity_logs")
+
+    with op.batch_alter_table("activity_logs") as batch_op:
+        for column, _, _ in KEYS:
+            batch_op.drop_constraint(f"fk_activity_logs_{column}", type_="foreignkey")
+            batch_op.drop_column(column)
+        for column in ("user_domain", "app_id", "app_name", "action"):
+            batch_op.alter_column(column, existing_type=sa.String(), nullable=False)
+
+    op.create_index("ix_activity_logs_user_domain", "activity_logs", ["user_domain"])
+    op.create_index("ix_activity_logs_app_id", "activity_logs", ["app_id"])
+    op.create_index("ix_activity_logs_action", "activity_logs", ["action"])
+
+    op.drop_table("activity_domains")
+    op.drop_table("activity_actions")
+    op.drop_table("activity_apps")
@@ -0,0 +1,45 @@
+"""Composite activity filter indexes
+
+Replaces the single-column lookup key indexes with (key, id) composites
+and adds (app_key, action_key, id), so filtered "latest N" and time range
+queries read rows in order from one index.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 07:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_activity_logs_app_key_action_key_id", ["app_key", "action_key", "id"]),
+    ("ix_activity_logs_app_key_id", ["app_key", "id"]),
+    ("ix_activity_logs_action_key_id", ["action_key", "id"]),
+    ("ix_activity_logs_domain_key_id", ["domain_key", "id"]),
+)
+SINGLE_COLUMN_INDEXES = (
+    ("ix_activity_logs_app_key", "app_key"),
+    ("ix_activity_logs_action_key", "action_key"),
+    ("ix_activity_logs_domain_key", "domain_key"),
+)
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES:
+        op.create_index(name, "activity_logs", columns, if_not_exists=True)
+    for name, _ in SINGLE_COLUMN_INDEXES:
+        op.drop_index(name, table_name="activity_logs", if_exists=True)
+
+
+def downgrade() -> None:
+    for name, column in SINGLE_COLUMN_INDEXES:
+        op.create_index(name, "activity_logs", [column])
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name="activity_logs")
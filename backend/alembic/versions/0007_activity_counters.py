@@ -0,0 +1,49 @@
+"""Maintained activity counters
+
+Per-scope row counts (overall, per user email, app, action and domain key)
+used for estimated totals on SQLite, seeded from existing activity_logs.
+PostgreSQL estimates from planner statistics and leaves the table empty.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+COUNTER_COLUMNS = ("user_email", "app_key", "action_key", "domain_key")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "activity_counters",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("value", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.PrimaryKeyConstraint("scope"),
+        if_not_exists=True,
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        return
+
+    op.execute(
+        "INSERT INTO activity_counters (scope, value) "
+        "SELECT 'all', count(*) FROM activity_logs"
+    )
+    for column in COUNTER_COLUMNS:
+        op.execute(
+            "INSERT INTO activity_counters (scope, value) "
+            f"SELECT '{column}:' || {column}, count(*) FROM activity_logs GROUP BY {column}"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("activity_counters")
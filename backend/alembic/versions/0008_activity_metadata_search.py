@@ -0,0 +1,89 @@
+"""Searchable activity metadata
+
+PostgreSQL: action_metadata becomes JSONB with a GIN (jsonb_path_ops)
+index for key/value containment and a GIN index over its keys and values
+as a text search vector.
+
+SQLite: an FTS5 shadow table of metadata keys and values, maintained by
+triggers on activity_logs and backfilled from existing rows.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 11:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of the model's search DDL as of this revision
+METADATA_TSVECTOR = (
+    "jsonb_to_tsvector('simple', action_metadata, "
+    "'[\"key\", \"string\", \"numeric\", \"boolean\"]')"
+)
+
+METADATA_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS activity_metadata_fts "
+    "USING fts5(activity_id UNINDEXED, id_token, body)",
+    """CREATE TRIGGER IF NOT EXISTS activity_logs_metadata_fts_insert AFTER INSERT ON activity_logs BEGIN
+    INSERT INTO activity_metadata_fts (activity_id, id_token, body)
+    SELECT new.id, substr(new.id, instr(new.id, '_') + 1), group_concat(leaf.key || ' ' || CASE leaf.type WHEN 'true' THEN 'true' WHEN 'false' THEN 'false' WHEN 'null' THEN 'null' ELSE leaf.value END, ' ')
+    FROM json_tree(new.action_metadata) AS leaf WHERE leaf.type NOT IN ('object', 'array')
+    HAVING count(*) > 0;
+END""",
+    """CREATE TRIGGER IF NOT EXISTS activity_logs_metadata_fts_delete AFTER DELETE ON activity_logs BEGIN
+    DELETE FROM activity_metadata_fts WHERE rowid IN (
+        SELECT rowid FROM activity_metadata_fts
+        WHERE activity_metadata_fts MATCH 'id_token:' || substr(old.id, instr(old.id, '_') + 1)
+    );
+END""",
+)
+
+METADATA_FTS_BACKFILL = """
+    INSERT INTO activity_metadata_fts (activity_id, id_token, body)
+    SELECT log.id, substr(log.id, instr(log.id, '_') + 1), group_concat(leaf.key || ' ' || CASE leaf.type WHEN 'true' THEN 'true' WHEN 'false' THEN 'false' WHEN 'null' THEN 'null' ELSE leaf.value END, ' ')
+    FROM activity_logs AS log, json_tree(log.action_metadata) AS leaf WHERE leaf.type NOT IN ('object', 'array')
+    GROUP BY log.id
+"""
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE activity_logs ALTER COLUMN action_metadata "
+            "TYPE jsonb USING action_metadata::jsonb"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_activity_logs_action_metadata "
+            "ON activity_logs USING gin (action_metadata jsonb_path_ops)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_activity_logs_action_metadata_text "
+            f"ON activity_logs USING gin ({METADATA_TSVECTOR})"
+        )
+        return
+
+    for statement in METADATA_FTS_DDL:
+        op.execute(statement)
+    op.execute("DELETE FROM activity_metadata_fts")
+    op.execute(METADATA_FTS_BACKFILL)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_activity_logs_action_metadata_text")
+        op.execute("DROP INDEX IF EXISTS ix_activity_logs_action_metadata")
+        op.execute(
+            "ALTER TABLE activity_logs ALTER COLUMN action_metadata "
+            "TYPE json USING action_metadata::json"
+        )
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS activity_logs_metadata_fts_insert")
+    op.execute("DROP TRIGGER IF EXISTS activity_logs_metadata_fts_delete")
+    op.execute("DROP TABLE IF EXISTS activity_metadata_fts")
@@ -0,0 +1,29 @@
+"""Admin user listing indexes
+
+(last_login, id) serves the listing order and its keyset cursor;
+lower(name) serves name prefix search (email already has a unique index).
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_last_login_id", "users", ["last_login", "id"], if_not_exists=True)
+    op.create_index("ix_users_name_lower", "users", [sa.text("lower(name)")], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_name_lower", table_name="users")
+    op.drop_index("ix_users_last_login_id", table_name="users")
@@ -0,0 +1,28 @@
+"""Sessions (user_id, expires_at) index
+
+Lets a user's unexpired sessions be read (or aggregated) with one range
+scan; replaces the single-column user_id index it prefixes.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 13:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_sessions_user_id_expires_at", "sessions", ["user_id", "expires_at"], if_not_exists=True)
+    op.drop_index("ix_sessions_user_id", table_name="sessions", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_sessions_user_id", "sessions", ["user_id"])
+    op.drop_index("ix_sessions_user_id_expires_at", table_name="sessions")
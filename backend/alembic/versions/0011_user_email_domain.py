@@ -0,0 +1,40 @@
+"""Persisted user email domain and maintained domain user counts
+
+Adds an indexed users.email_domain (backfilled from email) and recounts
+domain_whitelist.user_count, which the application now keeps in step with
+users instead of counting on every read.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("email_domain", sa.String(), nullable=True))
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("UPDATE users SET email_domain = lower(split_part(email, '@', 2)) WHERE email LIKE '%@%'")
+    else:
+        op.execute("UPDATE users SET email_domain = lower(substr(email, instr(email, '@') + 1)) WHERE email LIKE '%@%'")
+
+    op.create_index("ix_users_email_domain", "users", ["email_domain"])
+    op.execute(
+        "UPDATE domain_whitelist SET user_count = "
+        "(SELECT count(*) FROM users WHERE users.email_domain = domain_whitelist.domain)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_domain", table_name="users")
+    op.drop_column("users", "email_domain")
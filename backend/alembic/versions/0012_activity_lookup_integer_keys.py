@@ -0,0 +1,40 @@
+"""Widen activity lookup keys to INTEGER
+
+Apps, actions and domains come from clients; SMALLINT keys (32767 values)
+could be exhausted, after which no new activity could be recorded. SQLite
+already stores them as INTEGER.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 16:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+TABLES = ("activity_apps", "activity_actions", "activity_domains")
+KEYS = ("app_key", "action_key", "domain_key")
+
+
+def _alter(column_type: str) -> None:
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id TYPE {column_type}")
+        op.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq AS {column_type}")
+    for column in KEYS:
+        op.execute(f"ALTER TABLE activity_logs ALTER COLUMN {column} TYPE {column_type}")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        _alter("integer")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        _alter("smallint")
@@ -2,132 +2,285 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, and_, func
-from typing import Optional
+from sqlalchemy import select, desc, false
+from typing import Literal, Optional, List, Tuple
 from datetime import datetime
-import secrets
 
 from ...db.base import get_db
-from ...models import ActivityLog, UserRole
+from ...core.config import settings
+from ...core.ids import activity_ids
+from ...models import ActivityLog
 from ...schemas.activity import (
     TrackActivityRequest,
+    TrackActivityBatchRequest,
     ActivityResponse,
+    ActivityBatchResponse,
     ActivitiesListResponse,
     ActivityInfo
 )
 from ..auth.session import get_current_session
-from ...models import Session as SessionModel
+from ...services.principal import SessionPrincipal
+from ...services.activity_ingest import activity_ingestor, IngestQueueFull
+from ...services.activity_dictionary import activity_dictionary
+from ...services.activity_query import ActivityQuery
+from ...services.activity_search import MetadataSearch
+from ...services.activity_counts import activity_counts
+from ...services.activity_rollups import to_utc
+from ...services.recent_activity import recent_activity
+from ...services.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
 
+def _activity_row(
+    session: SessionPrincipal,
+    activity_data: TrackActivityRequest,
+    timestamp: datetime
+) -> dict:
+    """Build an activity_logs row for the current user."""
+    return {
+        "id": activity_ids.new(timestamp),
+        "user_id": session.user_id,
+        "user_email": session.email,
+        "user_role": session.role.value,
+        "user_domain": session.domain,
+        "app_id": activity_data.appId,
+        "app_name": activity_data.appName,
+        "action": activity_data.action,
+        "action_metadata": activity_data.metadata or {},
+        "timestamp": timestamp,
+    }
+
+
+async def _submit_activities(rows: List[dict], events: List[TrackActivityRequest]) -> List[dict]:
+    """Queue rows for writing (mapping a full queue to 429) and add new ones
+    to the recent-activity buffers.
+
+    Returns the row recording each event (see ActivityIngestor.submit).
+    """
+    try:
+        recorded = await activity_ingestor.submit(rows, [event.idempotencyKey for event in events])
+    except IngestQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Activity queue is full. Please try again later.",
+            headers={"Retry-After": str(settings.ACTIVITY_RETRY_AFTER)}
+        )
+    recent_activity.record([row for row, result in zip(rows, recorded) if result is row])
+    return recorded
+
+
 @router.post("/track", response_model=ActivityResponse)
 async def track_activity(
     activity_data: TrackActivityRequest,
-    session: SessionModel = Depends(get_current_session),
-    db: AsyncSession = Depends(get_db)
+    session: SessionPrincipal = Depends(get_current_session)
 ):
     """
     Track user activity in an application.
 
-    Requires authenticated session.
+    Requires authenticated session. Events are queued and written in
+    batches; returns 429 with Retry-After when the queue is full. A repeat
+    within ACTIVITY_COALESCE_WINDOW or a retried idempotencyKey returns the
+    activity that already records it.
     """
-    # Generate activity ID
-    activity_id = f"act_{int(datetime.utcnow().timestamp())}_{secrets.token_hex(4)}"
-
-    # Create activity log
-    activity = ActivityLog(
-        id=activity_id,
-        user_id=session.user.id,
-        user_email=session.user.email,
-        user_role=session.user.role.value,
-        user_domain=session.user.domain,
-        app_id=activity_data.appId,
-        app_name=activity_data.appName,
-        action=activity_data.action,
-        action_metadata=activity_data.metadata or {},
-        timestamp=datetime.utcnow()
-    )
-
-    db.add(activity)
-    await db.commit()
+    row = _activity_row(session, activity_data, datetime.utcnow())
+    activity, = await _submit_activities([row], [activity_data])
 
     return ActivityResponse(
         success=True,
         activity={
-            "id": activity.id,
-            "timestamp": activity.timestamp.isoformat()
+            "id": activity["id"],
+            "timestamp": activity["timestamp"].isoformat()
         }
     )
 
 
+@router.post("/track/batch", response_model=ActivityBatchResponse)
+async def track_activity_batch(
+    batch_data: TrackActivityBatchRequest,
+    session: SessionPrincipal = Depends(get_current_session)
+):
+    """
+    Track several user activities in one call.
+
+    Requires authenticated session. The session is validated once and all
+    events are written together in a single INSERT. Returns IDs in the
+    order the events were sent; coalesced or retried events share the ID of
+    the activity that records them.
+    """
+    timestamp = datetime.utcnow()
+    rows = [
+        _activity_row(session, activity_data, timestamp)
+        for activity_data in batch_data.events
+    ]
+    activities = await _submit_activities(rows, batch_data.events)
+
+    return ActivityBatchResponse(
+        success=True,
+        activities=[
+            {
+                "id": activity["id"],
+                "timestamp": activity["timestamp"].isoformat()
+            }
+            for activity in activities
+        ]
+    )
+
+
 @router.get("/track", response_model=ActivitiesListResponse)
 async def get_activities(
     email: Optional[str] = Query(None, description="Filter by user email (admin only)"),
+    app_id: Optional[str] = Query(None, description="Filter by application ID"),
+    action: Optional[str] = Query(None, description="Filter by action"),
+    user_domain: Optional[str] = Query(None, description="Filter by user domain"),
+    start: Optional[datetime] = Query(None, alias="from", description="Only activities at or after this time"),
+    end: Optional[datetime] = Query(None, alias="to", description="Only activities before this time"),
+    meta: Optional[List[str]] = Query(
+        None, description="Metadata filter as key:value (dotted keys reach into nested objects); repeatable"
+    ),
+    q: Optional[str] = Query(None, max_length=200, description="Free-text search over metadata keys and values"),
     limit: int = Query(100, ge=1, le=1000, description="Number of activities to return"),
-    session: SessionModel = Depends(get_current_session),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (nextCursor/prevCursor)"),
+    include_total: bool = Query(False, description="Also count all matching activities"),
+    count_mode: Optional[Literal["exact", "cached", "estimated"]] = Query(
+        None, description="How to count the total (default ACTIVITY_COUNT_MODE)"
+    ),
+    session: SessionPrincipal = Depends(get_current_session),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get activity logs.
+    Get activity logs, most recent first, with keyset pagination.
 
     - Users can see their own activities
     - Admins can see all activities or filter by email
+    - Filter by app_id, action, user_domain and from/to; each filter set is
+      served by a matching index (see services/activity_query.py)
+    - Search metadata with meta=key:value and q=free text (see
+      services/activity_search.py)
+    - Pass nextCursor/prevCursor back as `cursor` to page; every page costs
+      the same as the first
+    - The latest page without other filters (limit up to
+      ACTIVITY_RECENT_SIZE) is served from in-memory buffers
+    - The total is only counted when include_total is set, exactly, from a
+      short-lived cache or estimated (count_mode); totalMode says which
     """
     # Check permissions for viewing other users' activities
-    if email and email != session.user.email and session.user.role != UserRole.ADMIN:
+    if email and email != session.email and not session.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Unauthorized to view other users' activities"
         )
 
-    # Build query
-    query = select(ActivityLog)
+    # Build filters: admin can see all or filter by email, non-admin only their own
+    scope_email = email if session.is_admin else session.email
+    search = MetadataSearch.parse(meta, q)
+    activity_query = await ActivityQuery.build(
+        db,
+        user_email=scope_email,
+        app_id=app_id,
+        action=action,
+        user_domain=user_domain,
+        start=to_utc(start) if start else None,
+        end=to_utc(end) if end else None,
+        search=search
+    )
+    # Unknown app, action or domain: nothing can match
+    filters = activity_query.where() if activity_query else [false()]
 
-    # Apply filters
-    if session.user.role == UserRole.ADMIN:
-        # Admin can see all or filter by email
-        if email:
-            query = query.where(ActivityLog.user_email == email)
+    # Latest page with no other filters: serve from the recent-activity buffers
+    recent = None
+    if not cursor and activity_query and not (app_id or action or user_domain or start or end or search):
+        recent = await recent_activity.latest(db, scope_email, limit)
+
+    if recent is not None:
+        records, has_more = recent
+        activities_list = [ActivityInfo(**record) for record in records]
+        prev_cursor = None
+        next_cursor = _activity_cursor(records[-1]["id"], "n") if records and has_more else None
     else:
-        # Non-admin can only see their own
-        query = query.where(ActivityLog.user_email == session.user.email)
+        activities_list, next_cursor, prev_cursor = await _query_page(db, filters, cursor, limit)
+
+    # Count total activities for this filter (opt-in)
+    total_count = total_mode = None
+    if include_total:
+        if activity_query is None:
+            total_count, total_mode = 0, "exact"
+        else:
+            total_count, total_mode = await activity_counts.count(db, activity_query, count_mode)
+
+    return ActivitiesListResponse(
+        activities=activities_list,
+        total=total_count,
+        totalMode=total_mode,
+        user=email or ("all" if session.is_admin and not email else session.email),
+        nextCursor=next_cursor,
+        prevCursor=prev_cursor
+    )
 
-    # Order by timestamp (most recent first) and apply limit
-    query = query.order_by(desc(ActivityLog.timestamp)).limit(limit)
 
-    # Execute query
-    result = await db.execute(query)
-    activities = result.scalars().all()
+def _activity_cursor(activity_id: str, direction: str) -> str:
+    """Build a cursor pointing at an activity's position."""
+    return encode_cursor({"i": activity_id, "d": direction})
 
-    # Count total activities for this filter
-    count_query = select(func.count(ActivityLog.id))
-    if session.user.role == UserRole.ADMIN and email:
-        count_query = count_query.where(ActivityLog.user_email == email)
-    elif session.user.role != UserRole.ADMIN:
-        count_query = count_query.where(ActivityLog.user_email == session.user.email)
 
-    count_result = await db.execute(count_query)
-    total_count = count_result.scalar() or 0
+async def _query_page(
+    db: AsyncSession,
+    filters: list,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[ActivityInfo], Optional[str], Optional[str]]:
+    """Get a page of activities from the database, with its cursors."""
+    query = select(ActivityLog).where(*filters)
 
-    # Build response
-    activities_list = [
-        ActivityInfo(
+    # IDs sort by creation time, so seek on the primary key instead of offsetting
+    backwards = False
+    if cursor:
+        payload = decode_cursor(cursor)
+        key = payload.get("i")
+        if not isinstance(key, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        backwards = payload.get("d") == "p"
+        query = query.where(ActivityLog.id > key if backwards else ActivityLog.id < key)
+
+    if backwards:
+        query = query.order_by(ActivityLog.id)
+    else:
+        query = query.order_by(desc(ActivityLog.id))
+
+    # Fetch one extra row to know if there is another page
+    result = await db.execute(query.limit(limit + 1))
+    activities = list(result.scalars().all())
+    has_more = len(activities) > limit
+    activities = activities[:limit]
+    if backwards:
+        activities.reverse()
+
+    # Build cursors
+    next_cursor = prev_cursor = None
+    if activities:
+        if has_more or backwards:
+            next_cursor = _activity_cursor(activities[-1].id, "n")
+        if (has_more and backwards) or (cursor and not backwards):
+            prev_cursor = _activity_cursor(activities[0].id, "p")
+
+    # Build response, mapping lookup keys back to names
+    await activity_dictionary.load(db, activities)
+    activities_list = []
+    for activity in activities:
+        names = activity_dictionary.names(activity)
+        activities_list.append(ActivityInfo(
             id=activity.id,
             userEmail=activity.user_email,
-            appId=activity.app_id,
-            appName=activity.app_name,
-            action=activity.action,
+            appId=names["app_id"],
+            appName=names["app_name"],
+            action=names["action"],
             metadata=activity.action_metadata or {},
             timestamp=activity.timestamp,
             userRole=activity.user_role,
-            userDomain=activity.user_domain
-        )
-        for activity in activities
-    ]
+            userDomain=names["user_domain"]
+        ))
 
-    return ActivitiesListResponse(
-        activities=activities_list,
-        total=total_count,
-        user=email or ("all" if session.user.role == UserRole.ADMIN and not email else session.user.email)
-    )
\ No newline at end of file
+    return activities_list, next_cursor, prev_cursor
@@ -4,10 +4,18 @@ from fastapi import APIRouter
 
 from .users import router as users_router
 from .domains import router as domains_router
+from .metrics import router as metrics_router
+from .analytics import router as analytics_router
+from .export import router as export_router
+from .stream import router as stream_router
 
 # Create admin router
 admin_router = APIRouter(prefix="/admin", tags=["Admin"])
 
 # Include all admin routes
 admin_router.include_router(users_router)
-admin_router.include_router(domains_router)
\ No newline at end of file
+admin_router.include_router(domains_router)
+admin_router.include_router(metrics_router)
+admin_router.include_router(analytics_router)
+admin_router.include_router(export_router)
+admin_router.include_router(stream_router)
\ No newline at end of file
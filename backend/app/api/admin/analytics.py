@@ -0,0 +1,127 @@
+"""Admin activity analytics endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional
+from datetime import datetime, timedelta
+
+from ...db.base import get_db
+from ...models import ActivityRollup
+from ...schemas.admin import (
+    AnalyticsResponse,
+    AnalyticsBucket,
+    RebuildRollupsRequest,
+    RebuildRollupsResponse
+)
+from ...services.activity_rollups import PERIODS, bucket_start, to_utc, rebuild_rollups
+from .users import require_admin
+from ...services.principal import SessionPrincipal
+
+router = APIRouter()
+
+# Default lookback when no start is given
+DEFAULT_RANGE = {"hour": timedelta(hours=48), "day": timedelta(days=30)}
+
+
+@router.get("/analytics", response_model=AnalyticsResponse)
+async def get_analytics(
+    period: str = Query("day", description="Bucket size: hour or day"),
+    start: Optional[datetime] = Query(None, alias="from", description="Start of range (default: 30 days / 48 hours ago)"),
+    end: Optional[datetime] = Query(None, alias="to", description="End of range, exclusive (default: now)"),
+    app_id: Optional[str] = Query(None, description="Filter by application ID"),
+    action: Optional[str] = Query(None, description="Filter by action"),
+    domain: Optional[str] = Query(None, description="Filter by user domain"),
+    db: AsyncSession = Depends(get_db),
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Get event and distinct-user counts per bucket, app, action and domain.
+
+    Admin only endpoint. Served from pre-aggregated rollups, so the cost
+    depends on the number of buckets, not events. Distinct users are exact
+    per bucket and must not be summed across buckets.
+    """
+    if period not in PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid period. Must be one of: {', '.join(PERIODS)}"
+        )
+
+    end = to_utc(end) if end else datetime.utcnow()
+    start = bucket_start(start if start else end - DEFAULT_RANGE[period], period)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be before 'to'"
+        )
+
+    filters = [
+        ActivityRollup.period == period,
+        ActivityRollup.bucket >= start,
+        ActivityRollup.bucket < end,
+    ]
+    if app_id:
+        filters.append(ActivityRollup.app_id == app_id)
+    if action:
+        filters.append(ActivityRollup.action == action)
+    if domain:
+        filters.append(ActivityRollup.user_domain == domain)
+
+    result = await db.execute(
+        select(ActivityRollup).where(*filters).order_by(
+            ActivityRollup.bucket,
+            ActivityRollup.app_id,
+            ActivityRollup.action,
+            ActivityRollup.user_domain
+        )
+    )
+    rollups = result.scalars().all()
+
+    buckets = [
+        AnalyticsBucket(
+            bucket=rollup.bucket,
+            appId=rollup.app_id,
+            action=rollup.action,
+            userDomain=rollup.user_domain,
+            events=rollup.event_count,
+            distinctUsers=rollup.distinct_users
+        )
+        for rollup in rollups
+    ]
+
+    return AnalyticsResponse(
+        period=period,
+        from_=start,
+        to=end,
+        buckets=buckets,
+        totalEvents=sum(bucket.events for bucket in buckets)
+    )
+
+
+@router.post("/analytics/rebuild", response_model=RebuildRollupsResponse)
+async def rebuild_analytics(
+    request: RebuildRollupsRequest,
+    db: AsyncSession = Depends(get_db),
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Recompute rollups for a time range from the raw activity logs.
+
+    Admin only endpoint. The range is widened to whole UTC days.
+    """
+    start, end = to_utc(request.from_), to_utc(request.to)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be before 'to'"
+        )
+
+    rebuilt = await rebuild_rollups(db, start, end)
+    await db.commit()
+
+    return RebuildRollupsResponse(
+        from_=rebuilt["from"],
+        to=rebuilt["to"],
+        events=rebuilt["events"]
+    )
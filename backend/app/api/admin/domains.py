@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, delete, func
 from typing import List
 from datetime import datetime
 
@@ -13,10 +13,15 @@ from ...schemas.admin import (
     DomainInfo,
     AddDomainRequest,
     AddDomainResponse,
-    RemoveDomainRequest
+    RemoveDomainRequest,
+    BulkAddDomainsRequest,
+    BulkRemoveDomainsRequest,
+    BulkItemResult,
+    BulkOperationResponse
 )
-from .users import require_admin
-from ...models import Session as SessionModel
+from .users import require_admin, bulk_response
+from ...services.principal import SessionPrincipal
+from ...services.domain_counts import domain_count_reconciler, domain_user_count
 
 router = APIRouter()
 
@@ -24,35 +29,27 @@ router = APIRouter()
 @router.get("/domains", response_model=DomainsListResponse)
 async def get_domains(
     db: AsyncSession = Depends(get_db),
-    admin_session: SessionModel = Depends(require_admin)
+    admin_session: SessionPrincipal = Depends(require_admin)
 ):
     """
     Get all allowed domains.
 
     Admin only endpoint.
     """
-    # Get all domains with user count
-    domains_query = select(
-        DomainWhitelist,
-        func.count(User.id).label("user_count")
-    ).outerjoin(
-        User,
-        func.split_part(User.email, '@', 2) == DomainWhitelist.domain
-    ).group_by(DomainWhitelist.domain)
-
-    result = await db.execute(domains_query)
-    domains_data = result.all()
+    # User counts are maintained on DomainWhitelist (see services/domain_counts.py)
+    result = await db.execute(select(DomainWhitelist).order_by(DomainWhitelist.domain))
 
     # Build response
-    domains_list = []
-    for domain_obj, user_count in domains_data:
-        domains_list.append(DomainInfo(
+    domains_list = [
+        DomainInfo(
             domain=domain_obj.domain,
             addedAt=domain_obj.added_at,
             addedBy=domain_obj.added_by,
             status=domain_obj.status,
-            userCount=user_count or 0
-        ))
+            userCount=domain_obj.user_count or 0
+        )
+        for domain_obj in result.scalars().all()
+    ]
 
     return DomainsListResponse(
         domains=domains_list,
@@ -64,7 +61,7 @@ async def get_domains(
 async def add_domain(
     add_data: AddDomainRequest,
     db: AsyncSession = Depends(get_db),
-    admin_session: SessionModel = Depends(require_admin)
+    admin_session: SessionPrincipal = Depends(require_admin)
 ):
     """
     Add a new allowed domain.
@@ -83,11 +80,14 @@ async def add_domain(
             detail="Domain already exists"
         )
 
-    # Add new domain
+    # Add new domain, counting users who already have it
+    domain_name = add_data.domain.lower()
+    user_count = await db.scalar(domain_user_count(domain_name))
     new_domain = DomainWhitelist(
-        domain=add_data.domain.lower(),
+        domain=domain_name,
         added_at=datetime.utcnow(),
-        added_by=admin_session.user.email
+        added_by=admin_session.email,
+        user_count=user_count or 0
     )
 
     db.add(new_domain)
@@ -101,7 +101,7 @@ async def add_domain(
             addedAt=new_domain.added_at,
             addedBy=new_domain.added_by,
             status=new_domain.status,
-            userCount=0
+            userCount=new_domain.user_count
         )
     )
 
@@ -110,7 +110,7 @@ async def add_domain(
 async def remove_domain(
     remove_data: RemoveDomainRequest,
     db: AsyncSession = Depends(get_db),
-    admin_session: SessionModel = Depends(require_admin)
+    admin_session: SessionPrincipal = Depends(require_admin)
 ):
     """
     Remove an allowed domain.
@@ -118,7 +118,7 @@ async def remove_domain(
     Admin only endpoint.
     """
     # Don't allow removing the admin's domain
-    admin_domain = admin_session.user.email.split("@")[1]
+    admin_domain = admin_session.email.split("@")[1]
     if remove_data.domain == admin_domain:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -143,4 +143,107 @@ async def remove_domain(
     return {
         "success": True,
         "removedDomain": remove_data.domain
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/domains/bulk", response_model=BulkOperationResponse)
+async def bulk_add_domains(
+    bulk_data: BulkAddDomainsRequest,
+    db: AsyncSession = Depends(get_db),
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Add several allowed domains.
+
+    Admin only endpoint. Existing domains and the user counts of new ones
+    are read with one query each, and new domains are inserted with one
+    statement.
+    """
+    domains = list(dict.fromkeys(domain.lower() for domain in bulk_data.domains))
+
+    result = await db.execute(
+        select(DomainWhitelist.domain).where(DomainWhitelist.domain.in_(domains))
+    )
+    existing = set(result.scalars().all())
+    new_domains = [domain for domain in domains if domain not in existing]
+
+    if new_domains:
+        result = await db.execute(
+            select(User.email_domain, func.count(User.id))
+            .where(User.email_domain.in_(new_domains))
+            .group_by(User.email_domain)
+        )
+        user_counts = dict(result.all())
+        now = datetime.utcnow()
+        await db.execute(insert(DomainWhitelist).values([
+            {
+                "domain": domain,
+                "added_at": now,
+                "added_by": admin_session.email,
+                "user_count": user_counts.get(domain, 0),
+                "status": "active",
+            }
+            for domain in new_domains
+        ]))
+        await db.commit()
+
+    return bulk_response([
+        BulkItemResult(item=domain, status="exists", detail="Domain already exists") if domain in existing
+        else BulkItemResult(item=domain, status="added")
+        for domain in domains
+    ])
+
+
+@router.delete("/domains/bulk", response_model=BulkOperationResponse)
+async def bulk_remove_domains(
+    bulk_data: BulkRemoveDomainsRequest,
+    db: AsyncSession = Depends(get_db),
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Remove several allowed domains.
+
+    Admin only endpoint. Domains are removed with one DELETE; the admin's
+    own domain is rejected.
+    """
+    admin_domain = admin_session.email.split("@")[1]
+    domains = list(dict.fromkeys(bulk_data.domains))
+    targets = [domain for domain in domains if domain != admin_domain]
+
+    removed = set()
+    if targets:
+        result = await db.execute(
+            delete(DomainWhitelist)
+            .where(DomainWhitelist.domain.in_(targets))
+            .returning(DomainWhitelist.domain)
+        )
+        removed = set(result.scalars().all())
+        await db.commit()
+
+    results = []
+    for domain in domains:
+        if domain == admin_domain:
+            results.append(BulkItemResult(item=domain, status="rejected", detail="Cannot remove your own domain"))
+        elif domain in removed:
+            results.append(BulkItemResult(item=domain, status="removed"))
+        else:
+            results.append(BulkItemResult(item=domain, status="not_found", detail="Domain not found"))
+    return bulk_response(results)
+
+
+@router.post("/domains/reconcile")
+async def reconcile_domains(
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Recount users per domain now.
+
+    Admin only endpoint. Counts are kept up to date as users change; this
+    corrects drift from writes made outside the application.
+    """
+    corrected = await domain_count_reconciler.run_once()
+
+    return {
+        "success": True,
+        "correctedDomains": corrected
+    }
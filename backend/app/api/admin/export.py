@@ -0,0 +1,95 @@
+"""Admin activity export endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import false
+from typing import Optional
+from datetime import datetime
+
+from ...db.base import get_db
+from ...services.activity_export import FORMATS, export_activities
+from ...services.activity_query import ActivityQuery
+from ...services.activity_rollups import to_utc
+from .users import require_admin
+from ...services.principal import SessionPrincipal
+
+router = APIRouter()
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Check whether an Accept-Encoding header allows gzip (q > 0, directly or via *)."""
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+@router.get("/activity/export")
+async def export_activity(
+    request: Request,
+    format: str = Query("ndjson", description="Output format: ndjson or csv"),
+    start: Optional[datetime] = Query(None, alias="from", description="Start of range"),
+    end: Optional[datetime] = Query(None, alias="to", description="End of range, exclusive"),
+    email: Optional[str] = Query(None, description="Filter by user email"),
+    app_id: Optional[str] = Query(None, description="Filter by application ID"),
+    action: Optional[str] = Query(None, description="Filter by action"),
+    db: AsyncSession = Depends(get_db),
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Stream activity logs, oldest first, as NDJSON or CSV.
+
+    Admin only endpoint. Rows are streamed from a server-side cursor in
+    constant memory; the response is gzip-encoded when the client's
+    Accept-Encoding allows gzip.
+    """
+    if format not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(FORMATS)}"
+        )
+
+    start = to_utc(start) if start else None
+    end = to_utc(end) if end else None
+    if start and end and start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be before 'to'"
+        )
+
+    query = await ActivityQuery.build(
+        db, user_email=email, app_id=app_id, action=action, start=start, end=end
+    )
+    # Unknown app or action: nothing can match
+    filters = query.where() if query else [false()]
+
+    compress = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    filename = f"activity-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        export_activities(filters, format=format, compress=compress),
+        media_type=FORMATS[format],
+        headers=headers
+    )
@@ -0,0 +1,45 @@
+"""Admin runtime metrics endpoints."""
+
+from fastapi import APIRouter, Depends
+
+from ...services.session_cache import session_cache
+from ...services.session_activity import session_activity
+from ...services.google_verifier import google_verifier
+from ...services.activity_ingest import activity_ingestor
+from ...services.activity_partitions import activity_retention
+from ...services.activity_dictionary import activity_dictionary
+from ...services.activity_hub import activity_hub
+from ...services.recent_activity import recent_activity
+from ...services.activity_counts import activity_counts
+from ...services.activity_coalesce import activity_coalescer
+from ...services.domain_counts import domain_count_reconciler
+from ...services.invalidation import get_invalidation_bus
+from .users import require_admin
+from ...services.principal import SessionPrincipal
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics(
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Get in-process cache and pipeline counters for this worker.
+
+    Admin only endpoint.
+    """
+    return {
+        "sessionCache": session_cache.stats(),
+        "sessionActivity": session_activity.stats(),
+        "googleVerifier": google_verifier.stats(),
+        "activityIngest": activity_ingestor.stats(),
+        "activityRetention": activity_retention.stats(),
+        "activityDictionary": activity_dictionary.stats(),
+        "activityStream": activity_hub.stats(),
+        "recentActivity": recent_activity.stats(),
+        "activityCounts": activity_counts.stats(),
+        "activityCoalescing": activity_coalescer.stats(),
+        "domainCounts": domain_count_reconciler.stats(),
+        "invalidation": get_invalidation_bus().stats(),
+    }
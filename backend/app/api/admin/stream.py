@@ -0,0 +1,144 @@
+"""Admin live activity stream endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+
+from ...db.base import get_db
+from ...core.config import settings
+from ...models import ActivityLog
+from ...services.activity_dictionary import activity_dictionary
+from ...services.activity_hub import activity_hub, event_record, HubFull, Subscription
+from ...services.activity_query import ActivityQuery
+from .users import require_admin
+from ...services.principal import SessionPrincipal
+
+router = APIRouter()
+
+
+def _sse(record: Dict[str, Any]) -> str:
+    """Format an activity record as a server-sent event."""
+    return f"id: {record['id']}\nevent: activity\ndata: {json.dumps(record, separators=(',', ':'))}\n\n"
+
+
+async def _replay(db: AsyncSession, filters: Dict[str, Optional[str]], last_event_id: str) -> List[Dict[str, Any]]:
+    """Get events written after a client's last seen ID, oldest first."""
+    query = await ActivityQuery.build(
+        db,
+        user_email=filters["user_email"],
+        app_id=filters["app_id"],
+        action=filters["action"],
+        user_domain=filters["user_domain"]
+    )
+    if query is None:
+        return []
+
+    result = await db.execute(
+        select(ActivityLog)
+        .where(*query.where(), ActivityLog.id > last_event_id)
+        .order_by(ActivityLog.id)
+        .limit(settings.ACTIVITY_STREAM_REPLAY_LIMIT)
+    )
+    activities = result.scalars().all()
+    await activity_dictionary.load(db, activities)
+    return [
+        event_record({
+            "id": activity.id,
+            "user_email": activity.user_email,
+            "user_role": activity.user_role,
+            "action_metadata": activity.action_metadata,
+            "timestamp": activity.timestamp,
+            **activity_dictionary.names(activity),
+        })
+        for activity in activities
+    ]
+
+
+async def _events(
+    request: Request,
+    subscription: Subscription,
+    replay: List[Dict[str, Any]]
+) -> AsyncIterator[str]:
+    """Yield replayed then live events until the client or hub ends the stream."""
+    try:
+        yield "retry: 3000\n\n"
+        last_id = ""
+        for record in replay:
+            last_id = record["id"]
+            yield _sse(record)
+
+        while True:
+            try:
+                record = await asyncio.wait_for(
+                    subscription.queue.get(), settings.ACTIVITY_STREAM_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+
+            if record is None:
+                if subscription.dropped:
+                    yield "event: dropped\ndata: {}\n\n"
+                return
+            # Live events may overlap the replay
+            if record["id"] > last_id:
+                yield _sse(record)
+    finally:
+        activity_hub.unsubscribe(subscription)
+
+
+@router.get("/activity/stream")
+async def stream_activity(
+    request: Request,
+    email: Optional[str] = Query(None, description="Only events from this user"),
+    app_id: Optional[str] = Query(None, description="Only events for this application ID"),
+    action: Optional[str] = Query(None, description="Only events with this action"),
+    user_domain: Optional[str] = Query(None, description="Only events from this user domain"),
+    db: AsyncSession = Depends(get_db),
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Stream newly tracked activity as server-sent events.
+
+    Admin only endpoint. Each event carries the activity ID as its SSE id;
+    on reconnect, events after Last-Event-ID are replayed from the database
+    (up to ACTIVITY_STREAM_REPLAY_LIMIT). Subscribers that fall too far
+    behind get a `dropped` event and the stream ends. Only activity written
+    by the worker serving the stream is pushed live.
+    """
+    filters = {
+        "user_email": email,
+        "app_id": app_id,
+        "action": action,
+        "user_domain": user_domain,
+    }
+
+    try:
+        subscription = activity_hub.subscribe(filters)
+    except HubFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live activity subscribers. Please try again later."
+        )
+
+    # Subscribe before replaying so nothing falls in between
+    replay: List[Dict[str, Any]] = []
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        try:
+            replay = await _replay(db, filters, last_event_id)
+        except Exception:
+            activity_hub.unsubscribe(subscription)
+            raise
+
+    return StreamingResponse(
+        _events(request, subscription, replay),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,9 +1,10 @@
 """Admin user management endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import List
+from sqlalchemy import select, update, func, and_, or_, desc, tuple_
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 
 from ...db.base import get_db
 from ...models import User, Session, UserRole
@@ -13,18 +14,25 @@ from ...schemas.admin import (
     UpdateUserRoleRequest,
     UpdateUserRoleResponse,
     RevokeUserRequest,
-    RevokeUserResponse
+    RevokeUserResponse,
+    BulkUpdateUserRolesRequest,
+    BulkRevokeUsersRequest,
+    BulkItemResult,
+    BulkOperationResponse
 )
 from ...services.auth import AuthService
+from ...services.invalidation import invalidate_users
+from ...services.session_store import get_session_store
+from ...services.pagination import encode_cursor, decode_cursor
 from ..auth.session import get_current_session
-from ...models import Session as SessionModel
+from ...services.principal import SessionPrincipal
 
 router = APIRouter()
 
 
-async def require_admin(session: SessionModel = Depends(get_current_session)) -> SessionModel:
+async def require_admin(session: SessionPrincipal = Depends(get_current_session)) -> SessionPrincipal:
     """Dependency to require admin role."""
-    if session.user.role != UserRole.ADMIN:
+    if not session.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
@@ -32,64 +40,162 @@ async def require_admin(session: SessionModel = Depends(get_current_session)) ->
     return session
 
 
+# Bulk item statuses that count as failures
+BULK_FAILURES = {"not_found", "exists", "rejected"}
+
+
+def bulk_response(results: List[BulkItemResult]) -> BulkOperationResponse:
+    """Summarize per-item results of a bulk operation."""
+    failed = sum(1 for result in results if result.status in BULK_FAILURES)
+    return BulkOperationResponse(
+        success=failed == 0,
+        succeeded=len(results) - failed,
+        failed=failed,
+        results=results
+    )
+
+
+def _prefix_match(expression, prefix: str):
+    """Match values starting with ``prefix`` as a range, so a B-tree index applies."""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(expression >= prefix, expression < upper)
+
+
+def _user_cursor(user: User) -> str:
+    """Build a cursor pointing after a user in the listing order."""
+    return encode_cursor({
+        "l": user.last_login.isoformat() if user.last_login else None,
+        "i": user.id
+    })
+
+
+def _read_user_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    """Get the (last_login, id) position a cursor points at."""
+    payload = decode_cursor(cursor)
+    user_id, last_login = payload.get("i"), payload.get("l")
+    try:
+        if not isinstance(user_id, str):
+            raise ValueError("cursor has no user ID")
+        return (datetime.fromisoformat(last_login) if last_login is not None else None), user_id
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def _users_page(
+    db: AsyncSession,
+    filters: list,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Tuple[User, int, List[str]]], bool]:
+    """Get a page of users with their active sessions, most recent login
+    first, and whether more follow.
+
+    Users who logged in are read first, then those who never did; each
+    part is one statement over a range scan of the (last_login, id) index
+    (see SessionStore.users_with_sessions).
+    """
+    store = get_session_store()
+    last_login = user_id = None
+    if cursor:
+        last_login, user_id = _read_user_cursor(cursor)
+
+    rows: List[Tuple[User, int, List[str]]] = []
+    if not cursor or last_login is not None:
+        query = select(User).where(*filters, User.last_login.is_not(None))
+        if cursor:
+            query = query.where(tuple_(User.last_login, User.id) < tuple_(last_login, user_id))
+        order_by = (desc(User.last_login), desc(User.id))
+        rows = await store.users_with_sessions(
+            db, query.order_by(*order_by).limit(limit + 1), order_by
+        )
+        user_id = None
+
+    if len(rows) <= limit:
+        query = select(User).where(*filters, User.last_login.is_(None))
+        if user_id is not None:
+            query = query.where(User.id < user_id)
+        order_by = (desc(User.id),)
+        rows.extend(await store.users_with_sessions(
+            db, query.order_by(*order_by).limit(limit + 1 - len(rows)), order_by
+        ))
+
+    return rows[:limit], len(rows) > limit
+
+
 @router.get("/users", response_model=UsersListResponse)
 async def get_users(
+    search: Optional[str] = Query(None, min_length=1, max_length=100, description="Email or name prefix"),
+    role: Optional[UserRole] = Query(None, description="Only users with this role"),
+    domain: Optional[str] = Query(None, description="Only users with this email domain"),
+    active: Optional[bool] = Query(None, description="Only users with (true) or without (false) unexpired sessions"),
+    limit: int = Query(100, ge=1, le=500, description="Number of users to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (nextCursor)"),
+    include_total: bool = Query(False, description="Also count all matching users"),
     db: AsyncSession = Depends(get_db),
-    admin_session: SessionModel = Depends(require_admin)
+    admin_session: SessionPrincipal = Depends(require_admin)
 ):
     """
-    Get all users with their session information.
+    Get users with their session information, most recent login first.
 
     Admin only endpoint.
+
+    - Ordered by last login (users who never logged in last), served by
+      the (last_login, id) index; pass nextCursor back as `cursor` to page
+    - `search` matches the start of the email or name (case-insensitive)
+    - Session IDs and activeSessions cover the returned page only
+    - The total is only counted when include_total is set
     """
-    # Get all users with session count
-    users_query = select(
-        User,
-        func.count(Session.id).label("session_count")
-    ).outerjoin(
-        Session, User.id == Session.user_id
-    ).group_by(User.id)
-
-    result = await db.execute(users_query)
-    users_data = result.all()
-
-    # Get active session IDs per user
-    sessions_query = select(Session.id, Session.user_id).where(
-        Session.expires_at > func.now()
-    )
-    sessions_result = await db.execute(sessions_query)
-    active_sessions = sessions_result.all()
+    filters = []
+    if search:
+        prefix = search.lower()
+        filters.append(or_(
+            _prefix_match(User.email, prefix),
+            _prefix_match(func.lower(User.name), prefix)
+        ))
+    if role is not None:
+        filters.append(User.role == role)
+    if domain:
+        filters.append(User.email_domain == domain.lower())
+    if active is not None:
+        has_sessions = (
+            select(Session.id)
+            .where(Session.user_id == User.id, Session.expires_at > datetime.utcnow())
+            .exists()
+        )
+        filters.append(has_sessions if active else ~has_sessions)
 
-    # Build user sessions map
-    user_sessions_map = {}
-    for session_id, user_id in active_sessions:
-        if user_id not in user_sessions_map:
-            user_sessions_map[user_id] = []
-        user_sessions_map[user_id].append(session_id)
+    rows, has_more = await _users_page(db, filters, cursor, limit)
 
     # Build response
     users_list = []
-    for user, session_count in users_data:
+    for user, session_count, session_ids in rows:
         users_list.append(UserWithSessions(
             email=user.email,
             role=user.role,
             domain=user.domain,
             lastLogin=user.last_login,
-            sessions=user_sessions_map.get(user.id, []),
-            isActive=len(user_sessions_map.get(user.id, [])) > 0,
+            sessions=session_ids,
+            isActive=session_count > 0,
             revokedAt=user.revoked_at,
             revokedBy=user.revoked_by,
             updatedAt=user.updated_at,
             updatedBy=user.updated_by
         ))
 
-    # Sort by last login (most recent first)
-    users_list.sort(key=lambda x: x.lastLogin or "", reverse=True)
+    # Count all matching users (opt-in)
+    total_count = None
+    if include_total:
+        count_result = await db.execute(select(func.count(User.id)).where(*filters))
+        total_count = count_result.scalar() or 0
 
     return UsersListResponse(
         users=users_list,
-        total=len(users_list),
-        activeSessions=len(active_sessions)
+        total=total_count,
+        activeSessions=sum(session_count for _, session_count, _ in rows),
+        nextCursor=_user_cursor(rows[-1][0]) if rows and has_more else None
     )
 
 
@@ -97,7 +203,7 @@ async def get_users(
 async def update_user_role(
     update_data: UpdateUserRoleRequest,
     db: AsyncSession = Depends(get_db),
-    admin_session: SessionModel = Depends(require_admin)
+    admin_session: SessionPrincipal = Depends(require_admin)
 ):
     """
     Update a user's role.
@@ -118,10 +224,12 @@ async def update_user_role(
 
     # Update user role
     user.role = update_data.role
-    user.updated_at = func.now()
-    user.updated_by = admin_session.user.email
+    user.updated_at = datetime.utcnow()
+    user.updated_by = admin_session.email
 
     await db.commit()
+    await get_session_store().update_user(db, user)
+    await invalidate_users([user.id])
 
     return UpdateUserRoleResponse(
         success=True,
@@ -138,7 +246,7 @@ async def update_user_role(
 async def revoke_user_access(
     revoke_data: RevokeUserRequest,
     db: AsyncSession = Depends(get_db),
-    admin_session: SessionModel = Depends(require_admin)
+    admin_session: SessionPrincipal = Depends(require_admin)
 ):
     """
     Revoke a user's access by deleting all their sessions.
@@ -146,7 +254,7 @@ async def revoke_user_access(
     Admin only endpoint.
     """
     # Don't allow admin to revoke their own access
-    if revoke_data.email == admin_session.user.email:
+    if revoke_data.email == admin_session.email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot revoke your own access"
@@ -165,12 +273,12 @@ async def revoke_user_access(
         )
 
     # Delete all user sessions
-    revoked_count = await AuthService.delete_user_sessions(db, revoke_data.email)
+    revoked_count = await AuthService.delete_user_sessions(db, user.id)
 
     # Mark user as revoked
     user.is_active = False
-    user.revoked_at = func.now()
-    user.revoked_by = admin_session.user.email
+    user.revoked_at = datetime.utcnow()
+    user.revoked_by = admin_session.email
 
     await db.commit()
 
@@ -182,4 +290,95 @@ async def revoke_user_access(
             "revokedAt": user.revoked_at,
             "revokedBy": user.revoked_by
         }
-    )
\ No newline at end of file
+    )
+
+
+@router.put("/users/bulk", response_model=BulkOperationResponse)
+async def bulk_update_user_roles(
+    bulk_data: BulkUpdateUserRolesRequest,
+    db: AsyncSession = Depends(get_db),
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Update several users' roles.
+
+    Admin only endpoint. Users are looked up in one query and updated with
+    one statement per role, in a single transaction. If an email appears
+    more than once, its last role wins.
+    """
+    roles: Dict[str, UserRole] = {}
+    for item in bulk_data.users:
+        roles[item.email] = item.role
+
+    result = await db.execute(select(User).where(User.email.in_(list(roles))))
+    users = {user.email: user for user in result.scalars().all()}
+
+    # One UPDATE per distinct role; loaded users are updated in place
+    now = datetime.utcnow()
+    by_role: Dict[UserRole, List[str]] = {}
+    for email, user in users.items():
+        by_role.setdefault(roles[email], []).append(user.id)
+    for role, user_ids in by_role.items():
+        await db.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(role=role, updated_at=now, updated_by=admin_session.email)
+            .execution_options(synchronize_session="evaluate")
+        )
+
+    await db.commit()
+    await get_session_store().update_users(db, users.values())
+    await invalidate_users(user.id for user in users.values())
+
+    return bulk_response([
+        BulkItemResult(item=email, status="updated") if email in users
+        else BulkItemResult(item=email, status="not_found", detail="User not found")
+        for email in roles
+    ])
+
+
+@router.delete("/users/bulk", response_model=BulkOperationResponse)
+async def bulk_revoke_user_access(
+    bulk_data: BulkRevokeUsersRequest,
+    db: AsyncSession = Depends(get_db),
+    admin_session: SessionPrincipal = Depends(require_admin)
+):
+    """
+    Revoke several users' access by deleting all their sessions.
+
+    Admin only endpoint. Users are looked up in one query, marked revoked
+    with one UPDATE and their sessions removed with one DELETE, in a single
+    transaction. The admin's own email is rejected.
+    """
+    emails = list(dict.fromkeys(bulk_data.emails))
+    targets = [email for email in emails if email != admin_session.email]
+
+    result = await db.execute(select(User).where(User.email.in_(targets)))
+    users = {user.email: user for user in result.scalars().all()}
+    user_ids = [user.id for user in users.values()]
+
+    revoked: Dict[str, int] = {}
+    if user_ids:
+        await db.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(is_active=False, revoked_at=datetime.utcnow(), revoked_by=admin_session.email)
+            .execution_options(synchronize_session="evaluate")
+        )
+        revoked = await get_session_store().delete_for_users(db, user_ids)
+        await db.commit()
+        await invalidate_users(user_ids)
+
+    results = []
+    for email in emails:
+        if email == admin_session.email:
+            results.append(BulkItemResult(item=email, status="rejected", detail="Cannot revoke your own access"))
+        elif email not in users:
+            results.append(BulkItemResult(item=email, status="not_found", detail="User not found"))
+        else:
+            results.append(BulkItemResult(
+                item=email,
+                status="revoked",
+                revokedSessions=revoked.get(users[email].id, 0)
+            ))
+    return bulk_response(results)
@@ -8,7 +8,7 @@ from ...core.config import settings
 from ...services.auth import AuthService
 from ...schemas.auth import AppTokenRequest, AppTokenResponse, ValidateAppTokenRequest, UserResponse
 from .session import get_current_session
-from ...models import Session
+from ...services.principal import SessionPrincipal
 
 router = APIRouter()
 
@@ -17,7 +17,7 @@ router = APIRouter()
 async def create_app_token(
     request: Request,
     token_data: AppTokenRequest,
-    session: Session = Depends(get_current_session)
+    session: SessionPrincipal = Depends(get_current_session)
 ):
     """
     Create a JWT token for sub-application authentication.
@@ -35,7 +35,7 @@ async def create_app_token(
 
     # Create app token
     token = AuthService.create_app_token(
-        session.user,
+        session,
         token_data.appId,
         token_data.appName
     )
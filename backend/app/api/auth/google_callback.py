@@ -54,17 +54,15 @@ async def google_callback(
 
         logger.info(f"Creating/updating user for: {email}")
 
-        # Create or update user
-        user = await AuthService.create_or_update_user(db, user_info)
-
         # Get client info
         ip_address = request.client.host if request.client else None
         user_agent = request.headers.get("user-agent")
 
-        # Create session
-        session, session_id = await AuthService.create_session(
-            db, user, ip_address, user_agent
+        # Upsert user and create session in one transaction
+        user, session = await AuthService.login(
+            db, user_info, ip_address, user_agent
         )
+        session_id = session.id
 
         # Create redirect response to frontend with token in URL
         # For cross-domain compatibility, pass session_id as URL parameter
@@ -45,17 +45,15 @@ async def google_signin(
             detail=f"Access denied - domain '{domain}' not allowed"
         )
 
-    # Create or update user
-    user = await AuthService.create_or_update_user(db, user_info)
-
     # Get client info
     ip_address = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent")
 
-    # Create session
-    session, session_id = await AuthService.create_session(
-        db, user, ip_address, user_agent
+    # Upsert user and create session in one transaction
+    user, session = await AuthService.login(
+        db, user_info, ip_address, user_agent
     )
+    session_id = session.id
 
     # Set session cookie
     cookie_settings = settings.cookie_settings.copy()
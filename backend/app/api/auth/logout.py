@@ -7,7 +7,7 @@ from ...db.base import get_db
 from ...core.config import settings
 from ...services.auth import AuthService
 from .session import get_current_session
-from ...models import Session
+from ...services.principal import SessionPrincipal
 
 router = APIRouter()
 
@@ -16,7 +16,7 @@ router = APIRouter()
 async def logout(
     request: Request,
     response: Response,
-    session: Session = Depends(get_current_session),
+    session: SessionPrincipal = Depends(get_current_session),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -35,7 +35,7 @@ async def logout(
         )
 
     # Delete session
-    await AuthService.delete_session(db, session.id)
+    await AuthService.delete_session(db, session.session_id)
 
     # Clear cookie
     response.delete_cookie(
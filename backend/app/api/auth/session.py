@@ -9,7 +9,7 @@ from ...db.base import get_db
 from ...core.config import settings
 from ...services.auth import AuthService
 from ...schemas.auth import SessionResponse, UserResponse
-from ...models import Session
+from ...services.principal import SessionPrincipal
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -18,7 +18,7 @@ logger = logging.getLogger(__name__)
 async def get_current_session(
     request: Request,
     db: AsyncSession = Depends(get_db)
-) -> Session:
+) -> SessionPrincipal:
     """Dependency to get current session from cookie or Authorization header."""
     # Log incoming request details
     logger.info(f"Session validation request from: {request.client.host if request.client else 'unknown'}")
@@ -51,22 +51,22 @@ async def get_current_session(
 
     # Validate session
     logger.info(f"Validating session: {session_id[:10]}...")
-    session = await AuthService.validate_session(db, session_id)
+    principal = await AuthService.validate_session(db, session_id)
 
-    if not session:
+    if not principal:
         logger.error(f"Session validation failed for: {session_id[:10]}...")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired session"
         )
 
-    logger.info(f"Session valid for user: {session.user.email}")
-    return session
+    logger.info(f"Session valid for user: {principal.email}")
+    return principal
 
 
 @router.get("/session", response_model=SessionResponse)
 async def get_session(
-    session: Session = Depends(get_current_session)
+    session: SessionPrincipal = Depends(get_current_session)
 ):
     """
     Get current session information.
@@ -75,7 +75,13 @@ async def get_session(
     """
     return SessionResponse(
         authenticated=True,  # Explicitly set for frontend compatibility
-        user=UserResponse.model_validate(session.user),
+        user=UserResponse(
+            id=session.user_id,
+            email=session.email,
+            name=session.name,
+            role=session.role,
+            picture=session.picture
+        ),
         csrfToken=session.csrf_token,
         expiresAt=session.expires_at
     )
\ No newline at end of file
@@ -81,6 +81,63 @@ class Settings(BaseSettings):
     )
     USE_REDIS_SESSIONS: bool = Field(default=False, description="Use Redis for sessions instead of DB")
 
+    # Session Cache (in-process, per worker)
+    SESSION_CACHE_MAX_SIZE: int = Field(default=10000, description="Max cached sessions (0 disables the cache)")
+    SESSION_CACHE_TTL: int = Field(default=60, description="Cached session lifetime in seconds")
+
+    # Cache Invalidation (broadcast to every worker)
+    INVALIDATION_BACKEND: str = Field(default="local", description="Invalidation bus: local (single worker), redis (pub/sub on REDIS_URL) or postgres (LISTEN/NOTIFY)")
+    INVALIDATION_CHANNEL: str = Field(default="terralink_invalidations", description="Pub/sub channel shared by the workers")
+    INVALIDATION_RECONNECT_DELAY: float = Field(default=1.0, description="Seconds before re-subscribing after the channel drops")
+
+    # Session Activity (write-behind last_activity updates)
+    SESSION_ACTIVITY_FLUSH_INTERVAL: int = Field(
+        default=30,
+        description="Seconds between bulk last_activity flushes (0 writes through)"
+    )
+    SESSION_ACTIVITY_GRANULARITY: int = Field(
+        default=60,
+        description="Only record activity when last_activity is older than this (seconds)"
+    )
+
+    # Activity Ingestion (buffered bulk writes)
+    ACTIVITY_QUEUE_MAX_SIZE: int = Field(default=1000, description="Max queued activity requests before 429")
+    ACTIVITY_BATCH_SIZE: int = Field(default=200, description="Max activity rows per INSERT")
+    ACTIVITY_FLUSH_INTERVAL: float = Field(default=1.0, description="Max seconds an activity event waits in the queue")
+    ACTIVITY_RETRY_AFTER: int = Field(default=1, description="Retry-After seconds when the activity queue is full")
+
+    # Activity Dictionary (in-process app/action/domain key cache, per worker)
+    ACTIVITY_DICTIONARY_CACHE_SIZE: int = Field(default=10000, ge=1000, description="Max cached entries per direction and kind (must exceed the distinct values in one page)")
+
+    # Activity Coalescing (per worker)
+    ACTIVITY_COALESCE_WINDOW: float = Field(default=0.0, description="Seconds within which identical events from a user share one row (0 disables; rollups and counts then see one event per row)")
+    ACTIVITY_IDEMPOTENCY_MAX_KEYS: int = Field(default=10000, description="Max remembered client idempotency keys")
+
+    # Activity Retention (monthly partitions on PostgreSQL, chunked deletes on SQLite)
+    ACTIVITY_RETENTION_MONTHS: int = Field(default=0, description="Whole months of activity to keep besides the current one (0 = keep forever)")
+    ACTIVITY_PARTITIONS_AHEAD: int = Field(default=3, description="Upcoming monthly partitions to create in advance")
+    ACTIVITY_MAINTENANCE_INTERVAL: int = Field(default=3600, description="Seconds between partition and retention runs")
+    ACTIVITY_DELETE_CHUNK_SIZE: int = Field(default=5000, description="Rows per DELETE when partitions are unavailable")
+
+    # Live Activity Stream (server-sent events, per worker)
+    ACTIVITY_STREAM_BUFFER_SIZE: int = Field(default=256, description="Events buffered per subscriber before it is dropped as too slow")
+    ACTIVITY_STREAM_MAX_SUBSCRIBERS: int = Field(default=100, description="Max concurrent live stream subscribers")
+    ACTIVITY_STREAM_HEARTBEAT: float = Field(default=15.0, description="Seconds between keep-alive comments on idle streams")
+    ACTIVITY_STREAM_REPLAY_LIMIT: int = Field(default=1000, description="Max missed events replayed from the database on reconnect")
+
+    # Recent Activity (in-process ring buffers, per worker)
+    ACTIVITY_RECENT_SIZE: int = Field(default=100, description="Latest activities kept per user and overall (0 = disabled)")
+    ACTIVITY_RECENT_MAX_USERS: int = Field(default=500, description="Max users with a recent-activity buffer")
+    ACTIVITY_RECENT_TTL: float = Field(default=10.0, description="Seconds a buffer is trusted before re-reading the database (covers other workers' writes)")
+
+    # Activity Counts (totals on activity listings)
+    ACTIVITY_COUNT_MODE: str = Field(default="exact", description="Default total strategy: exact, cached or estimated")
+    ACTIVITY_COUNT_CACHE_TTL: float = Field(default=30.0, description="Seconds a cached total is reused (invalidated earlier by matching ingests on this worker)")
+    ACTIVITY_COUNT_CACHE_SIZE: int = Field(default=1000, description="Max cached totals")
+
+    # Domain User Counts (maintained on write, reconciled periodically)
+    DOMAIN_COUNT_RECONCILE_INTERVAL: int = Field(default=3600, description="Seconds between domain user count reconciliations (0 disables)")
+
     # CORS Settings (stored as strings, parsed via properties)
     ALLOWED_ORIGINS: str = Field(
         default="http://localhost:6001,http://localhost:3000",
@@ -0,0 +1,101 @@
+"""Time-sortable identifiers (ULID layout, Crockford base32 text)."""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+# Crockford base32: no I, L, O or U, and sorts the same as the values it encodes
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ENCODED_LENGTH = 26
+
+_TIME_BITS = 48
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+
+def _encode(value: int) -> str:
+    """Encode a 128-bit integer as 26 base32 characters."""
+    chars = []
+    for _ in range(ENCODED_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def _to_millis(when: datetime) -> int:
+    """Get Unix milliseconds for a datetime (naive values are UTC)."""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp() * 1000)
+
+
+def id_for_time(when: datetime, randomness: Optional[int] = None) -> str:
+    """Build an ID for a given time, without the monotonic guarantee.
+
+    Used to re-key historical rows; new rows should use ``IdGenerator``.
+    """
+    if randomness is None:
+        randomness = int.from_bytes(os.urandom(10), "big")
+    return _encode((_to_millis(when) << _RANDOM_BITS) | (randomness & _RANDOM_MAX))
+
+
+def lower_bound_for_time(when: datetime) -> str:
+    """Get the smallest possible ID for a time, for ID range scans."""
+    return id_for_time(when, randomness=0)
+
+
+def id_time(value: str) -> datetime:
+    """Get the (millisecond) creation time encoded in an ID."""
+    millis = 0
+    for char in value[-ENCODED_LENGTH:][:10]:
+        millis = (millis << 5) | ALPHABET.index(char)
+    return datetime.fromtimestamp(millis / 1000, tz=timezone.utc)
+
+
+class IdGenerator:
+    """Generate monotonic, time-sortable IDs.
+
+    Each ID is 48 bits of Unix milliseconds followed by 80 random bits,
+    encoded as 26 characters that sort in creation order. IDs made in the
+    same millisecond (or after the clock steps back) reuse the last time and
+    increment the random part, so IDs from one process never go backwards
+    and always land at the right edge of a B-tree index.
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._last_millis = 0
+        self._last_random = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fresh_random() -> int:
+        # Top bit clear, leaving headroom for increments within a millisecond
+        return int.from_bytes(os.urandom(10), "big") >> 1
+
+    def new(self, when: Optional[datetime] = None) -> str:
+        """Generate the next ID, timed at ``when`` (default: now)."""
+        millis = _to_millis(when) if when is not None else time.time_ns() // 1_000_000
+        with self._lock:
+            if millis <= self._last_millis:
+                millis = self._last_millis
+                randomness = self._last_random + 1
+                if randomness > _RANDOM_MAX:
+                    # Random part exhausted: borrow the next millisecond
+                    millis += 1
+                    randomness = self._fresh_random()
+            else:
+                randomness = self._fresh_random()
+            self._last_millis = millis
+            self._last_random = randomness
+        return self.prefix + _encode((millis << _RANDOM_BITS) | randomness)
+
+    def lower_bound(self, when: datetime) -> str:
+        """Get the smallest ID this generator could produce at a time."""
+        return self.prefix + lower_bound_for_time(when)
+
+
+# Activity log IDs: "act_" + 26 characters
+activity_ids = IdGenerator(prefix="act_")
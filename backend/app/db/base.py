@@ -2,6 +2,8 @@
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from typing import AsyncGenerator
 
 from ..core.config import settings
@@ -45,6 +47,18 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+def is_postgresql() -> bool:
+    """Check if the configured database is PostgreSQL."""
+    return engine.dialect.name == "postgresql"
+
+
+def upsert(model):
+    """Get an INSERT supporting ON CONFLICT clauses for the configured database."""
+    if is_postgresql():
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session."""
     async with AsyncSessionLocal() as session:
@@ -62,7 +76,15 @@ async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
         # Import all models here to ensure they're registered
-        from ..models import user, session, domain_whitelist, activity_log
+        from ..models import user, session, domain_whitelist, activity_dictionary, activity_log, activity_rollup, activity_counter
 
         # Create all tables
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+
+    # Partitioned tables (PostgreSQL) need partitions before inserts
+    from ..services.activity_partitions import activity_retention, is_partitioned
+
+    async with AsyncSessionLocal() as db:
+        if await is_partitioned(db):
+            await activity_retention.ensure_partitions(db)
+            await db.commit()
@@ -14,6 +14,14 @@ from .core.middleware import (
     LoggingMiddleware
 )
 from .db.base import init_db
+from .services.session_store import get_session_store
+from .services.session_activity import session_activity
+from .services.google_verifier import google_verifier
+from .services.activity_ingest import activity_ingestor
+from .services.activity_partitions import activity_retention
+from .services.activity_hub import activity_hub
+from .services.domain_counts import domain_count_reconciler
+from .services.invalidation import get_invalidation_bus
 from .api.auth import auth_router
 from .api.admin import admin_router
 from .api.activity import activity_router
@@ -44,10 +52,26 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
 
+    # Start background flushers and refreshers
+    await get_invalidation_bus().start()
+    session_activity.start()
+    google_verifier.start()
+    activity_ingestor.start()
+    activity_retention.start()
+    domain_count_reconciler.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down application")
+    activity_hub.close_all()
+    await domain_count_reconciler.stop()
+    await activity_retention.stop()
+    await activity_ingestor.stop()
+    await google_verifier.stop()
+    await session_activity.stop()
+    await get_session_store().close()
+    await get_invalidation_bus().stop()
 
 
 # Create FastAPI app
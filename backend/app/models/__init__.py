@@ -3,12 +3,21 @@
 from .user import User, UserRole
 from .session import Session
 from .domain_whitelist import DomainWhitelist
+from .activity_dictionary import ActivityApp, ActivityAction, ActivityDomain
 from .activity_log import ActivityLog
+from .activity_rollup import ActivityRollup, ActivityRollupUser
+from .activity_counter import ActivityCounter
 
 __all__ = [
     "User",
     "UserRole",
     "Session",
     "DomainWhitelist",
+    "ActivityApp",
+    "ActivityAction",
+    "ActivityDomain",
     "ActivityLog",
+    "ActivityRollup",
+    "ActivityRollupUser",
+    "ActivityCounter",
 ]
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""Maintained activity counts."""
+
+from sqlalchemy import Column, String, BigInteger, Integer
+
+from ..db.base import Base
+
+
+class ActivityCounter(Base):
+    """Number of activity_logs rows in one scope.
+
+    ``scope`` is ``all`` or ``<column>:<value>`` for user_email, app_key,
+    action_key and domain_key. Kept in step with activity_logs by ingestion
+    and retention where planner estimates are unavailable (SQLite).
+    """
+
+    __tablename__ = "activity_counters"
+
+    scope = Column(String, primary_key=True)
+    value = Column(BigInteger().with_variant(Integer(), "sqlite"), default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<ActivityCounter(scope={self.scope}, value={self.value})>"
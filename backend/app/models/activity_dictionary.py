@@ -0,0 +1,49 @@
+"""Lookup tables for repeated activity values."""
+
+from sqlalchemy import Column, String, Integer, UniqueConstraint
+
+from ..db.base import Base
+
+# INTEGER: values come from clients, so SMALLINT's 32767 keys could run out
+LookupKey = Integer()
+
+
+class ActivityApp(Base):
+    """Application an activity happened in (ID and display name)."""
+
+    __tablename__ = "activity_apps"
+
+    id = Column(LookupKey, primary_key=True, autoincrement=True)
+    app_id = Column(String, nullable=False)
+    app_name = Column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("app_id", "app_name", name="uq_activity_apps_app_id_app_name"),
+    )
+
+    def __repr__(self):
+        return f"<ActivityApp(id={self.id}, app_id={self.app_id}, app_name={self.app_name})>"
+
+
+class ActivityAction(Base):
+    """Action name."""
+
+    __tablename__ = "activity_actions"
+
+    id = Column(LookupKey, primary_key=True, autoincrement=True)
+    name = Column(String, unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<ActivityAction(id={self.id}, name={self.name})>"
+
+
+class ActivityDomain(Base):
+    """User email domain."""
+
+    __tablename__ = "activity_domains"
+
+    id = Column(LookupKey, primary_key=True, autoincrement=True)
+    name = Column(String, unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<ActivityDomain(id={self.id}, name={self.name})>"
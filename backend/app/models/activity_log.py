@@ -1,36 +1,118 @@
 """Activity log model for tracking user actions."""
 
-from sqlalchemy import Column, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Index, DDL, event, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from ..db.base import Base
+from .activity_dictionary import LookupKey
+
+
+# Metadata search (see services/activity_search.py). On PostgreSQL,
+# action_metadata is JSONB with a GIN index for containment and one over
+# its keys and values as a text search vector (METADATA_TSVECTOR).
+METADATA_TSVECTOR = "jsonb_to_tsvector('simple', action_metadata, '[\"key\", \"string\", \"numeric\", \"boolean\"]')"
+
+# On SQLite, an FTS5 shadow table holds each row's metadata as "key value"
+# pairs (one per scalar leaf), kept in step by triggers. id_token, the ID
+# without its prefix, is a single token so deletes can find their row.
+METADATA_FTS_TABLE = "activity_metadata_fts"
+_FTS_ID_TOKEN = "substr({row}.id, instr({row}.id, '_') + 1)"
+_FTS_BODY = (
+    "group_concat(leaf.key || ' ' || CASE leaf.type"
+    " WHEN 'true' THEN 'true' WHEN 'false' THEN 'false' WHEN 'null' THEN 'null'"
+    " ELSE leaf.value END, ' ')"
+)
+_FTS_LEAVES = "json_tree({row}.action_metadata) AS leaf WHERE leaf.type NOT IN ('object', 'array')"
+
+METADATA_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {METADATA_FTS_TABLE} "
+    "USING fts5(activity_id UNINDEXED, id_token, body)",
+    f"""CREATE TRIGGER IF NOT EXISTS activity_logs_metadata_fts_insert AFTER INSERT ON activity_logs BEGIN
+    INSERT INTO {METADATA_FTS_TABLE} (activity_id, id_token, body)
+    SELECT new.id, {_FTS_ID_TOKEN.format(row="new")}, {_FTS_BODY}
+    FROM {_FTS_LEAVES.format(row="new")}
+    HAVING count(*) > 0;
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS activity_logs_metadata_fts_delete AFTER DELETE ON activity_logs BEGIN
+    DELETE FROM {METADATA_FTS_TABLE} WHERE rowid IN (
+        SELECT rowid FROM {METADATA_FTS_TABLE}
+        WHERE {METADATA_FTS_TABLE} MATCH 'id_token:' || {_FTS_ID_TOKEN.format(row="old")}
+    );
+END""",
+)
+
+# Index metadata of rows written before the triggers existed
+METADATA_FTS_BACKFILL = f"""
+    INSERT INTO {METADATA_FTS_TABLE} (activity_id, id_token, body)
+    SELECT log.id, {_FTS_ID_TOKEN.format(row="log")}, {_FTS_BODY}
+    FROM activity_logs AS log, {_FTS_LEAVES.format(row="log")}
+    GROUP BY log.id
+"""
 
 
 class ActivityLog(Base):
-    """Activity log for tracking user actions across applications."""
+    """Activity log for tracking user actions across applications.
+
+    App, action and domain are stored as integer keys into lookup tables
+    (see activity_dictionary.py); services/activity_dictionary.py maps them
+    to and from names.
+    """
 
     __tablename__ = "activity_logs"
 
-    id = Column(String, primary_key=True, index=True)  # act_timestamp_random
+    id = Column(String, primary_key=True)  # act_ + time-sortable ID, see core/ids.py
     user_id = Column(String, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
-    user_email = Column(String, nullable=False, index=True)  # Store email directly for history
+    user_email = Column(String, nullable=False)  # Store email directly for history
     user_role = Column(String, nullable=False)
-    user_domain = Column(String, nullable=False, index=True)
+    domain_key = Column(LookupKey, ForeignKey("activity_domains.id"), nullable=False)
 
     # Application information
-    app_id = Column(String, nullable=False, index=True)
-    app_name = Column(String, nullable=False)
+    app_key = Column(LookupKey, ForeignKey("activity_apps.id"), nullable=False)
 
     # Action details
-    action = Column(String, nullable=False, index=True)
-    action_metadata = Column(JSON, nullable=True)  # Additional action-specific data
+    action_key = Column(LookupKey, ForeignKey("activity_actions.id"), nullable=False)
+    action_metadata = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)  # Additional action-specific data
 
     # Timestamp
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # IDs sort by creation time: the primary key serves "latest N" for
+    # everyone, these serve it per filter (see services/activity_query.py).
+    # On PostgreSQL the table is range-partitioned by month on id (see
+    # services/activity_partitions.py)
+    __table_args__ = (
+        Index("ix_activity_logs_user_email_id", "user_email", "id"),
+        Index("ix_activity_logs_app_key_action_key_id", "app_key", "action_key", "id"),
+        Index("ix_activity_logs_app_key_id", "app_key", "id"),
+        Index("ix_activity_logs_action_key_id", "action_key", "id"),
+        Index("ix_activity_logs_domain_key_id", "domain_key", "id"),
+        Index(
+            "ix_activity_logs_action_metadata",
+            "action_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"action_metadata": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_activity_logs_action_metadata_text",
+            text(METADATA_TSVECTOR),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        {"postgresql_partition_by": "RANGE (id)"},
+    )
 
     # Relationships
     user = relationship("User", backref="activities", lazy="select")
 
     def __repr__(self):
-        return f"<ActivityLog(id={self.id}, user={self.user_email}, action={self.action})>"
\ No newline at end of file
+        return f"<ActivityLog(id={self.id}, user={self.user_email}, action_key={self.action_key})>"
+
+
+for statement in METADATA_FTS_DDL:
+    event.listen(ActivityLog.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    ActivityLog.__table__,
+    "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {METADATA_FTS_TABLE}").execute_if(dialect="sqlite")
+)
@@ -0,0 +1,44 @@
+"""Pre-aggregated activity counts."""
+
+from sqlalchemy import Column, String, DateTime, Integer
+
+from ..db.base import Base
+
+
+class ActivityRollup(Base):
+    """Event and distinct-user counts per (period, bucket, app, action, domain).
+
+    ``bucket`` is the UTC start of the hour or day the counts cover.
+    ``distinct_users`` is exact within one bucket; it cannot be summed
+    across buckets.
+    """
+
+    __tablename__ = "activity_rollups"
+
+    period = Column(String, primary_key=True)  # hour, day
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    app_id = Column(String, primary_key=True)
+    action = Column(String, primary_key=True)
+    user_domain = Column(String, primary_key=True)
+
+    event_count = Column(Integer, default=0, nullable=False)
+    distinct_users = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<ActivityRollup(period={self.period}, bucket={self.bucket}, app={self.app_id}, action={self.action})>"
+
+
+class ActivityRollupUser(Base):
+    """Users already counted in a rollup row, for distinct-user counts."""
+
+    __tablename__ = "activity_rollup_users"
+
+    period = Column(String, primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    app_id = Column(String, primary_key=True)
+    action = Column(String, primary_key=True)
+    user_domain = Column(String, primary_key=True)
+    user_email = Column(String, primary_key=True)
+
+    def __repr__(self):
+        return f"<ActivityRollupUser(bucket={self.bucket}, user={self.user_email})>"
@@ -1,6 +1,6 @@
 """Session model for managing user sessions."""
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
@@ -14,7 +14,7 @@ class Session(Base):
     __tablename__ = "sessions"
 
     id = Column(String, primary_key=True, index=True)  # Session ID (hex token)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     csrf_token = Column(String, nullable=False)
 
     # Timestamps
@@ -26,6 +26,11 @@ class Session(Base):
     ip_address = Column(String, nullable=True)
     user_agent = Column(Text, nullable=True)
 
+    # A user's unexpired sessions in one range scan
+    __table_args__ = (
+        Index("ix_sessions_user_id_expires_at", "user_id", "expires_at"),
+    )
+
     # Relationships
     user = relationship("User", backref="sessions", lazy="joined")
 
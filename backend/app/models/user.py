@@ -1,11 +1,13 @@
 """User model definition."""
 
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, Boolean
+from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, Boolean, Index, event, inspect, update
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
 
 from ..db.base import Base
+from .domain_whitelist import DomainWhitelist
 
 
 class UserRole(str, enum.Enum):
@@ -16,6 +18,11 @@ class UserRole(str, enum.Enum):
     DEFAULT = "default"
 
 
+def email_domain_of(email: str) -> str:
+    """Get the (lowercase) domain part of an email address."""
+    return email.rsplit("@", 1)[1].lower() if "@" in email else ""
+
+
 class User(Base):
     """User model for authentication and authorization."""
 
@@ -23,6 +30,7 @@ class User(Base):
 
     id = Column(String, primary_key=True, index=True)  # Google sub ID
     email = Column(String, unique=True, index=True, nullable=False)
+    email_domain = Column(String, index=True, nullable=True)  # Set from email, see email_domain_of
     name = Column(String, nullable=False)
     role = Column(SQLEnum(UserRole), default=UserRole.DEFAULT, nullable=False)
     picture = Column(String, nullable=True)
@@ -38,11 +46,59 @@ class User(Base):
     revoked_by = Column(String, nullable=True)
     updated_by = Column(String, nullable=True)
 
-    # Domain from email (computed)
+    # Admin listing: ordered by last login, searched by name prefix
+    __table_args__ = (
+        Index("ix_users_last_login_id", "last_login", "id"),
+        Index("ix_users_name_lower", func.lower(name)),
+    )
+
+    @validates("email")
+    def _set_email_domain(self, key: str, email: str) -> str:
+        self.email_domain = email_domain_of(email)
+        return email
+
     @property
     def domain(self) -> str:
-        """Extract domain from email."""
-        return self.email.split("@")[1] if "@" in self.email else ""
+        """Get the email domain."""
+        return self.email_domain or email_domain_of(self.email or "")
 
     def __repr__(self):
-        return f"<User(id={self.id}, email={self.email}, role={self.role})>"
\ No newline at end of file
+        return f"<User(id={self.id}, email={self.email}, role={self.role})>"
+
+
+def adjust_domain_count(domain: str, delta: int):
+    """Build an UPDATE moving a domain's user count by ``delta``.
+
+    Core writes to users (e.g. the login upsert) must run it themselves.
+    """
+    return (
+        update(DomainWhitelist)
+        .where(DomainWhitelist.domain == domain)
+        .values(user_count=DomainWhitelist.user_count + delta)
+    )
+
+
+# DomainWhitelist.user_count is kept in step with users in the same flush;
+# writes that bypass the ORM are corrected by services/domain_counts.py
+def _adjust_domain_count(connection, domain: str, delta: int) -> None:
+    if domain:
+        connection.execute(adjust_domain_count(domain, delta))
+
+
+@event.listens_for(User, "after_insert")
+def _count_inserted_user(mapper, connection, user: User) -> None:
+    _adjust_domain_count(connection, user.email_domain, 1)
+
+
+@event.listens_for(User, "after_delete")
+def _count_deleted_user(mapper, connection, user: User) -> None:
+    _adjust_domain_count(connection, user.email_domain, -1)
+
+
+@event.listens_for(User, "after_update")
+def _count_moved_user(mapper, connection, user: User) -> None:
+    history = inspect(user).attrs.email_domain.history
+    if history.has_changes():
+        for old_domain in history.deleted:
+            _adjust_domain_count(connection, old_domain, -1)
+        _adjust_domain_count(connection, user.email_domain, 1)
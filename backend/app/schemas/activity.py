@@ -5,13 +5,35 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 
+# Identifiers (app IDs, actions): letters, digits and _ . : / -
+IDENTIFIER_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_.:/-]*$"
+# Display names: any printable text
+DISPLAY_NAME_PATTERN = r"^[^\x00-\x1f\x7f]+$"
+
+
 class TrackActivityRequest(BaseModel):
     """Request schema for tracking activity."""
 
-    appId: str = Field(..., description="Application ID")
-    appName: str = Field(..., description="Application name")
-    action: str = Field(..., description="Action performed")
+    appId: str = Field(..., max_length=64, pattern=IDENTIFIER_PATTERN, description="Application ID")
+    appName: str = Field(..., max_length=128, pattern=DISPLAY_NAME_PATTERN, description="Application name")
+    action: str = Field(..., max_length=64, pattern=IDENTIFIER_PATTERN, description="Action performed")
     metadata: Optional[Dict[str, Any]] = Field(default={}, description="Additional metadata")
+    idempotencyKey: Optional[str] = Field(
+        default=None,
+        max_length=128,
+        description="Client key for this event; retries with the same key are recorded once"
+    )
+
+
+class TrackActivityBatchRequest(BaseModel):
+    """Request schema for tracking several activities at once."""
+
+    events: List[TrackActivityRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Activities to track (max 100)"
+    )
 
 
 class ActivityResponse(BaseModel):
@@ -21,6 +43,13 @@ class ActivityResponse(BaseModel):
     activity: dict
 
 
+class ActivityBatchResponse(BaseModel):
+    """Response schema for batch activity tracking."""
+
+    success: bool = True
+    activities: List[dict]
+
+
 class ActivityInfo(BaseModel):
     """Activity information schema."""
 
@@ -42,5 +71,8 @@ class ActivitiesListResponse(BaseModel):
     """Response schema for activities list."""
 
     activities: List[ActivityInfo]
-    total: int
-    user: str
\ No newline at end of file
+    total: Optional[int] = None  # Only computed when requested
+    totalMode: Optional[str] = None  # exact, cached or estimated
+    user: str
+    nextCursor: Optional[str] = None  # Older activities
+    prevCursor: Optional[str] = None  # Newer activities
\ No newline at end of file
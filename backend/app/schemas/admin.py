@@ -1,7 +1,7 @@
 """Admin schemas for request/response validation."""
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from datetime import datetime
 
 from ..models.user import UserRole
@@ -29,8 +29,9 @@ class UsersListResponse(BaseModel):
     """Response schema for users list."""
 
     users: List[UserWithSessions]
-    total: int
-    activeSessions: int
+    total: Optional[int] = None  # Only computed when requested
+    activeSessions: int  # Across the returned page
+    nextCursor: Optional[str] = None
 
 
 class UpdateUserRoleRequest(BaseModel):
@@ -61,6 +62,36 @@ class RevokeUserResponse(BaseModel):
     user: dict
 
 
+class BulkUpdateUserRolesRequest(BaseModel):
+    """Request schema for updating several users' roles."""
+
+    users: List[UpdateUserRoleRequest] = Field(..., min_length=1, max_length=500)
+
+
+class BulkRevokeUsersRequest(BaseModel):
+    """Request schema for revoking several users' access."""
+
+    emails: List[EmailStr] = Field(..., min_length=1, max_length=500)
+
+
+class BulkItemResult(BaseModel):
+    """Outcome for one item of a bulk operation."""
+
+    item: str  # Email or domain
+    status: str  # e.g. updated, revoked, added, removed, not_found, exists, rejected
+    detail: Optional[str] = None
+    revokedSessions: Optional[int] = None
+
+
+class BulkOperationResponse(BaseModel):
+    """Response schema for bulk operations, one result per distinct item in request order."""
+
+    success: bool = True  # False when any item failed
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
 class DomainInfo(BaseModel):
     """Domain information schema."""
 
@@ -78,10 +109,13 @@ class DomainsListResponse(BaseModel):
     total: int
 
 
+DOMAIN_PATTERN = r"^[a-z0-9]+([-.]a-z0-9]+)*\.[a-z]{2,}$"
+
+
 class AddDomainRequest(BaseModel):
     """Request schema for adding domain."""
 
-    domain: str = Field(..., pattern=r"^[a-z0-9]+([-.]a-z0-9]+)*\.[a-z]{2,}$")
+    domain: str = Field(..., pattern=DOMAIN_PATTERN)
 
 
 class AddDomainResponse(BaseModel):
@@ -94,4 +128,59 @@ class AddDomainResponse(BaseModel):
 class RemoveDomainRequest(BaseModel):
     """Request schema for removing domain."""
 
-    domain: str
\ No newline at end of file
+    domain: str
+
+
+class BulkAddDomainsRequest(BaseModel):
+    """Request schema for adding several domains."""
+
+    domains: List[Annotated[str, Field(pattern=DOMAIN_PATTERN)]] = Field(..., min_length=1, max_length=500)
+
+
+class BulkRemoveDomainsRequest(BaseModel):
+    """Request schema for removing several domains."""
+
+    domains: List[str] = Field(..., min_length=1, max_length=500)
+
+
+class AnalyticsBucket(BaseModel):
+    """Counts for one (bucket, app, action, domain) rollup."""
+
+    bucket: datetime
+    appId: str
+    action: str
+    userDomain: str
+    events: int
+    distinctUsers: int
+
+
+class AnalyticsResponse(BaseModel):
+    """Response schema for activity analytics."""
+
+    period: str
+    from_: datetime = Field(..., alias="from")
+    to: datetime
+    buckets: List[AnalyticsBucket]
+    totalEvents: int
+
+    model_config = {"populate_by_name": True}
+
+
+class RebuildRollupsRequest(BaseModel):
+    """Request schema for rebuilding rollups over a time range."""
+
+    from_: datetime = Field(..., alias="from")
+    to: datetime
+
+    model_config = {"populate_by_name": True}
+
+
+class RebuildRollupsResponse(BaseModel):
+    """Response schema for a rollup rebuild."""
+
+    success: bool = True
+    from_: datetime = Field(..., alias="from")
+    to: datetime
+    events: int
+
+    model_config = {"populate_by_name": True}
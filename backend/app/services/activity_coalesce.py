@@ -0,0 +1,188 @@
+"""Coalescing of repeated activity events and idempotent retries."""
+
+import json
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.config import settings
+
+# action_metadata keys added to a row that absorbed repeats
+REPEAT_COUNT_KEY = "repeatCount"
+LAST_REPEAT_KEY = "lastRepeatAt"
+
+Row = Dict[str, Any]
+
+
+def coalesce_key(row: Row) -> Tuple[Any, ...]:
+    """Get what makes two activity events identical."""
+    return (
+        row["user_email"],
+        row["app_id"],
+        row["app_name"],
+        row["action"],
+        json.dumps(row["action_metadata"], sort_keys=True, default=str),
+    )
+
+
+class CoalescePlan:
+    """What ``ActivityCoalescer.plan`` decided for a list of rows."""
+
+    def __init__(self):
+        # Row each input ended up in, in input order
+        self.results: List[Row] = []
+        # Rows to write
+        self.new_rows: List[Row] = []
+        self.merges: List[Tuple[Row, Row]] = []
+        self.keys: List[Tuple[Tuple[str, str], Row]] = []
+        self.opened: List[Tuple[Tuple[Any, ...], Row]] = []
+        self.coalesced = 0
+        self.duplicates = 0
+
+
+def _add_repeat(target: Row, row: Row) -> None:
+    """Record a repeated event on the row that absorbs it."""
+    metadata = target["action_metadata"]
+    metadata[REPEAT_COUNT_KEY] = metadata.get(REPEAT_COUNT_KEY, 1) + 1
+    metadata[LAST_REPEAT_KEY] = row["timestamp"].isoformat()
+
+
+class ActivityCoalescer:
+    """Merge repeated activity events into the row already pending for them.
+
+    An event identical to one accepted less than ``window`` seconds earlier
+    (same user, app, action and metadata) whose row is still waiting to be
+    written becomes part of that row: its action_metadata gets a
+    ``repeatCount`` (events in the row) and ``lastRepeatAt``. A row stops
+    absorbing repeats once the writer takes it, so the effective window is
+    at most ACTIVITY_FLUSH_INTERVAL. Rollups count rows, not repeats.
+
+    Separately, the row recorded for each (user, idempotency key) is kept
+    in a set bounded to ``max_keys`` (least recently used evicted); a retry
+    with a remembered key is not written again and gets the original row.
+    """
+
+    def __init__(self, window: float = 0.0, max_keys: int = 10000):
+        self.window = timedelta(seconds=window)
+        self.max_keys = max_keys
+        self._open: Dict[Tuple[Any, ...], Row] = {}
+        self._open_keys: Dict[str, Tuple[Any, ...]] = {}
+        self._seen: "OrderedDict[Tuple[str, str], Row]" = OrderedDict()
+
+        # Counters
+        self.coalesced = 0
+        self.duplicates = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Check if repeated events are coalesced."""
+        return self.window > timedelta(0)
+
+    def _mergeable(self, target: Optional[Row], row: Row) -> bool:
+        return target is not None and row["timestamp"] - target["timestamp"] < self.window
+
+    def plan(self, rows: List[Row], idempotency_keys: Optional[Sequence[Optional[str]]] = None) -> CoalescePlan:
+        """Decide which rows are new, repeats or retries.
+
+        Only rows in ``rows`` are changed (repeats within the list are merged
+        right away); pending rows and remembered keys change in ``accept``.
+        """
+        plan = CoalescePlan()
+        planned_keys: Dict[Tuple[str, str], Row] = {}
+        planned_open: Dict[Tuple[Any, ...], Row] = {}
+
+        for index, row in enumerate(rows):
+            idempotency_key = idempotency_keys[index] if idempotency_keys else None
+            seen_key = (row["user_email"], idempotency_key) if idempotency_key else None
+            if seen_key is not None:
+                original = planned_keys.get(seen_key) or self._seen.get(seen_key)
+                if original is not None:
+                    plan.results.append(original)
+                    plan.duplicates += 1
+                    continue
+
+            target = None
+            if self.enabled:
+                key = coalesce_key(row)
+                target = planned_open.get(key)
+                if self._mergeable(target, row):
+                    _add_repeat(target, row)
+                else:
+                    target = self._open.get(key)
+                    if self._mergeable(target, row):
+                        plan.merges.append((target, row))
+                    else:
+                        target = None
+
+            if target is not None:
+                plan.coalesced += 1
+            else:
+                target = row
+                plan.new_rows.append(row)
+                if self.enabled:
+                    planned_open[key] = row
+                    plan.opened.append((key, row))
+
+            if seen_key is not None:
+                planned_keys[seen_key] = target
+                plan.keys.append((seen_key, target))
+            plan.results.append(target)
+
+        return plan
+
+    def accept(self, plan: CoalescePlan, pending: bool = True) -> None:
+        """Apply a plan once its new rows were queued (``pending``) or written."""
+        for target, row in plan.merges:
+            _add_repeat(target, row)
+        self.coalesced += plan.coalesced
+        self.duplicates += plan.duplicates
+
+        if pending:
+            for key, row in plan.opened:
+                self._open[key] = row
+                self._open_keys[row["id"]] = key
+
+        for seen_key, row in plan.keys:
+            self._seen[seen_key] = row
+            self._seen.move_to_end(seen_key)
+        while len(self._seen) > self.max_keys:
+            self._seen.popitem(last=False)
+
+    def close(self, rows: List[Row]) -> None:
+        """Stop rows from absorbing repeats (the writer has taken them)."""
+        if not self._open_keys:
+            return
+        for row in rows:
+            key = self._open_keys.pop(row["id"], None)
+            if key is not None and self._open.get(key) is row:
+                del self._open[key]
+
+    def forget(self, rows: List[Row]) -> None:
+        """Drop idempotency keys pointing at rows that failed to be written."""
+        row_ids = {row["id"] for row in rows}
+        for seen_key, row in list(self._seen.items()):
+            if row["id"] in row_ids:
+                del self._seen[seen_key]
+
+    def clear(self) -> None:
+        """Drop all pending rows and remembered keys."""
+        self._open.clear()
+        self._open_keys.clear()
+        self._seen.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get coalescing counters."""
+        return {
+            "windowSeconds": self.window.total_seconds(),
+            "openRows": len(self._open),
+            "idempotencyKeys": len(self._seen),
+            "coalesced": self.coalesced,
+            "duplicates": self.duplicates,
+        }
+
+
+# Create a single coalescer instance
+activity_coalescer = ActivityCoalescer(
+    window=settings.ACTIVITY_COALESCE_WINDOW,
+    max_keys=settings.ACTIVITY_IDEMPOTENCY_MAX_KEYS,
+)
@@ -0,0 +1,82 @@
+"""Maintained per-scope activity counters (SQLite count estimates)."""
+
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import select, delete, insert, func, literal, cast, String
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.base import upsert, is_postgresql
+from ..models import ActivityLog, ActivityCounter
+
+# Columns with a counter per value, besides the overall one
+COUNTER_COLUMNS = ("user_email", "app_key", "action_key", "domain_key")
+ALL_SCOPE = "all"
+
+# Rows per INSERT, keeping well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+
+def counter_scope(column: str, value: Any) -> str:
+    """Get the counter scope for one column value."""
+    return f"{column}:{value}"
+
+
+def _scopes(row: Dict[str, Any]) -> Iterable[str]:
+    yield ALL_SCOPE
+    for column in COUNTER_COLUMNS:
+        yield counter_scope(column, row[column])
+
+
+async def apply_counters(db: AsyncSession, rows: List[Dict[str, Any]], sign: int = 1) -> None:
+    """Add encoded activity rows to the counters (or subtract, with sign -1).
+
+    Runs in the caller's transaction, so counters commit (or roll back)
+    together with the events. PostgreSQL estimates counts from planner
+    statistics instead, so nothing is maintained there.
+    """
+    if not rows or is_postgresql():
+        return
+
+    deltas: Dict[str, int] = {}
+    for row in rows:
+        for scope in _scopes(row):
+            deltas[scope] = deltas.get(scope, 0) + sign
+
+    values = [{"scope": scope, "value": delta} for scope, delta in deltas.items()]
+    for i in range(0, len(values), CHUNK_SIZE):
+        stmt = upsert(ActivityCounter).values(values[i:i + CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["scope"],
+            set_={"value": ActivityCounter.value + stmt.excluded.value}
+        )
+        await db.execute(stmt)
+
+
+async def read_counters(db: AsyncSession, scopes: List[str]) -> Dict[str, int]:
+    """Get counter values by scope (missing scopes are zero)."""
+    result = await db.execute(
+        select(ActivityCounter.scope, ActivityCounter.value)
+        .where(ActivityCounter.scope.in_(scopes))
+    )
+    values = dict(result.all())
+    return {scope: values.get(scope, 0) for scope in scopes}
+
+
+async def rebuild_counters(db: AsyncSession) -> None:
+    """Recompute every counter from activity_logs, in the caller's transaction."""
+    await db.execute(delete(ActivityCounter))
+    await db.execute(
+        insert(ActivityCounter).from_select(
+            ["scope", "value"],
+            select(literal(ALL_SCOPE), func.count()).select_from(ActivityLog)
+        )
+    )
+    for name in COUNTER_COLUMNS:
+        column = getattr(ActivityLog, name)
+        await db.execute(
+            insert(ActivityCounter).from_select(
+                ["scope", "value"],
+                select(literal(f"{name}:") + cast(column, String), func.count())
+                .group_by(column)
+            )
+        )
@@ -0,0 +1,183 @@
+"""Exact, cached and estimated activity counts."""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.base import is_postgresql
+from ..models import ActivityLog
+from .activity_counters import ALL_SCOPE, counter_scope, read_counters
+from .activity_query import ActivityQuery
+
+COUNT_MODES = ("exact", "cached", "estimated")
+
+# Sum of row estimates over activity_logs and its partitions; -1 means
+# a table was never analyzed
+_RELTUPLES_SQL = text("""
+    SELECT sum(c.reltuples) FILTER (WHERE c.reltuples >= 0),
+           count(*) FILTER (WHERE c.reltuples < 0)
+    FROM pg_class c
+    WHERE c.relkind = 'r'
+      AND (c.oid = 'activity_logs'::regclass
+           OR c.oid IN (SELECT inhrelid FROM pg_inherits
+                        WHERE inhparent = 'activity_logs'::regclass))
+""")
+
+
+class ActivityCounts:
+    """Count matching activities using one of three strategies.
+
+    - ``exact``: ``COUNT(*)`` over the matching rows.
+    - ``cached``: an exact count kept for ``ttl`` seconds. Entries are
+      dropped as soon as this worker ingests a row they match; other
+      workers' writes show up once the entry expires.
+    - ``estimated``: on PostgreSQL, ``pg_class.reltuples`` without filters
+      and the planner's row estimate with them; on SQLite, the maintained
+      counters in activity_counters, which cover no filter or one of
+      email, app, action or domain (without a time range or metadata
+      search).
+
+    ``count`` returns the number with the mode that produced it: a cache
+    miss reports ``exact``, and a filter set that cannot be estimated is
+    counted exactly.
+    """
+
+    def __init__(self, mode: str = "exact", ttl: float = 30.0, max_entries: int = 1000):
+        self.mode = mode
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[Any, ...], Tuple[int, float, ActivityQuery]]" = OrderedDict()
+
+        # Counters
+        self.exact_counts = 0
+        self.cache_hits = 0
+        self.estimates = 0
+        self.invalidations = 0
+
+    async def count(
+        self,
+        db: AsyncSession,
+        query: ActivityQuery,
+        mode: Optional[str] = None
+    ) -> Tuple[int, str]:
+        """Count activities matching a query; returns (count, mode used)."""
+        mode = mode or self.mode
+        if mode == "cached":
+            value = self._cached(query)
+            if value is not None:
+                self.cache_hits += 1
+                return value, "cached"
+            value = await self.exact(db, query)
+            self._store(query, value)
+            return value, "exact"
+
+        if mode == "estimated":
+            if is_postgresql():
+                value = await self._estimate_postgresql(db, query)
+            else:
+                value = await self._estimate_counters(db, query)
+            if value is not None:
+                self.estimates += 1
+                return value, "estimated"
+
+        return await self.exact(db, query), "exact"
+
+    async def exact(self, db: AsyncSession, query: ActivityQuery) -> int:
+        """Count matching rows."""
+        self.exact_counts += 1
+        result = await db.execute(select(func.count()).select_from(ActivityLog).where(*query.where()))
+        return result.scalar() or 0
+
+    def _cached(self, query: ActivityQuery) -> Optional[int]:
+        entry = self._cache.get(query.key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[query.key]
+            return None
+        return value
+
+    def _store(self, query: ActivityQuery, value: int) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        self._cache[query.key] = (value, time.monotonic() + self.ttl, query)
+        self._cache.move_to_end(query.key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _estimate_postgresql(self, db: AsyncSession, query: ActivityQuery) -> Optional[int]:
+        """Get the statistics-based row estimate."""
+        conditions = query.where()
+        if not conditions:
+            result = await db.execute(_RELTUPLES_SQL)
+            estimate, unanalyzed = result.one()
+            if estimate is not None and not unanalyzed:
+                return int(estimate)
+
+        # Ask the planner; values are inlined since EXPLAIN takes no parameters
+        statement = select(ActivityLog.id).where(*conditions).compile(
+            dialect=db.bind.dialect,
+            compile_kwargs={"literal_binds": True}
+        )
+        connection = await db.connection()
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}")
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def _estimate_counters(self, db: AsyncSession, query: ActivityQuery) -> Optional[int]:
+        """Read maintained counters; None when the filters have no counter."""
+        if query.start is not None or query.end is not None or query.search is not None:
+            return None
+
+        filters = {name: value for name, value in query.values.items() if value is not None}
+        if not filters:
+            scopes = [ALL_SCOPE]
+        elif len(filters) == 1:
+            (name, value), = filters.items()
+            # An app ID can map to several lookup keys (one per app name)
+            scopes = [counter_scope(name, item) for item in (value if isinstance(value, list) else [value])]
+        else:
+            return None
+
+        values = await read_counters(db, scopes)
+        return max(sum(values.values()), 0)
+
+    def invalidate(self, rows: List[Dict[str, Any]]) -> None:
+        """Drop cached counts that newly written (encoded) rows match."""
+        if not self._cache:
+            return
+        for key, (_, _, query) in list(self._cache.items()):
+            if any(query.matches(row) for row in rows):
+                del self._cache[key]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all cached counts."""
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get count counters."""
+        return {
+            "mode": self.mode,
+            "cachedEntries": len(self._cache),
+            "exactCounts": self.exact_counts,
+            "cacheHits": self.cache_hits,
+            "estimates": self.estimates,
+            "invalidations": self.invalidations,
+        }
+
+
+# Create a single counts instance
+activity_counts = ActivityCounts(
+    mode=settings.ACTIVITY_COUNT_MODE,
+    ttl=settings.ACTIVITY_COUNT_CACHE_TTL,
+    max_entries=settings.ACTIVITY_COUNT_CACHE_SIZE,
+)
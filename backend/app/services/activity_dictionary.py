@@ -0,0 +1,260 @@
+"""In-process interning of activity apps, actions and domains."""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, KeysView, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.base import AsyncSessionLocal, upsert
+from ..models import ActivityApp, ActivityAction, ActivityDomain
+
+
+class LRUMap:
+    """Mapping that keeps the ``max_size`` most recently used entries."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def keys(self) -> KeysView:
+        return self._data.keys()
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class ActivityDictionary:
+    """Map activity names to lookup-table keys and back.
+
+    Entries are never changed or deleted once created, so cached entries
+    never go stale; each direction keeps the ``max_entries`` most recently
+    used. Inserts resolve names from the cache and only touch the database
+    for values not cached; new entries are created in their own committed
+    transaction, so a cached key always exists. Reads load keys created by
+    other workers (or evicted) on demand. ``max_entries`` must exceed the
+    distinct values in one page or batch.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._apps = LRUMap(max_entries)
+        self._actions = LRUMap(max_entries)
+        self._domains = LRUMap(max_entries)
+        self._app_names = LRUMap(max_entries)
+        self._action_names = LRUMap(max_entries)
+        self._domain_names = LRUMap(max_entries)
+        self._lock = asyncio.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def _caches(self) -> Tuple[LRUMap, ...]:
+        return (
+            self._apps, self._actions, self._domains,
+            self._app_names, self._action_names, self._domain_names
+        )
+
+    def _remember_app(self, key: int, app_id: str, app_name: str) -> None:
+        self._apps[(app_id, app_name)] = key
+        self._app_names[key] = (app_id, app_name)
+
+    def _remember_action(self, key: int, name: str) -> None:
+        self._actions[name] = key
+        self._action_names[key] = name
+
+    def _remember_domain(self, key: int, name: str) -> None:
+        self._domains[name] = key
+        self._domain_names[key] = name
+
+    async def _create(
+        self,
+        apps: Iterable[Tuple[str, str]],
+        actions: Iterable[str],
+        domains: Iterable[str]
+    ) -> None:
+        """Insert missing entries (ignoring races) and cache their keys."""
+        apps, actions, domains = list(apps), list(actions), list(domains)
+        async with AsyncSessionLocal() as db:
+            if apps:
+                await db.execute(
+                    upsert(ActivityApp).values(
+                        [{"app_id": app_id, "app_name": app_name} for app_id, app_name in apps]
+                    ).on_conflict_do_nothing()
+                )
+            for model, names in ((ActivityAction, actions), (ActivityDomain, domains)):
+                if names:
+                    await db.execute(
+                        upsert(model).values([{"name": name} for name in names]).on_conflict_do_nothing()
+                    )
+            await db.commit()
+
+            if apps:
+                app_ids = {app_id for app_id, _ in apps}
+                result = await db.execute(
+                    select(ActivityApp.id, ActivityApp.app_id, ActivityApp.app_name)
+                    .where(ActivityApp.app_id.in_(app_ids))
+                )
+                for key, app_id, app_name in result.all():
+                    self._remember_app(key, app_id, app_name)
+            if actions:
+                result = await db.execute(
+                    select(ActivityAction.id, ActivityAction.name).where(ActivityAction.name.in_(actions))
+                )
+                for key, name in result.all():
+                    self._remember_action(key, name)
+            if domains:
+                result = await db.execute(
+                    select(ActivityDomain.id, ActivityDomain.name).where(ActivityDomain.name.in_(domains))
+                )
+                for key, name in result.all():
+                    self._remember_domain(key, name)
+
+    async def encode(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Get activity_logs rows for rows carrying names.
+
+        Input rows keep app_id, app_name, action and user_domain; the
+        returned rows carry app_key, action_key and domain_key instead.
+        """
+        missing_apps = {
+            (row["app_id"], row["app_name"]) for row in rows
+        } - self._apps.keys()
+        missing_actions = {row["action"] for row in rows} - self._actions.keys()
+        missing_domains = {row["user_domain"] for row in rows} - self._domains.keys()
+
+        if missing_apps or missing_actions or missing_domains:
+            self.misses += 1
+            async with self._lock:
+                await self._create(
+                    missing_apps - self._apps.keys(),
+                    missing_actions - self._actions.keys(),
+                    missing_domains - self._domains.keys(),
+                )
+        else:
+            self.hits += 1
+
+        encoded = []
+        for row in rows:
+            values = {
+                key: value for key, value in row.items()
+                if key not in ("app_id", "app_name", "action", "user_domain")
+            }
+            values["app_key"] = self._apps[(row["app_id"], row["app_name"])]
+            values["action_key"] = self._actions[row["action"]]
+            values["domain_key"] = self._domains[row["user_domain"]]
+            encoded.append(values)
+        return encoded
+
+    async def load(self, db: AsyncSession, rows: Iterable[Any]) -> None:
+        """Make sure the keys used by activity rows are cached."""
+        rows = list(rows)
+        app_keys = {row.app_key for row in rows} - self._app_names.keys()
+        action_keys = {row.action_key for row in rows} - self._action_names.keys()
+        domain_keys = {row.domain_key for row in rows} - self._domain_names.keys()
+        if not (app_keys or action_keys or domain_keys):
+            return
+
+        self.loads += 1
+        if app_keys:
+            result = await db.execute(
+                select(ActivityApp.id, ActivityApp.app_id, ActivityApp.app_name)
+                .where(ActivityApp.id.in_(app_keys))
+            )
+            for key, app_id, app_name in result.all():
+                self._remember_app(key, app_id, app_name)
+        if action_keys:
+            result = await db.execute(
+                select(ActivityAction.id, ActivityAction.name).where(ActivityAction.id.in_(action_keys))
+            )
+            for key, name in result.all():
+                self._remember_action(key, name)
+        if domain_keys:
+            result = await db.execute(
+                select(ActivityDomain.id, ActivityDomain.name).where(ActivityDomain.id.in_(domain_keys))
+            )
+            for key, name in result.all():
+                self._remember_domain(key, name)
+
+    def names(self, row: Any) -> Dict[str, str]:
+        """Get the names for a loaded activity row's keys."""
+        app_id, app_name = self._app_names[row.app_key]
+        return {
+            "app_id": app_id,
+            "app_name": app_name,
+            "action": self._action_names[row.action_key],
+            "user_domain": self._domain_names[row.domain_key],
+        }
+
+    async def app_keys(self, db: AsyncSession, app_id: str) -> List[int]:
+        """Get the keys of an application ID (one per display name seen)."""
+        result = await db.execute(
+            select(ActivityApp.id, ActivityApp.app_name).where(ActivityApp.app_id == app_id)
+        )
+        keys = []
+        for key, app_name in result.all():
+            self._remember_app(key, app_id, app_name)
+            keys.append(key)
+        return keys
+
+    async def action_key(self, db: AsyncSession, name: str) -> Optional[int]:
+        """Get an action's key, or None if it was never recorded."""
+        if name not in self._actions:
+            key = await db.scalar(select(ActivityAction.id).where(ActivityAction.name == name))
+            if key is None:
+                return None
+            self._remember_action(key, name)
+        return self._actions[name]
+
+    async def domain_key(self, db: AsyncSession, name: str) -> Optional[int]:
+        """Get a domain's key, or None if it was never recorded."""
+        if name not in self._domains:
+            key = await db.scalar(select(ActivityDomain.id).where(ActivityDomain.name == name))
+            if key is None:
+                return None
+            self._remember_domain(key, name)
+        return self._domains[name]
+
+    def clear(self) -> None:
+        """Forget all cached entries."""
+        for cache in self._caches():
+            cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters."""
+        return {
+            "apps": len(self._app_names),
+            "actions": len(self._action_names),
+            "domains": len(self._domain_names),
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "maxEntries": self.max_entries,
+            "evictions": sum(cache.evictions for cache in self._caches()),
+        }
+
+
+# Create a single dictionary instance
+activity_dictionary = ActivityDictionary(max_entries=settings.ACTIVITY_DICTIONARY_CACHE_SIZE)
@@ -0,0 +1,106 @@
+"""Streaming export of activity logs."""
+
+import csv
+import io
+import json
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import select
+
+from ..db.base import AsyncSessionLocal
+from ..models import ActivityLog
+from .activity_dictionary import activity_dictionary
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Rows fetched from the server-side cursor (and serialized) at a time
+EXPORT_CHUNK_SIZE = 1000
+
+_COLUMNS = (
+    ActivityLog.id,
+    ActivityLog.timestamp,
+    ActivityLog.user_email,
+    ActivityLog.user_role,
+    ActivityLog.domain_key,
+    ActivityLog.app_key,
+    ActivityLog.action_key,
+    ActivityLog.action_metadata,
+)
+
+CSV_HEADER = ["id", "timestamp", "userEmail", "userRole", "userDomain", "appId", "appName", "action", "metadata"]
+
+
+def _record(row: Any) -> Dict[str, Any]:
+    """Convert a result row to the export record (ActivityInfo field names)."""
+    names = activity_dictionary.names(row)
+    return {
+        "id": row.id,
+        "timestamp": row.timestamp.isoformat(),
+        "userEmail": row.user_email,
+        "userRole": row.user_role,
+        "userDomain": names["user_domain"],
+        "appId": names["app_id"],
+        "appName": names["app_name"],
+        "action": names["action"],
+        "metadata": row.action_metadata or {},
+    }
+
+
+def _ndjson(rows: List[Any]) -> str:
+    return "".join(json.dumps(_record(row), separators=(",", ":")) + "\n" for row in rows)
+
+
+def _csv(rows: List[Any], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_HEADER)
+    for row in rows:
+        record = _record(row)
+        record["metadata"] = json.dumps(record["metadata"], separators=(",", ":"))
+        writer.writerow(record.values())
+    return buffer.getvalue()
+
+
+async def export_activities(
+    filters: List[Any],
+    format: str = "ndjson",
+    compress: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Stream matching activities, oldest first, as NDJSON or CSV bytes.
+
+    Rows are read through a server-side cursor ``chunk_size`` at a time and
+    serialized as they arrive, so memory use does not depend on the size of
+    the export. With ``compress`` the output is a gzip stream. Uses its own
+    database sessions, since the response outlives the request's: one for
+    the cursor and one for lookup-table reads in between chunks.
+    """
+    compressor: Optional[Any] = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+
+    def encode(chunk: str) -> bytes:
+        data = chunk.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    if format == "csv":
+        yield encode(_csv([], header=True))
+
+    async with AsyncSessionLocal() as db, AsyncSessionLocal() as lookup_db:
+        result = await db.stream(
+            select(*_COLUMNS)
+            .where(*filters)
+            .order_by(ActivityLog.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for rows in result.partitions():
+            await activity_dictionary.load(lookup_db, rows)
+            data = encode(_csv(rows) if format == "csv" else _ndjson(rows))
+            if data:
+                yield data
+
+    if compressor:
+        yield compressor.flush()
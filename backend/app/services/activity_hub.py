@@ -0,0 +1,143 @@
+"""In-process fan-out of newly written activity events."""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HubFull(Exception):
+    """Raised when the hub has no room for another subscriber."""
+
+
+def event_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an ingested activity row to its API record (ActivityInfo fields).
+
+    The metadata dict is shared with the row, so repeats coalesced into a
+    queued row show up in records already handed out.
+    """
+    metadata = row.get("action_metadata")
+    return {
+        "id": row["id"],
+        "userEmail": row["user_email"],
+        "appId": row["app_id"],
+        "appName": row["app_name"],
+        "action": row["action"],
+        "metadata": metadata if metadata is not None else {},
+        "timestamp": row["timestamp"].isoformat(),
+        "userRole": row["user_role"],
+        "userDomain": row["user_domain"],
+    }
+
+
+class Subscription:
+    """One subscriber's filters and bounded event buffer."""
+
+    def __init__(self, filters: Dict[str, str], buffer_size: int):
+        self.filters = filters
+        self.queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """Check if a row passes this subscriber's filters."""
+        return all(row.get(field) == value for field, value in self.filters.items())
+
+    def close(self) -> None:
+        """End the consumer's stream after what it already has buffered."""
+        if self.queue.full():
+            # Discard instead of blocking; clients replay on reconnect
+            self.drop()
+            return
+        self.queue.put_nowait(None)
+
+    def drop(self) -> None:
+        """Discard buffered events and end the consumer's stream."""
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class ActivityHub:
+    """Fan newly written activity events out to live subscribers.
+
+    ``publish`` never blocks the writer: each subscriber has a bounded
+    buffer, and a subscriber whose buffer is full is dropped (its stream
+    ends; clients reconnect and replay what they missed). Only events
+    written by this worker are seen.
+    """
+
+    def __init__(self, buffer_size: int = 256, max_subscribers: int = 100):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+
+        # Counters
+        self.published = 0
+        self.delivered = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(self, filters: Optional[Dict[str, str]] = None) -> Subscription:
+        """Register a subscriber.
+
+        Raises HubFull when ``max_subscribers`` are already connected.
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise HubFull()
+        subscription = Subscription(
+            {field: value for field, value in (filters or {}).items() if value},
+            self.buffer_size
+        )
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber."""
+        self._subscribers.discard(subscription)
+
+    def publish(self, rows: List[Dict[str, Any]]) -> None:
+        """Deliver written rows to matching subscribers."""
+        self.published += len(rows)
+        if not self._subscribers:
+            return
+
+        for subscription in list(self._subscribers):
+            for row in rows:
+                if not subscription.matches(row):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event_record(row))
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    # Slow consumer: drop it rather than block or grow
+                    subscription.drop()
+                    self._subscribers.discard(subscription)
+                    self.dropped_subscribers += 1
+                    logger.warning("Dropped slow activity stream subscriber")
+                    break
+
+    def close_all(self) -> None:
+        """End every subscriber's stream (on shutdown)."""
+        for subscription in list(self._subscribers):
+            subscription.close()
+        self._subscribers.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hub counters."""
+        return {
+            "subscribers": len(self._subscribers),
+            "maxSubscribers": self.max_subscribers,
+            "published": self.published,
+            "delivered": self.delivered,
+            "droppedSubscribers": self.dropped_subscribers,
+        }
+
+
+# Create a single hub instance
+activity_hub = ActivityHub(
+    buffer_size=settings.ACTIVITY_STREAM_BUFFER_SIZE,
+    max_subscribers=settings.ACTIVITY_STREAM_MAX_SUBSCRIBERS,
+)
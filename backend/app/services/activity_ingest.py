@@ -0,0 +1,208 @@
+"""Buffered bulk ingestion of activity events."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import insert
+
+from ..core.config import settings
+from ..db.base import AsyncSessionLocal
+from ..models import ActivityLog
+from .activity_dictionary import activity_dictionary
+from .activity_hub import activity_hub
+from .recent_activity import recent_activity
+from .activity_rollups import apply_rollups
+from .activity_counters import apply_counters
+from .activity_counts import activity_counts
+from .activity_coalesce import activity_coalescer
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    """Raised when the ingestion queue cannot accept more events."""
+
+
+class ActivityIngestor:
+    """Queue activity rows in memory and write them in multi-row INSERTs.
+
+    Request handlers ``submit`` lists of rows (one list per request) into a
+    bounded queue; a background writer collects them into batches of up to
+    ``batch_size`` rows or ``flush_interval`` seconds, whichever comes first.
+    A request's rows are never split across batches. When the writer is not
+    running (e.g. no lifespan), rows are written inline instead. Repeats of
+    a still-queued row and retried idempotency keys are not queued again
+    (see services/activity_coalesce.py).
+    """
+
+    def __init__(self, max_queue_size: int = 1000, batch_size: int = 200, flush_interval: float = 1.0):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "asyncio.Queue[List[Dict[str, Any]]]" = asyncio.Queue(maxsize=max_queue_size)
+        self._queued_events = 0
+        self._carry: Optional[List[Dict[str, Any]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._started_at = time.monotonic()
+
+        # Counters
+        self.enqueued = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Check if the background writer is running."""
+        return self._task is not None and not self._closing
+
+    async def submit(
+        self,
+        rows: List[Dict[str, Any]],
+        idempotency_keys: Optional[Sequence[Optional[str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Queue rows for writing.
+
+        Returns, for each input row, the row that records it: the row itself,
+        the pending row it was coalesced into, or the row first recorded for
+        its idempotency key. Raises IngestQueueFull when the queue is at
+        capacity.
+        """
+        if not rows:
+            return []
+
+        plan = activity_coalescer.plan(rows, idempotency_keys)
+        new_rows = plan.new_rows
+        if new_rows and not self.running:
+            await self._write(new_rows, raise_errors=True)
+        elif new_rows:
+            try:
+                self._queue.put_nowait(new_rows)
+            except asyncio.QueueFull:
+                self.rejected += len(rows)
+                raise IngestQueueFull()
+
+            self._queued_events += len(new_rows)
+            self.enqueued += len(new_rows)
+
+        activity_coalescer.accept(plan, pending=self.running)
+        return plan.results
+
+    def _take(self, chunk: List[Dict[str, Any]], batch: List[Dict[str, Any]]) -> None:
+        """Move a dequeued chunk into the current batch."""
+        self._queued_events -= len(chunk)
+        batch.extend(chunk)
+
+    async def _collect(self) -> List[Dict[str, Any]]:
+        """Wait for the next batch (possibly empty after an idle interval)."""
+        if self._carry is not None:
+            first, self._carry = self._carry, None
+        else:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), self.flush_interval)
+            except asyncio.TimeoutError:
+                return []
+
+        batch: List[Dict[str, Any]] = []
+        self._take(first, batch)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            try:
+                if timeout > 0:
+                    chunk = await asyncio.wait_for(self._queue.get(), timeout)
+                else:
+                    chunk = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+
+            # Don't split a request's rows across batches
+            if len(batch) + len(chunk) > self.batch_size:
+                self._carry = chunk
+                break
+            self._take(chunk, batch)
+        return batch
+
+    async def _write(self, rows: List[Dict[str, Any]], raise_errors: bool = False) -> None:
+        """Write rows in one multi-row INSERT with rollups and counters, then publish them."""
+        started = time.monotonic()
+        # Rows being written can no longer absorb repeats
+        activity_coalescer.close(rows)
+        try:
+            values = await activity_dictionary.encode(rows)
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(ActivityLog).values(values))
+                await apply_rollups(db, rows)
+                await apply_counters(db, values)
+                await db.commit()
+        except Exception as e:
+            self.failed += len(rows)
+            recent_activity.forget(rows)
+            activity_coalescer.forget(rows)
+            logger.error(f"Failed to write {len(rows)} activity events: {e}")
+            if raise_errors:
+                raise
+            return
+
+        self.written += len(rows)
+        self.batches += 1
+        self.last_batch_size = len(rows)
+        self.last_flush_ms = round((time.monotonic() - started) * 1000, 2)
+        activity_counts.invalidate(values)
+        activity_hub.publish(rows)
+
+    async def _run(self) -> None:
+        """Write batches until closed and drained."""
+        while not (self._closing and self._queue.empty() and self._carry is None):
+            batch = await self._collect()
+            if batch:
+                await self._write(batch)
+
+    def start(self) -> None:
+        """Start the background writer."""
+        if self._task is None:
+            self._closing = False
+            self._started_at = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting new events and drain the queue."""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._task
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get ingestion counters."""
+        uptime = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "running": self.running,
+            "queueDepth": self._queue.qsize(),
+            "queuedEvents": self._queued_events,
+            "maxQueueSize": self.max_queue_size,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "lastBatchSize": self.last_batch_size,
+            "lastFlushMs": self.last_flush_ms,
+            "eventsPerSecond": round(self.written / uptime, 2),
+        }
+
+
+# Create a single ingestor instance
+activity_ingestor = ActivityIngestor(
+    max_queue_size=settings.ACTIVITY_QUEUE_MAX_SIZE,
+    batch_size=settings.ACTIVITY_BATCH_SIZE,
+    flush_interval=settings.ACTIVITY_FLUSH_INTERVAL,
+)
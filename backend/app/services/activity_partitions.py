@@ -0,0 +1,276 @@
+"""Monthly activity_logs partitions and retention."""
+
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.ids import activity_ids
+from ..db.base import AsyncSessionLocal, is_postgresql
+from ..models import ActivityLog
+from .activity_counters import apply_counters
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = "activity_logs"
+_PARTITION_NAME = re.compile(rf"^{TABLE_NAME}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(value: datetime) -> datetime:
+    """Get the first instant of a datetime's month (naive UTC)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Move a month start forwards (or backwards) by whole months."""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    """Get the partition table name for a month."""
+    return f"{TABLE_NAME}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Get the month a partition table covers, or None for other tables."""
+    match = _PARTITION_NAME.match(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+
+def partition_ddl(month: datetime) -> str:
+    """Get CREATE TABLE for a month's partition.
+
+    Partitions are ranges of the primary key: activity IDs sort by time, so
+    a month is the range between the smallest IDs of its first instant and
+    of the next month's. Queries bounded by ID (see ``time_range``) are
+    pruned to the partitions they touch.
+    """
+    lower = activity_ids.lower_bound(month)
+    upper = activity_ids.lower_bound(add_months(month, 1))
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {TABLE_NAME} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+
+
+def time_range(start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Any]:
+    """Get filters for activities in [start, end).
+
+    Adds primary key bounds next to the timestamp bounds, so the range is
+    read from the primary key index and, on PostgreSQL, only from the
+    partitions it covers.
+    """
+    filters = []
+    if start is not None:
+        filters += [ActivityLog.id >= activity_ids.lower_bound(start), ActivityLog.timestamp >= start]
+    if end is not None:
+        filters += [ActivityLog.id < activity_ids.lower_bound(end), ActivityLog.timestamp < end]
+    return filters
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    """Check if activity_logs is a partitioned table."""
+    if not is_postgresql():
+        return False
+    result = await db.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind = 'p'"),
+        {"name": TABLE_NAME}
+    )
+    return result.first() is not None
+
+
+async def list_partitions(db: AsyncSession) -> List[str]:
+    """Get the names of activity_logs partitions."""
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name ORDER BY c.relname"
+        ),
+        {"name": TABLE_NAME}
+    )
+    return [row[0] for row in result.all()]
+
+
+class ActivityRetention:
+    """Keep monthly partitions ahead of time and drop expired activity.
+
+    On a partitioned PostgreSQL table, upcoming months get their partitions
+    ``months_ahead`` in advance and expired months are dropped as whole
+    tables. Elsewhere (SQLite, or a table not yet migrated) expired rows are
+    deleted in primary key order, ``delete_chunk_size`` rows per
+    transaction. Activity older than the start of the month
+    ``retention_months`` before the current one is expired; 0 keeps
+    everything.
+    """
+
+    def __init__(
+        self,
+        retention_months: int = 0,
+        months_ahead: int = 3,
+        interval: float = 3600.0,
+        delete_chunk_size: int = 5000
+    ):
+        self.retention_months = retention_months
+        self.months_ahead = months_ahead
+        self.interval = interval
+        self.delete_chunk_size = delete_chunk_size
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.runs = 0
+        self.errors = 0
+        self.partitions_created = 0
+        self.partitions_dropped = 0
+        self.rows_deleted = 0
+        self.last_run_ms = 0.0
+
+    def cutoff(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Get the instant before which activity is expired."""
+        if self.retention_months <= 0:
+            return None
+        return add_months(month_start(now or datetime.utcnow()), -self.retention_months)
+
+    async def ensure_partitions(self, db: AsyncSession, now: Optional[datetime] = None) -> int:
+        """Create partitions for the current and upcoming months."""
+        existing = set(await list_partitions(db))
+        current = month_start(now or datetime.utcnow())
+        created = 0
+        for offset in range(self.months_ahead + 1):
+            month = add_months(current, offset)
+            if partition_name(month) not in existing:
+                await db.execute(text(partition_ddl(month)))
+                created += 1
+        self.partitions_created += created
+        return created
+
+    async def drop_expired_partitions(self, db: AsyncSession, cutoff: datetime) -> int:
+        """Drop partitions that lie entirely before the cutoff."""
+        dropped = 0
+        for name in await list_partitions(db):
+            month = partition_month(name)
+            if month is not None and add_months(month, 1) <= cutoff:
+                await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                logger.info(f"Dropped expired activity partition {name}")
+                dropped += 1
+        self.partitions_dropped += dropped
+        return dropped
+
+    async def delete_expired_rows(self, cutoff: datetime) -> int:
+        """Delete rows before the cutoff in chunks, committing each one with
+        its counter updates."""
+        upper = activity_ids.lower_bound(cutoff)
+        deleted = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                chunk = (
+                    select(ActivityLog.id)
+                    .where(ActivityLog.id < upper)
+                    .order_by(ActivityLog.id)
+                    .limit(self.delete_chunk_size)
+                )
+                result = await db.execute(
+                    delete(ActivityLog)
+                    .where(ActivityLog.id.in_(chunk))
+                    .returning(
+                        ActivityLog.user_email,
+                        ActivityLog.app_key,
+                        ActivityLog.action_key,
+                        ActivityLog.domain_key
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                rows = [dict(row._mapping) for row in result.all()]
+                await apply_counters(db, rows, sign=-1)
+                await db.commit()
+            deleted += len(rows)
+            self.rows_deleted += len(rows)
+            if len(rows) < self.delete_chunk_size:
+                return deleted
+            # Let other writers in between chunks
+            await asyncio.sleep(0)
+
+    async def run_once(self) -> Dict[str, int]:
+        """Create upcoming partitions and apply retention."""
+        started = time.monotonic()
+        created = dropped = deleted = 0
+        cutoff = self.cutoff()
+
+        async with AsyncSessionLocal() as db:
+            partitioned = await is_partitioned(db)
+            if partitioned:
+                created = await self.ensure_partitions(db)
+                if cutoff is not None:
+                    dropped = await self.drop_expired_partitions(db, cutoff)
+                await db.commit()
+
+        if cutoff is not None and not partitioned:
+            deleted = await self.delete_expired_rows(cutoff)
+
+        self.runs += 1
+        self.last_run_ms = round((time.monotonic() - started) * 1000, 2)
+        return {"created": created, "dropped": dropped, "deleted": deleted}
+
+    async def run_safely(self) -> None:
+        """Run maintenance once, logging instead of raising."""
+        try:
+            await self.run_once()
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Activity partition maintenance failed: {e}")
+
+    async def _run(self) -> None:
+        """Run maintenance now and then periodically."""
+        while True:
+            await self.run_safely()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start periodic maintenance."""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic maintenance."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get maintenance counters."""
+        cutoff = self.cutoff()
+        return {
+            "retentionMonths": self.retention_months,
+            "cutoff": cutoff.isoformat() if cutoff else None,
+            "runs": self.runs,
+            "errors": self.errors,
+            "partitionsCreated": self.partitions_created,
+            "partitionsDropped": self.partitions_dropped,
+            "rowsDeleted": self.rows_deleted,
+            "lastRunMs": self.last_run_ms,
+        }
+
+
+# Create a single retention instance
+activity_retention = ActivityRetention(
+    retention_months=settings.ACTIVITY_RETENTION_MONTHS,
+    months_ahead=settings.ACTIVITY_PARTITIONS_AHEAD,
+    interval=settings.ACTIVITY_MAINTENANCE_INTERVAL,
+    delete_chunk_size=settings.ACTIVITY_DELETE_CHUNK_SIZE,
+)
@@ -0,0 +1,152 @@
+"""Filtered activity queries and their access paths."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.sql.operators import custom_op
+
+from ..db.base import is_postgresql
+from ..models import ActivityLog
+from .activity_dictionary import activity_dictionary
+from .activity_partitions import time_range
+from .activity_search import MetadataSearch
+
+# Indexes that can serve a filtered "latest N", best first. Every one ends
+# in id, so equality on the leading columns plus an ID range (from/to)
+# reads rows in order straight from the index.
+ACCESS_PATHS = (
+    ("ix_activity_logs_user_email_id", ("user_email",)),
+    ("ix_activity_logs_app_key_action_key_id", ("app_key", "action_key")),
+    ("ix_activity_logs_app_key_id", ("app_key",)),
+    ("ix_activity_logs_action_key_id", ("action_key",)),
+    ("ix_activity_logs_domain_key_id", ("domain_key",)),
+)
+PRIMARY_KEY_PATH = "primary key"
+
+
+def _unindexed(column: Any) -> Any:
+    """Wrap a column in unary plus so SQLite won't pick an index for it."""
+    return UnaryExpression(column.expression, operator=custom_op("+"), type_=column.type)
+
+
+class ActivityQuery:
+    """Filters for activity_logs, built around one access path.
+
+    The most selective index covering the equality filters is chosen (see
+    ``ACCESS_PATHS``); the remaining equality filters are applied to the
+    rows it yields. PostgreSQL's planner is left to cost the plan from
+    statistics; SQLite, which often lacks them, is kept from switching to a
+    less selective index by marking the other filters unindexable.
+    """
+
+    def __init__(
+        self,
+        user_email: Optional[str] = None,
+        app_keys: Optional[List[int]] = None,
+        action_key: Optional[int] = None,
+        domain_key: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        search: Optional[MetadataSearch] = None
+    ):
+        self.values: Dict[str, Any] = {
+            "user_email": user_email,
+            "app_key": app_keys or None,
+            "action_key": action_key,
+            "domain_key": domain_key,
+        }
+        self.start = start
+        self.end = end
+        self.search = search
+
+    @classmethod
+    async def build(
+        cls,
+        db: AsyncSession,
+        user_email: Optional[str] = None,
+        app_id: Optional[str] = None,
+        action: Optional[str] = None,
+        user_domain: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        search: Optional[MetadataSearch] = None
+    ) -> Optional["ActivityQuery"]:
+        """Build a query from names.
+
+        Returns None when an app, action or domain was never recorded, i.e.
+        nothing can match.
+        """
+        app_keys = action_key = domain_key = None
+        if app_id:
+            app_keys = await activity_dictionary.app_keys(db, app_id)
+            if not app_keys:
+                return None
+        if action:
+            action_key = await activity_dictionary.action_key(db, action)
+            if action_key is None:
+                return None
+        if user_domain:
+            domain_key = await activity_dictionary.domain_key(db, user_domain)
+            if domain_key is None:
+                return None
+        return cls(user_email, app_keys, action_key, domain_key, start, end, search)
+
+    @property
+    def access_path(self) -> str:
+        """Get the name of the index the query is built around."""
+        for index, columns in ACCESS_PATHS:
+            if all(self.values[column] is not None for column in columns):
+                return index
+        return PRIMARY_KEY_PATH
+
+    @property
+    def key(self) -> Tuple[Any, ...]:
+        """Get a hashable signature of the filters."""
+        app_keys = self.values["app_key"]
+        return (
+            self.values["user_email"],
+            tuple(sorted(app_keys)) if app_keys else None,
+            self.values["action_key"],
+            self.values["domain_key"],
+            self.start,
+            self.end,
+            self.search.key if self.search else None,
+        )
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """Check if an encoded activity row passes the filters.
+
+        Metadata search is not evaluated; rows are assumed to pass it.
+        """
+        for name, value in self.values.items():
+            if value is None:
+                continue
+            if row.get(name) not in (value if isinstance(value, list) else [value]):
+                return False
+        if self.start is not None and row["timestamp"] < self.start:
+            return False
+        if self.end is not None and row["timestamp"] >= self.end:
+            return False
+        return True
+
+    def where(self) -> List[Any]:
+        """Get the WHERE conditions."""
+        indexed = dict(ACCESS_PATHS).get(self.access_path, ())
+        conditions = []
+        for name, value in self.values.items():
+            if value is None:
+                continue
+            column = getattr(ActivityLog, name)
+            if name not in indexed and not is_postgresql():
+                column = _unindexed(column)
+            if isinstance(value, list):
+                conditions.append(column.in_(value) if len(value) > 1 else column == value[0])
+            else:
+                conditions.append(column == value)
+        # ID bounds for the time range use the trailing id of every path
+        conditions.extend(time_range(self.start, self.end))
+        if self.search is not None:
+            conditions.extend(self.search.where())
+        return conditions
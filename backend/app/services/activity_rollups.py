@@ -0,0 +1,169 @@
+"""Incremental hourly and daily activity rollups."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, delete, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.base import upsert
+from ..models import ActivityLog, ActivityRollup, ActivityRollupUser
+from .activity_dictionary import activity_dictionary
+from .activity_partitions import time_range
+
+PERIODS = ("hour", "day")
+
+# Rows per INSERT, keeping well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+REBUILD_BATCH_SIZE = 2000
+
+_KEY_COLUMNS = ("period", "bucket", "app_id", "action", "user_domain")
+
+RollupKey = Tuple[str, datetime, str, str, str]
+
+
+def to_utc(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC, as activity timestamps are stored."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def bucket_start(timestamp: datetime, period: str) -> datetime:
+    """Get the start of the hour or day containing a timestamp."""
+    bucket = to_utc(timestamp).replace(minute=0, second=0, microsecond=0)
+    if period == "day":
+        bucket = bucket.replace(hour=0)
+    return bucket
+
+
+def _chunks(items: List[Dict[str, Any]]) -> Iterable[List[Dict[str, Any]]]:
+    for i in range(0, len(items), CHUNK_SIZE):
+        yield items[i:i + CHUNK_SIZE]
+
+
+async def apply_rollups(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """Add activity rows to the rollups.
+
+    Runs in the caller's transaction, so rollups commit (or roll back)
+    together with the events. Returns the number of rollup rows touched.
+    """
+    counts: Dict[RollupKey, int] = {}
+    users: Dict[RollupKey, Set[str]] = {}
+    for row in rows:
+        for period in PERIODS:
+            key = (
+                period,
+                bucket_start(row["timestamp"], period),
+                row["app_id"],
+                row["action"],
+                row["user_domain"],
+            )
+            counts[key] = counts.get(key, 0) + 1
+            users.setdefault(key, set()).add(row["user_email"])
+
+    if not counts:
+        return 0
+
+    # Record who was counted; only users new to a bucket come back
+    user_rows = [
+        {**dict(zip(_KEY_COLUMNS, key)), "user_email": email}
+        for key, emails in users.items()
+        for email in emails
+    ]
+    new_users: Dict[RollupKey, int] = {}
+    for chunk in _chunks(user_rows):
+        stmt = upsert(ActivityRollupUser).values(chunk).on_conflict_do_nothing(
+            index_elements=[*_KEY_COLUMNS, "user_email"]
+        ).returning(*(getattr(ActivityRollupUser, column) for column in _KEY_COLUMNS))
+        result = await db.execute(stmt)
+        for period, bucket, app_id, action, user_domain in result.all():
+            key = (period, to_utc(bucket), app_id, action, user_domain)
+            new_users[key] = new_users.get(key, 0) + 1
+
+    rollup_rows = [
+        {
+            **dict(zip(_KEY_COLUMNS, key)),
+            "event_count": count,
+            "distinct_users": new_users.get(key, 0),
+        }
+        for key, count in counts.items()
+    ]
+    for chunk in _chunks(rollup_rows):
+        stmt = upsert(ActivityRollup).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(_KEY_COLUMNS),
+            set_={
+                "event_count": ActivityRollup.event_count + stmt.excluded.event_count,
+                "distinct_users": ActivityRollup.distinct_users + stmt.excluded.distinct_users,
+            }
+        )
+        await db.execute(stmt)
+
+    return len(rollup_rows)
+
+
+def rebuild_range(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """Widen a range to whole days, so hourly and daily buckets both fit."""
+    start = bucket_start(start, "day")
+    end_day = bucket_start(end, "day")
+    if end_day < to_utc(end):
+        end_day += timedelta(days=1)
+    return start, end_day
+
+
+async def rebuild_rollups(db: AsyncSession, start: datetime, end: datetime) -> Dict[str, Any]:
+    """Recompute rollups for a time range from activity_logs.
+
+    The range is widened to whole days. Existing rollups in the range are
+    replaced in the caller's transaction. Meant for past ranges (repairs,
+    backfills); events ingested into the range while it runs may be missed.
+    """
+    start, end = rebuild_range(start, end)
+
+    for model in (ActivityRollup, ActivityRollupUser):
+        await db.execute(
+            delete(model).where(model.bucket >= start, model.bucket < end)
+        )
+
+    # Walk the range in primary key order; IDs sort by time
+    events = 0
+    last_id: Optional[str] = None
+    while True:
+        conditions = time_range(start, end)
+        if last_id is not None:
+            conditions.append(ActivityLog.id > last_id)
+
+        result = await db.execute(
+            select(
+                ActivityLog.id,
+                ActivityLog.timestamp,
+                ActivityLog.app_key,
+                ActivityLog.action_key,
+                ActivityLog.domain_key,
+                ActivityLog.user_email,
+            )
+            .where(and_(*conditions))
+            .order_by(ActivityLog.id)
+            .limit(REBUILD_BATCH_SIZE)
+        )
+        rows = result.all()
+        if not rows:
+            break
+
+        await activity_dictionary.load(db, rows)
+        batch = [
+            {
+                "id": row.id,
+                "timestamp": row.timestamp,
+                "user_email": row.user_email,
+                **activity_dictionary.names(row),
+            }
+            for row in rows
+        ]
+
+        await apply_rollups(db, batch)
+        events += len(batch)
+        last_id = batch[-1]["id"]
+
+    return {"from": start, "to": end, "events": events}
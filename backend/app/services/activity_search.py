@@ -0,0 +1,148 @@
+"""Key/value and free-text search over activity metadata."""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, or_, cast, func, literal, literal_column, table, column, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ..db.base import is_postgresql
+from ..models import ActivityLog
+from ..models.activity_log import METADATA_TSVECTOR, METADATA_FTS_TABLE
+
+# Words as FTS5's default tokenizer splits them
+_TOKEN = re.compile(r"[^\W_]+")
+
+_fts = table(METADATA_FTS_TABLE, column("activity_id"))
+
+
+def _tokens(value: str) -> List[str]:
+    return _TOKEN.findall(value)
+
+
+def _phrase(words: List[str]) -> str:
+    """Quote words as one FTS5 phrase."""
+    return '"' + " ".join(words) + '"'
+
+
+def _values(value: str) -> List[Any]:
+    """Get the JSON values a query string can stand for (text, and a
+    number, boolean or null when it parses as one)."""
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        return [value]
+    if isinstance(parsed, (dict, list, str)):
+        return [value]
+    return [value, parsed]
+
+
+class MetadataSearch:
+    """Predicates on action_metadata.
+
+    ``pairs`` are (key path, value) equality filters; a dotted key reaches
+    into nested objects and a value also matches the number, boolean or
+    null it spells. ``text`` matches rows whose metadata keys and values
+    contain all of its words.
+
+    PostgreSQL answers key/value filters with JSONB containment (GIN,
+    jsonb_path_ops) and text with a tsvector expression index. SQLite
+    narrows candidates through the FTS5 shadow table, then checks
+    key/value filters exactly with json_extract.
+    """
+
+    def __init__(self, pairs: List[Tuple[List[str], str]], text: Optional[str] = None):
+        self.pairs = pairs
+        self.text = text
+
+    @classmethod
+    def parse(cls, meta: Optional[List[str]], q: Optional[str]) -> Optional["MetadataSearch"]:
+        """Build a search from ``key:value`` filters and free text.
+
+        Returns None when there is nothing to search for; raises 400 on
+        malformed input.
+        """
+        pairs = []
+        for item in meta or []:
+            key, separator, value = item.partition(":")
+            path = key.split(".")
+            if not separator or not all(path) or '"' in key:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid metadata filter, expected key:value"
+                )
+            pairs.append((path, value))
+
+        q = (q or "").strip() or None
+        if q is not None and not _tokens(q):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search text has no words"
+            )
+
+        if not pairs and q is None:
+            return None
+        return cls(pairs, q)
+
+    @property
+    def key(self) -> Tuple[Any, ...]:
+        """Get a hashable signature of the predicates."""
+        return (tuple((tuple(path), value) for path, value in self.pairs), self.text)
+
+    def where(self) -> List[Any]:
+        """Get the WHERE conditions."""
+        if is_postgresql():
+            return self._postgresql_where()
+        return self._sqlite_where()
+
+    def _postgresql_where(self) -> List[Any]:
+        conditions = []
+        for path, value in self.pairs:
+            documents = []
+            for candidate in _values(value):
+                document: Any = candidate
+                for part in reversed(path):
+                    document = {part: document}
+                documents.append(document)
+            conditions.append(or_(*(
+                ActivityLog.action_metadata.op("@>")(cast(literal(json.dumps(document), String), JSONB))
+                for document in documents
+            )))
+        if self.text is not None:
+            conditions.append(
+                literal_column(METADATA_TSVECTOR).op("@@")(
+                    func.plainto_tsquery(literal_column("'simple'"), self.text)
+                )
+            )
+        return conditions
+
+    def _sqlite_where(self) -> List[Any]:
+        # One MATCH narrows the rows: each pair as a "key value" phrase
+        terms = []
+        for path, value in self.pairs:
+            alternatives = {
+                _phrase(_tokens(path[-1]) + _tokens(candidate if isinstance(candidate, str) else json.dumps(candidate)))
+                for candidate in _values(value)
+            }
+            terms.append("(" + " OR ".join(sorted(alternatives)) + ")")
+        if self.text is not None:
+            terms.extend(_phrase([word]) for word in _tokens(self.text))
+        match = "body : (" + " AND ".join(terms) + ")"
+
+        conditions = [
+            ActivityLog.id.in_(
+                select(_fts.c.activity_id).where(literal_column(METADATA_FTS_TABLE).op("MATCH")(match))
+            )
+        ]
+        # Phrases can match other keys and values; check pairs exactly
+        for path, value in self.pairs:
+            json_path = "$" + "".join(f'."{part}"' for part in path)
+            candidates = [candidate for candidate in _values(value) if candidate is not None]
+            condition = func.json_extract(ActivityLog.action_metadata, json_path).in_(candidates)
+            if len(candidates) < len(_values(value)):
+                # json_extract gives SQL NULL for JSON null
+                condition = or_(condition, func.json_type(ActivityLog.action_metadata, json_path) == "null")
+            conditions.append(condition)
+        return conditions
@@ -1,18 +1,23 @@
 """Authentication service for handling Google OAuth and sessions."""
 
-import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
 
 from ..core.config import settings
+from ..db.base import upsert
 from ..models import User, Session, UserRole
+from ..models.user import adjust_domain_count, email_domain_of
 from ..schemas.auth import UserResponse
+from .session_cache import session_cache
+from .session_store import get_session_store
+from .session_activity import session_activity
+from .principal import SessionPrincipal
+from .google_verifier import google_verifier
+from .invalidation import invalidate_sessions, invalidate_users
 
 
 class AuthService:
@@ -22,12 +27,8 @@ class AuthService:
     async def verify_google_token(credential: str) -> dict:
         """Verify Google ID token and extract user info."""
         try:
-            # Verify the token with Google
-            idinfo = id_token.verify_oauth2_token(
-                credential,
-                google_requests.Request(),
-                settings.GOOGLE_CLIENT_ID
-            )
+            # Verify the token locally against cached Google certificates
+            idinfo = await google_verifier.verify(credential)
 
             # Extract user information
             return {
@@ -44,12 +45,20 @@ class AuthService:
             )
 
     @staticmethod
-    async def create_or_update_user(
+    async def login(
         db: AsyncSession,
-        user_info: dict
-    ) -> User:
-        """Create or update user from Google info."""
-        # Check if user exists
+        user_info: dict,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> Tuple[User, Session]:
+        """Upsert the user and open a session in a single transaction.
+
+        Returning users whose name, picture and role are unchanged (and who
+        logged in within the activity granularity) cause no user write at
+        all; otherwise the user is written with one INSERT ... ON CONFLICT
+        DO UPDATE ... RETURNING. The session insert and the commit complete
+        the transaction.
+        """
         result = await db.execute(
             select(User).where(User.id == user_info["id"])
         )
@@ -58,88 +67,111 @@ class AuthService:
         # Determine user role
         email = user_info["email"].lower()
         role = UserRole.ADMIN if settings.is_admin(email) else UserRole.USUARIO
-
-        if user:
-            # Update existing user
-            user.name = user_info["name"]
-            user.picture = user_info.get("picture")
-            user.last_login = datetime.utcnow()
-            if user.role != role:
-                user.role = role
-        else:
-            # Create new user
-            user = User(
+        name = user_info["name"]
+        picture = user_info.get("picture")
+        now = datetime.utcnow()
+
+        # The upsert bypasses the ORM, so derive email_domain and move the
+        # domain user counts here (see models/user.py)
+        email_domain = email_domain_of(email)
+        old_domain = user.email_domain if user is not None else None
+
+        role_changed = user is not None and user.role != role
+        if user is None or AuthService._user_needs_write(user, name, picture, role, now):
+            stmt = upsert(User).values(
                 id=user_info["id"],
                 email=email,
-                name=user_info["name"],
+                email_domain=email_domain,
+                name=name,
                 role=role,
-                picture=user_info.get("picture"),
-                last_login=datetime.utcnow()
+                picture=picture,
+                last_login=now
             )
-            db.add(user)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[User.id],
+                set_={
+                    "email_domain": stmt.excluded.email_domain,
+                    "name": stmt.excluded.name,
+                    "picture": stmt.excluded.picture,
+                    "role": stmt.excluded.role,
+                    "last_login": stmt.excluded.last_login,
+                }
+            ).returning(User)
+            user = await db.scalar(stmt, execution_options={"populate_existing": True})
+
+            if old_domain != email_domain:
+                if old_domain:
+                    await db.execute(adjust_domain_count(old_domain, -1))
+                if email_domain:
+                    await db.execute(adjust_domain_count(email_domain, 1))
+
+        # Stage the session and commit both writes together; a store that
+        # wrote it outside the transaction (Redis) drops it again on failure
+        store = get_session_store()
+        session = await store.create(db, user, ip_address, user_agent)
+        try:
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            await store.discard(db, session)
+            raise
+
+        if role_changed:
+            await get_session_store().update_user(db, user)
+            await invalidate_users([user.id])
 
-        await db.commit()
-        await db.refresh(user)
-        return user
+        return user, session
 
     @staticmethod
-    async def create_session(
-        db: AsyncSession,
+    def _user_needs_write(
         user: User,
-        ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None
-    ) -> Tuple[Session, str]:
-        """Create a new session for the user."""
-        # Generate session ID and CSRF token
-        session_id = secrets.token_hex(32)
-        csrf_token = secrets.token_hex(settings.CSRF_TOKEN_LENGTH)
-
-        # Calculate expiration
-        expires_at = datetime.utcnow() + timedelta(seconds=settings.COOKIE_MAX_AGE)
-
-        # Create session
-        session = Session(
-            id=session_id,
-            user_id=user.id,
-            csrf_token=csrf_token,
-            expires_at=expires_at,
-            last_activity=datetime.utcnow(),
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-
-        db.add(session)
-        await db.commit()
-        await db.refresh(session)
-
-        return session, session_id
+        name: str,
+        picture: Optional[str],
+        role: UserRole,
+        now: datetime
+    ) -> bool:
+        """Check if a returning user's row differs from their Google profile."""
+        if user.name != name or user.picture != picture or user.role != role:
+            return True
+        if user.email_domain is None:
+            return True
+        if user.last_login is None:
+            return True
+        last_login = user.last_login.replace(tzinfo=None)
+        return (now - last_login).total_seconds() >= settings.SESSION_ACTIVITY_GRANULARITY
 
     @staticmethod
     async def validate_session(
         db: AsyncSession,
         session_id: str
-    ) -> Optional[Session]:
-        """Validate and refresh session."""
-        # Get session with user
-        result = await db.execute(
-            select(Session)
-            .where(Session.id == session_id)
-            .where(Session.expires_at > datetime.utcnow())
-        )
-        session = result.scalar_one_or_none()
-
-        if not session:
+    ) -> Optional[SessionPrincipal]:
+        """Validate a session and record its activity."""
+        # Serve from the in-process cache when possible
+        principal = session_cache.get(session_id)
+        if principal is not None:
+            await AuthService._record_activity(principal)
+            return principal
+
+        # Resolve session and user in a single statement; when activity
+        # buffering is off, the store touches last_activity in the same trip
+        write_through = session_activity.flush_interval <= 0
+        principal = await get_session_store().get(db, session_id, touch=write_through)
+
+        if not principal:
             return None
 
-        # Check if user is still active
-        if not session.user.is_active:
-            return None
+        if not write_through:
+            session_activity.record(principal)
 
-        # Update last activity
-        session.last_activity = datetime.utcnow()
-        await db.commit()
+        session_cache.set(principal.session_id, principal.user_id, principal.expires_at, principal)
+        return principal
 
-        return session
+    @staticmethod
+    async def _record_activity(principal: SessionPrincipal) -> None:
+        """Queue a last-activity update, writing through if buffering is off."""
+        session_activity.record(principal)
+        if session_activity.flush_interval <= 0:
+            await session_activity.flush()
 
     @staticmethod
     async def delete_session(
@@ -147,42 +179,28 @@ class AuthService:
         session_id: str
     ) -> bool:
         """Delete a session."""
-        result = await db.execute(
-            delete(Session).where(Session.id == session_id)
-        )
-        await db.commit()
-        return result.rowcount > 0
+        deleted = await get_session_store().delete(db, session_id)
+        await invalidate_sessions([session_id])
+        return deleted
 
     @staticmethod
     async def delete_user_sessions(
         db: AsyncSession,
-        user_email: str
+        user_id: str
     ) -> int:
         """Delete all sessions for a user."""
-        # Find user
-        result = await db.execute(
-            select(User).where(User.email == user_email)
-        )
-        user = result.scalar_one_or_none()
-
-        if not user:
-            return 0
-
-        # Delete all sessions
-        result = await db.execute(
-            delete(Session).where(Session.user_id == user.id)
-        )
-        await db.commit()
-        return result.rowcount
+        deleted = await get_session_store().delete_for_user(db, user_id)
+        await invalidate_users([user_id])
+        return deleted
 
     @staticmethod
-    def create_app_token(user: User, app_id: str, app_name: str) -> str:
+    def create_app_token(principal: SessionPrincipal, app_id: str, app_name: str) -> str:
         """Create a JWT token for sub-application authentication."""
         payload = {
-            "sub": user.id,
-            "email": user.email,
-            "name": user.name,
-            "role": user.role.value,
+            "sub": principal.user_id,
+            "email": principal.email,
+            "name": principal.name,
+            "role": principal.role.value,
             "app_id": app_id,
             "app_name": app_name,
             "exp": datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
@@ -213,9 +231,5 @@ class AuthService:
 
     @staticmethod
     async def cleanup_expired_sessions(db: AsyncSession) -> int:
-        """Clean up expired sessions from database."""
-        result = await db.execute(
-            delete(Session).where(Session.expires_at < datetime.utcnow())
-        )
-        await db.commit()
-        return result.rowcount
\ No newline at end of file
+        """Clean up expired sessions from the session store."""
+        return await get_session_store().cleanup_expired(db)
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""Reconciliation of the maintained per-domain user counts."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.base import AsyncSessionLocal
+from ..models import DomainWhitelist, User
+
+logger = logging.getLogger(__name__)
+
+
+def domain_user_count(domain: Any) -> Any:
+    """Build a query counting the users of a domain (served by the email_domain index)."""
+    return select(func.count(User.id)).where(User.email_domain == domain)
+
+
+async def reconcile_domain_counts(db: AsyncSession) -> int:
+    """Recount users per whitelisted domain, in the caller's transaction.
+
+    Returns the number of domains whose count had drifted.
+    """
+    actual = domain_user_count(DomainWhitelist.domain).scalar_subquery()
+    result = await db.execute(
+        update(DomainWhitelist)
+        .where(DomainWhitelist.user_count != actual)
+        .values(user_count=actual)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+class DomainCountReconciler:
+    """Periodically correct drift in DomainWhitelist.user_count.
+
+    Counts are kept in step with users as they are inserted, deleted or
+    change domain through the ORM (see models/user.py); writes that bypass
+    it (bulk SQL, manual edits) are caught here every ``interval`` seconds.
+    """
+
+    def __init__(self, interval: float = 3600.0):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.runs = 0
+        self.errors = 0
+        self.corrected = 0
+        self.last_run_ms = 0.0
+
+    async def run_once(self) -> int:
+        """Reconcile every domain now."""
+        started = time.monotonic()
+        async with AsyncSessionLocal() as db:
+            corrected = await reconcile_domain_counts(db)
+            await db.commit()
+        if corrected:
+            logger.info(f"Corrected user counts of {corrected} domains")
+
+        self.runs += 1
+        self.corrected += corrected
+        self.last_run_ms = round((time.monotonic() - started) * 1000, 2)
+        return corrected
+
+    async def run_safely(self) -> None:
+        """Reconcile once, logging instead of raising."""
+        try:
+            await self.run_once()
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Domain user count reconciliation failed: {e}")
+
+    async def _run(self) -> None:
+        """Reconcile now and then periodically."""
+        while True:
+            await self.run_safely()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start periodic reconciliation."""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic reconciliation."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get reconciliation counters."""
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "corrected": self.corrected,
+            "lastRunMs": self.last_run_ms,
+        }
+
+
+# Create a single reconciler instance
+domain_count_reconciler = DomainCountReconciler(
+    interval=settings.DOMAIN_COUNT_RECONCILE_INTERVAL,
+)
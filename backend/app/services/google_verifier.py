@@ -0,0 +1,204 @@
+"""Local Google ID-token verification with a shared certificate cache."""
+
+import asyncio
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+import httpx
+from google.auth import jwt as google_jwt
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+
+class CertSource(ABC):
+    """Source of Google's token signing certificates."""
+
+    @abstractmethod
+    async def fetch(self) -> Tuple[Dict[str, str], Optional[int]]:
+        """Get ``({key_id: pem_certificate}, max_age_seconds)``."""
+
+
+class HttpCertSource(CertSource):
+    """Fetch certificates from Google, honoring Cache-Control max-age."""
+
+    _max_age = re.compile(r"max-age=(\d+)")
+
+    def __init__(self, url: str = GOOGLE_CERTS_URL, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def fetch(self) -> Tuple[Dict[str, str], Optional[int]]:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+
+        match = self._max_age.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else None
+        return response.json(), max_age
+
+
+class StaticCertSource(CertSource):
+    """Fixed certificate set, e.g. a locally generated key pair in tests."""
+
+    def __init__(self, certs: Dict[str, str], max_age: Optional[int] = None):
+        self.certs = certs
+        self.max_age = max_age
+
+    async def fetch(self) -> Tuple[Dict[str, str], Optional[int]]:
+        return dict(self.certs), self.max_age
+
+
+class GoogleTokenVerifier:
+    """Verify Google ID tokens without blocking the event loop.
+
+    Certificates are fetched once per process and kept for the max-age the
+    source reports. A background task refreshes them ahead of expiry, so
+    sign-ins only wait on the network for the very first fetch or after an
+    unknown key ID (key rotation). Signature and claim checks run in a worker
+    thread.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        source: Optional[CertSource] = None,
+        default_max_age: int = 3600,
+        refresh_ahead: int = 300,
+        min_refetch_interval: int = 30,
+        clock_skew_seconds: int = 10
+    ):
+        self.client_id = client_id
+        self.source = source or HttpCertSource()
+        self.default_max_age = default_max_age
+        self.refresh_ahead = refresh_ahead
+        self.min_refetch_interval = min_refetch_interval
+        self.clock_skew_seconds = clock_skew_seconds
+
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.verifications = 0
+        self.failures = 0
+
+    def set_source(self, source: CertSource) -> None:
+        """Replace the certificate source and drop cached certificates."""
+        self.source = source
+        self._certs = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+
+    async def _refresh(self) -> Dict[str, str]:
+        """Fetch certificates from the source (single flight)."""
+        async with self._lock:
+            # Another caller may have refreshed while we waited
+            if self._certs and time.monotonic() - self._fetched_at < self.min_refetch_interval:
+                return self._certs
+
+            try:
+                certs, max_age = await self.source.fetch()
+            except Exception:
+                self.fetch_errors += 1
+                raise
+
+            now = time.monotonic()
+            self._certs = certs
+            self._fetched_at = now
+            self._expires_at = now + (max_age if max_age is not None else self.default_max_age)
+            self.fetches += 1
+            return certs
+
+    async def get_certs(self) -> Dict[str, str]:
+        """Get cached certificates, fetching them if missing or expired."""
+        if self._certs and time.monotonic() < self._expires_at:
+            return self._certs
+        return await self._refresh()
+
+    def _decode(self, token: str, certs: Dict[str, str]) -> dict:
+        """Check signature, audience, expiry and issuer (blocking)."""
+        idinfo = google_jwt.decode(
+            token,
+            certs=certs,
+            audience=self.client_id,
+            clock_skew_in_seconds=self.clock_skew_seconds,
+        )
+        if idinfo.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+        return idinfo
+
+    async def verify(self, token: str) -> dict:
+        """Verify an ID token and return its claims.
+
+        Raises ValueError if the token is invalid.
+        """
+        self.verifications += 1
+        try:
+            certs = await self.get_certs()
+
+            # Unknown key ID: Google may have rotated keys before our max-age ran out
+            key_id = google_jwt.decode_header(token).get("kid")
+            if key_id and key_id not in certs:
+                certs = await self._refresh()
+
+            return await asyncio.to_thread(self._decode, token, certs)
+        except ValueError:
+            self.failures += 1
+            raise
+        except httpx.HTTPError as e:
+            self.failures += 1
+            raise ValueError(f"Could not fetch Google certificates: {e}")
+
+    async def _run(self) -> None:
+        """Refresh certificates shortly before they expire."""
+        while True:
+            if self._certs:
+                delay = self._expires_at - time.monotonic() - self.refresh_ahead
+                await asyncio.sleep(max(delay, self.min_refetch_interval))
+            try:
+                await self._refresh()
+            except Exception as e:
+                logger.warning(f"Google certificate refresh failed: {e}")
+                await asyncio.sleep(self.min_refetch_interval)
+
+    def start(self) -> None:
+        """Start background certificate refresh."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background certificate refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        """Get verifier counters."""
+        return {
+            "cachedKeys": len(self._certs),
+            "expiresIn": max(int(self._expires_at - time.monotonic()), 0),
+            "fetches": self.fetches,
+            "fetchErrors": self.fetch_errors,
+            "verifications": self.verifications,
+            "failures": self.failures,
+        }
+
+
+# Create a single verifier instance
+google_verifier = GoogleTokenVerifier(settings.GOOGLE_CLIENT_ID)
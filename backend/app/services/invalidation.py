@@ -0,0 +1,310 @@
+"""Cross-worker cache invalidation bus (in-process, Redis pub/sub or PostgreSQL LISTEN/NOTIFY)."""
+
+import asyncio
+import json
+import logging
+import secrets
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from ..core.config import settings
+from .session_cache import session_cache
+from .session_activity import session_activity
+
+logger = logging.getLogger(__name__)
+
+# Invalidation kinds and what their keys are
+SESSION = "session"  # session IDs (logout)
+USER = "user"  # user IDs (revocation, role changes)
+KINDS = (SESSION, USER)
+
+
+class InvalidationBus(ABC):
+    """Broadcast fine-grained cache invalidations to every worker.
+
+    ``publish`` applies an invalidation to this worker's caches at once and
+    then broadcasts it; other workers apply it when it arrives (pub/sub,
+    typically within milliseconds). A worker that loses its connection to
+    the channel may miss messages, so it resets its caches whenever it
+    (re)connects. Cache TTLs (e.g. SESSION_CACHE_TTL) stay the upper bound
+    on staleness if the channel is down altogether.
+    """
+
+    # Largest encoded message the backend accepts (None = unbounded)
+    max_payload: Optional[int] = None
+
+    def __init__(self, reconnect_delay: float = 1.0):
+        self.reconnect_delay = reconnect_delay
+        self.origin = secrets.token_hex(8)
+        self._handlers: Dict[str, List[Callable[[str], Any]]] = {kind: [] for kind in KINDS}
+        self._reset_handlers: List[Callable[[], Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+
+        # Counters
+        self.published = 0
+        self.received = 0
+        self.applied = 0
+        self.resets = 0
+        self.errors = 0
+
+    def subscribe(self, kind: str, handler: Callable[[str], Any]) -> None:
+        """Call ``handler(key)`` for every invalidation of ``kind``."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown invalidation kind: {kind}")
+        self._handlers[kind].append(handler)
+
+    def on_reset(self, handler: Callable[[], Any]) -> None:
+        """Call ``handler()`` when invalidations may have been missed."""
+        self._reset_handlers.append(handler)
+
+    async def publish(self, kind: str, keys: Iterable[str]) -> None:
+        """Invalidate keys on this worker, then broadcast to the others.
+
+        Broadcast failures are logged, not raised: the change itself is
+        already committed, and other workers catch up by TTL or on reconnect.
+        """
+        keys = [key for key in dict.fromkeys(keys) if key]
+        if not keys:
+            return
+        self._apply(kind, keys)
+        self.published += len(keys)
+
+        try:
+            for payload in self._payloads(kind, keys):
+                await self._broadcast(payload)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Failed to broadcast {kind} invalidation: {e}")
+
+    def _payloads(self, kind: str, keys: List[str]) -> Iterator[str]:
+        """Encode keys as one or more messages within ``max_payload``."""
+        batch: List[str] = []
+        for key in keys:
+            candidate = batch + [key]
+            if batch and self.max_payload and len(self._encode(kind, candidate)) > self.max_payload:
+                yield self._encode(kind, batch)
+                candidate = [key]
+            batch = candidate
+        if batch:
+            yield self._encode(kind, batch)
+
+    def _encode(self, kind: str, keys: List[str]) -> str:
+        return json.dumps({"o": self.origin, "k": kind, "v": keys}, separators=(",", ":"))
+
+    def _receive(self, payload: str) -> None:
+        """Apply a message broadcast by another worker."""
+        try:
+            message = json.loads(payload)
+            if message["o"] == self.origin:
+                return
+            self.received += 1
+            self._apply(message["k"], message["v"])
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Ignoring malformed invalidation message: {e}")
+
+    def _apply(self, kind: str, keys: List[str]) -> None:
+        for handler in self._handlers.get(kind, ()):
+            for key in keys:
+                handler(key)
+        self.applied += len(keys)
+
+    def _connected(self) -> None:
+        """Mark the channel as live, resetting caches in case messages were missed."""
+        self.connected = True
+        self.resets += 1
+        for handler in self._reset_handlers:
+            handler()
+
+    @abstractmethod
+    async def _broadcast(self, payload: str) -> None:
+        """Send an encoded message to every worker."""
+
+    @abstractmethod
+    async def _listen(self) -> None:
+        """Receive messages until the connection drops (call ``_connected`` once subscribed)."""
+
+    async def _run(self) -> None:
+        """Listen, reconnecting after ``reconnect_delay`` on failure."""
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Invalidation channel lost: {e}")
+            self.connected = False
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def start(self) -> None:
+        """Start listening for other workers' invalidations."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop listening and release backend resources."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get bus counters."""
+        return {
+            "backend": type(self).__name__,
+            "connected": self.connected,
+            "published": self.published,
+            "received": self.received,
+            "applied": self.applied,
+            "resets": self.resets,
+            "errors": self.errors,
+        }
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """Single-worker bus: invalidations only ever apply in this process."""
+
+    async def _broadcast(self, payload: str) -> None:
+        """Nothing else to tell."""
+
+    async def _listen(self) -> None:
+        """Nothing to listen to."""
+
+    async def start(self) -> None:
+        self.connected = True
+
+    async def stop(self) -> None:
+        self.connected = False
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """Broadcast over a Redis pub/sub channel."""
+
+    def __init__(self, client: Any, channel: str = "terralink:invalidations", reconnect_delay: float = 1.0):
+        super().__init__(reconnect_delay)
+        self.client = client
+        self.channel = channel
+
+    async def _broadcast(self, payload: str) -> None:
+        await self.client.publish(self.channel, payload)
+
+    async def _listen(self) -> None:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.channel)
+            self._connected()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    data = message["data"]
+                    self._receive(data.decode() if isinstance(data, bytes) else data)
+        finally:
+            await pubsub.aclose()
+        raise ConnectionError("subscription ended")
+
+    async def stop(self) -> None:
+        await super().stop()
+        await self.client.aclose()
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """Broadcast with PostgreSQL LISTEN/NOTIFY over a dedicated connection."""
+
+    # NOTIFY payloads must be shorter than 8000 bytes
+    max_payload = 7900
+
+    def __init__(self, dsn: str, channel: str = "terralink_invalidations", reconnect_delay: float = 1.0):
+        super().__init__(reconnect_delay)
+        self.dsn = dsn
+        self.channel = channel
+        self._connection: Any = None
+        self._lock = asyncio.Lock()
+
+    async def _broadcast(self, payload: str) -> None:
+        if self._connection is None:
+            raise ConnectionError("not connected")
+        # One connection runs one statement at a time
+        async with self._lock:
+            await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def _listen(self) -> None:
+        # Optional dependency, only needed with PostgreSQL
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        closed = asyncio.Event()
+        try:
+            connection.add_termination_listener(lambda _: closed.set())
+            await connection.add_listener(
+                self.channel, lambda _connection, _pid, _channel, payload: self._receive(payload)
+            )
+            self._connection = connection
+            self._connected()
+            await closed.wait()
+        finally:
+            self._connection = None
+            if not connection.is_closed():
+                await connection.close()
+        raise ConnectionError("listener connection closed")
+
+
+def _register_handlers(bus: InvalidationBus) -> None:
+    """Wire this worker's caches to the bus."""
+    bus.subscribe(SESSION, session_cache.invalidate)
+    bus.subscribe(SESSION, session_activity.forget)
+    bus.subscribe(USER, session_cache.invalidate_user)
+    bus.subscribe(USER, session_activity.forget_user)
+    bus.on_reset(session_cache.clear)
+
+
+_invalidation_bus: Optional[InvalidationBus] = None
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    """Get the configured bus (INVALIDATION_BACKEND: local, redis or postgres)."""
+    global _invalidation_bus
+    if _invalidation_bus is None:
+        backend = settings.INVALIDATION_BACKEND
+        delay = settings.INVALIDATION_RECONNECT_DELAY
+        if backend == "redis":
+            # Optional dependency, only needed when Redis is used
+            import redis.asyncio as redis
+
+            client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+            bus: InvalidationBus = RedisInvalidationBus(client, settings.INVALIDATION_CHANNEL, delay)
+        elif backend == "postgres":
+            from sqlalchemy.engine import make_url
+
+            # asyncpg takes a plain postgresql:// DSN
+            url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+            bus = PostgresInvalidationBus(
+                url.render_as_string(hide_password=False), settings.INVALIDATION_CHANNEL, delay
+            )
+        else:
+            bus = LocalInvalidationBus(delay)
+        _register_handlers(bus)
+        _invalidation_bus = bus
+    return _invalidation_bus
+
+
+def set_invalidation_bus(bus: Optional[InvalidationBus]) -> None:
+    """Override the bus (e.g. a RedisInvalidationBus over fakeredis)."""
+    global _invalidation_bus
+    if bus is not None:
+        _register_handlers(bus)
+    _invalidation_bus = bus
+
+
+async def invalidate_sessions(session_ids: Iterable[str]) -> None:
+    """Drop sessions from every worker's caches (logout)."""
+    await get_invalidation_bus().publish(SESSION, session_ids)
+
+
+async def invalidate_users(user_ids: Iterable[str]) -> None:
+    """Drop users' cached sessions on every worker (revocation, role changes)."""
+    await get_invalidation_bus().publish(USER, user_ids)
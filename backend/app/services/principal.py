@@ -0,0 +1,69 @@
+"""Compact, immutable identity resolved from a session."""
+
+from datetime import datetime
+from typing import Any, Optional
+
+from ..models import UserRole
+
+
+class SessionPrincipal:
+    """Authenticated user and session, as seen by route dependencies.
+
+    Built from a single query (or Redis hash) instead of ORM instances, so it
+    is cheap to create, safe to cache across requests and cannot be flushed
+    back to the database by accident.
+    """
+
+    __slots__ = (
+        "session_id",
+        "user_id",
+        "email",
+        "name",
+        "picture",
+        "role",
+        "domain",
+        "csrf_token",
+        "expires_at",
+        "last_activity",
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        user_id: str,
+        email: str,
+        name: str,
+        role: UserRole,
+        csrf_token: str,
+        expires_at: datetime,
+        last_activity: Optional[datetime] = None,
+        picture: Optional[str] = None,
+    ):
+        values = {
+            "session_id": session_id,
+            "user_id": user_id,
+            "email": email,
+            "name": name,
+            "picture": picture,
+            "role": UserRole(role),
+            "domain": email.split("@")[1] if "@" in email else "",
+            "csrf_token": csrf_token,
+            "expires_at": expires_at,
+            "last_activity": last_activity,
+        }
+        for field, value in values.items():
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("SessionPrincipal is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("SessionPrincipal is immutable")
+
+    @property
+    def is_admin(self) -> bool:
+        """Check if the user has the admin role."""
+        return self.role == UserRole.ADMIN
+
+    def __repr__(self):
+        return f"<SessionPrincipal(session_id={self.session_id[:10]}..., email={self.email}, role={self.role.value})>"
@@ -0,0 +1,171 @@
+"""In-process ring buffers of the latest activity per user and overall."""
+
+import bisect
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models import ActivityLog
+from .activity_dictionary import activity_dictionary
+from .activity_hub import event_record
+
+
+class RecentBuffer:
+    """Latest activity records for one scope, oldest first."""
+
+    __slots__ = ("ids", "records", "warmed_at", "complete")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.records: List[Dict[str, Any]] = []
+        self.warmed_at: Optional[float] = None
+        # True when the buffer holds every activity in its scope
+        self.complete = False
+
+    def add(self, record: Dict[str, Any], size: int) -> None:
+        """Insert a record in ID order, keeping the newest ``size``."""
+        if record["id"] in self.ids:
+            return
+        index = bisect.bisect(self.ids, record["id"])
+        self.ids.insert(index, record["id"])
+        self.records.insert(index, record)
+        if len(self.ids) > size:
+            del self.ids[:-size]
+            del self.records[:-size]
+            self.complete = False
+
+    def remove(self, activity_ids: set) -> None:
+        """Drop records by ID."""
+        keep = [i for i, activity_id in enumerate(self.ids) if activity_id not in activity_ids]
+        self.ids = [self.ids[i] for i in keep]
+        self.records = [self.records[i] for i in keep]
+
+
+class RecentActivity:
+    """Serve "latest N" activity reads from memory.
+
+    Tracked events are added when they are accepted for ingestion, so a
+    user sees their own activity immediately, even before the batch is
+    written. A buffer is (re)warmed from the database on first use and
+    again once it is ``ttl`` seconds old, merging what it already holds;
+    this picks up activity written by other workers. Reads deeper than
+    ``size`` go to the database.
+    """
+
+    def __init__(self, size: int = 100, max_users: int = 500, ttl: float = 10.0):
+        self.size = size
+        self.max_users = max_users
+        self.ttl = ttl
+        self._global = RecentBuffer()
+        self._users: "OrderedDict[str, RecentBuffer]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.warms = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Check if buffers are kept at all."""
+        return self.size > 0
+
+    def _user_buffer(self, email: str) -> RecentBuffer:
+        buffer = self._users.get(email)
+        if buffer is None:
+            buffer = self._users[email] = RecentBuffer()
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        self._users.move_to_end(email)
+        return buffer
+
+    def record(self, rows: List[Dict[str, Any]]) -> None:
+        """Add accepted activity rows to the buffers."""
+        if not self.enabled:
+            return
+        for row in rows:
+            record = event_record(row)
+            self._global.add(record, self.size)
+            self._user_buffer(row["user_email"]).add(record, self.size)
+
+    def forget(self, rows: List[Dict[str, Any]]) -> None:
+        """Drop rows that failed to be written."""
+        activity_ids = {row["id"] for row in rows}
+        self._global.remove(activity_ids)
+        for email in {row["user_email"] for row in rows}:
+            buffer = self._users.get(email)
+            if buffer is not None:
+                buffer.remove(activity_ids)
+
+    async def _warm(self, db: AsyncSession, buffer: RecentBuffer, email: Optional[str]) -> None:
+        """Merge the latest activities from the database into a buffer."""
+        query = select(ActivityLog)
+        if email is not None:
+            query = query.where(ActivityLog.user_email == email)
+        result = await db.execute(query.order_by(desc(ActivityLog.id)).limit(self.size))
+        activities = result.scalars().all()
+        await activity_dictionary.load(db, activities)
+
+        for activity in activities:
+            buffer.add(event_record({
+                "id": activity.id,
+                "user_email": activity.user_email,
+                "user_role": activity.user_role,
+                "action_metadata": activity.action_metadata,
+                "timestamp": activity.timestamp,
+                **activity_dictionary.names(activity),
+            }), self.size)
+        buffer.complete = len(activities) < self.size and len(buffer.ids) < self.size
+        buffer.warmed_at = time.monotonic()
+        self.warms += 1
+
+    async def latest(
+        self,
+        db: AsyncSession,
+        email: Optional[str],
+        limit: int
+    ) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        """Get the newest ``limit`` records, newest first, and whether older ones exist.
+
+        ``email`` None means all users. Returns None when ``limit`` is
+        deeper than the buffers.
+        """
+        if not self.enabled or limit > self.size:
+            return None
+
+        buffer = self._global if email is None else self._user_buffer(email)
+        if buffer.warmed_at is None or time.monotonic() - buffer.warmed_at >= self.ttl:
+            await self._warm(db, buffer, email)
+        else:
+            self.hits += 1
+
+        records = buffer.records[::-1][:limit]
+        has_more = len(buffer.records) > limit or (
+            not buffer.complete and len(buffer.records) == limit
+        )
+        return records, has_more
+
+    def clear(self) -> None:
+        """Drop all buffers."""
+        self._global = RecentBuffer()
+        self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get buffer counters."""
+        return {
+            "size": self.size,
+            "users": len(self._users),
+            "globalRecords": len(self._global.records),
+            "hits": self.hits,
+            "warms": self.warms,
+        }
+
+
+# Create a single buffer instance
+recent_activity = RecentActivity(
+    size=settings.ACTIVITY_RECENT_SIZE,
+    max_users=settings.ACTIVITY_RECENT_MAX_USERS,
+    ttl=settings.ACTIVITY_RECENT_TTL,
+)
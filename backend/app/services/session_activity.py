@@ -0,0 +1,161 @@
+"""Write-behind buffering of session last-activity timestamps."""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+from ..core.config import settings
+from ..db.base import AsyncSessionLocal
+from .session_store import get_session_store
+from .principal import SessionPrincipal
+
+logger = logging.getLogger(__name__)
+
+
+class SessionActivityBuffer:
+    """Collect session activity in memory and persist it in bulk.
+
+    ``record`` only queues an update when the session's stored
+    ``last_activity`` is older than ``granularity_seconds``; queued updates
+    are written by a background task every ``flush_interval`` seconds with a
+    single statement per flush, and once more on shutdown.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 30.0,
+        granularity_seconds: float = 60.0,
+        max_tracked: int = 10000
+    ):
+        self.flush_interval = flush_interval
+        self.granularity = timedelta(seconds=granularity_seconds)
+        self.max_tracked = max_tracked
+        # session_id -> (last_activity, expires_at)
+        self._pending: Dict[str, Tuple[datetime, datetime]] = {}
+        # session_id -> last recorded activity, so immutable principals
+        # (possibly cached) don't need updating
+        self._last_recorded: "OrderedDict[str, datetime]" = OrderedDict()
+        # user_id <-> session IDs tracked above, so a revoked user's
+        # sessions can be dropped
+        self._session_users: Dict[str, str] = {}
+        self._user_sessions: Dict[str, Set[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.recorded = 0
+        self.skipped = 0
+        self.flushes = 0
+        self.flushed = 0
+
+    def record(self, principal: SessionPrincipal) -> None:
+        """Note activity on a session, skipping it if recently recorded."""
+        now = datetime.utcnow()
+        session_id = principal.session_id
+
+        last_activity = self._last_recorded.get(session_id) or principal.last_activity
+        if last_activity is not None:
+            if last_activity.tzinfo is not None:
+                last_activity = last_activity.replace(tzinfo=None)
+            if now - last_activity < self.granularity:
+                self.skipped += 1
+                return
+
+        self._pending[session_id] = (now, principal.expires_at)
+        self._last_recorded[session_id] = now
+        self._last_recorded.move_to_end(session_id)
+        if session_id not in self._session_users:
+            self._session_users[session_id] = principal.user_id
+            self._user_sessions.setdefault(principal.user_id, set()).add(session_id)
+        while len(self._last_recorded) > self.max_tracked:
+            evicted, _ = self._last_recorded.popitem(last=False)
+            if evicted not in self._pending:
+                self._untrack(evicted)
+        self.recorded += 1
+
+    def forget(self, session_id: str) -> None:
+        """Drop a pending update for a deleted session."""
+        self._pending.pop(session_id, None)
+        self._last_recorded.pop(session_id, None)
+        self._untrack(session_id)
+
+    def forget_user(self, user_id: str) -> int:
+        """Drop pending updates for all of a revoked user's sessions."""
+        session_ids = list(self._user_sessions.get(user_id, ()))
+        for session_id in session_ids:
+            self.forget(session_id)
+        return len(session_ids)
+
+    def _untrack(self, session_id: str) -> None:
+        user_id = self._session_users.pop(session_id, None)
+        user_sessions = self._user_sessions.get(user_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._user_sessions[user_id]
+
+    async def flush(self) -> int:
+        """Persist all pending updates."""
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        try:
+            async with AsyncSessionLocal() as db:
+                await get_session_store().touch_many(db, pending)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to flush session activity: {e}")
+            # Retry on the next flush, keeping any newer values
+            for session_id, value in pending.items():
+                self._pending.setdefault(session_id, value)
+            return 0
+
+        for session_id in pending:
+            if session_id not in self._pending and session_id not in self._last_recorded:
+                self._untrack(session_id)
+
+        self.flushes += 1
+        self.flushed += len(pending)
+        return len(pending)
+
+    async def _run(self) -> None:
+        """Flush pending updates periodically."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is None and self.flush_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and flush what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Get buffer counters."""
+        return {
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "skipped": self.skipped,
+            "flushes": self.flushes,
+            "flushed": self.flushed,
+        }
+
+
+# Create a single buffer instance
+session_activity = SessionActivityBuffer(
+    flush_interval=settings.SESSION_ACTIVITY_FLUSH_INTERVAL,
+    granularity_seconds=settings.SESSION_ACTIVITY_GRANULARITY,
+    max_tracked=max(settings.SESSION_CACHE_MAX_SIZE, 1000),
+)
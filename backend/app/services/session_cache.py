@@ -0,0 +1,138 @@
+"""In-process TTL/LRU cache for validated sessions."""
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from ..core.config import settings
+
+
+class SessionCache:
+    """Bounded, size-capped session cache keyed by session ID.
+
+    Entries expire after ``ttl_seconds`` or when the session itself expires,
+    whichever comes first. Least recently used entries are evicted once
+    ``max_size`` is reached. A secondary index by user ID allows all of a
+    user's sessions to be invalidated at once (revocation, role changes).
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._user_index: Dict[str, Set[str]] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Check if caching is enabled."""
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Get a cached session, or None on miss or expiry."""
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(session_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, user_id, deadline, expires_at = entry
+        if time.monotonic() >= deadline or datetime.utcnow() >= expires_at:
+            self._remove(session_id)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(session_id)
+        self.hits += 1
+        return value
+
+    def set(self, session_id: str, user_id: str, expires_at: datetime, value: Any) -> None:
+        """Cache a validated session."""
+        if not self.enabled:
+            return
+
+        # Compare naive UTC datetimes, as stored by the session model
+        if expires_at.tzinfo is not None:
+            expires_at = expires_at.replace(tzinfo=None)
+
+        if session_id in self._entries:
+            self._remove(session_id)
+
+        self._entries[session_id] = (
+            value,
+            user_id,
+            time.monotonic() + self.ttl_seconds,
+            expires_at,
+        )
+        self._user_index.setdefault(user_id, set()).add(session_id)
+
+        while len(self._entries) > self.max_size:
+            oldest_id = next(iter(self._entries))
+            self._remove(oldest_id)
+            self.evictions += 1
+
+    def invalidate(self, session_id: str) -> bool:
+        """Drop a single session from the cache."""
+        if session_id not in self._entries:
+            return False
+        self._remove(session_id)
+        self.invalidations += 1
+        return True
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop every cached session belonging to a user."""
+        session_ids = list(self._user_index.get(user_id, ()))
+        for session_id in session_ids:
+            self._remove(session_id)
+        self.invalidations += len(session_ids)
+        return len(session_ids)
+
+    def clear(self) -> None:
+        """Drop all cached sessions."""
+        self._entries.clear()
+        self._user_index.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxSize": self.max_size,
+            "ttlSeconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, session_id: str) -> None:
+        """Remove an entry and its user index reference."""
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return
+        user_id = entry[1]
+        user_sessions = self._user_index.get(user_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._user_index[user_id]
+
+
+# Create a single cache instance
+session_cache = SessionCache(
+    max_size=settings.SESSION_CACHE_MAX_SIZE,
+    ttl_seconds=settings.SESSION_CACHE_TTL,
+)
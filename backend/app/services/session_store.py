@@ -0,0 +1,640 @@
+"""Pluggable session storage backends (SQL table or Redis)."""
+
+import calendar
+import json
+import secrets
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, delete, update, case, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.util import ClauseAdapter
+
+from ..core.config import settings
+from ..db.base import is_postgresql
+from ..models import User, Session, UserRole
+from .principal import SessionPrincipal
+
+
+class SessionStore(ABC):
+    """Interface for session persistence.
+
+    Every method takes the request's database session so that SQL-backed
+    stores can participate in the same transaction; other backends may
+    ignore it.
+    """
+
+    @staticmethod
+    def new_session(
+        user: User,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> Session:
+        """Build a new (unsaved) session for the user."""
+        now = datetime.utcnow()
+        return Session(
+            id=secrets.token_hex(32),
+            user_id=user.id,
+            csrf_token=secrets.token_hex(settings.CSRF_TOKEN_LENGTH),
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.COOKIE_MAX_AGE),
+            last_activity=now,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+
+    @abstractmethod
+    async def create(
+        self,
+        db: AsyncSession,
+        user: User,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> Session:
+        """Create a new session for the user.
+
+        SQL-backed stores only stage the row; the caller commits, and calls
+        ``discard`` if the commit fails.
+        """
+
+    async def discard(self, db: AsyncSession, session: Session) -> None:
+        """Undo ``create`` after the caller's transaction failed.
+
+        Nothing to do for SQL-backed stores: the rollback drops the row.
+        """
+
+    @abstractmethod
+    async def get(
+        self,
+        db: AsyncSession,
+        session_id: str,
+        touch: bool = False
+    ) -> Optional[SessionPrincipal]:
+        """Resolve an unexpired session of an active user.
+
+        With ``touch`` the store also sets ``last_activity`` to now, in the
+        same round trip where the backend allows it.
+        """
+
+    @abstractmethod
+    async def touch_many(
+        self,
+        db: AsyncSession,
+        updates: Dict[str, Tuple[datetime, datetime]]
+    ) -> None:
+        """Set last activity on sessions, given ``{id: (last_activity, expires_at)}``."""
+
+    @abstractmethod
+    async def delete(self, db: AsyncSession, session_id: str) -> bool:
+        """Delete a single session."""
+
+    @abstractmethod
+    async def delete_for_user(self, db: AsyncSession, user_id: str) -> int:
+        """Delete every session belonging to a user."""
+
+    @abstractmethod
+    async def delete_for_users(self, db: AsyncSession, user_ids: Iterable[str]) -> Dict[str, int]:
+        """Delete every session belonging to several users, counting per user.
+
+        SQL-backed stores delete in the caller's transaction without
+        committing.
+        """
+
+    @abstractmethod
+    async def update_user(self, db: AsyncSession, user: User) -> None:
+        """Propagate user changes (role, status) to stored sessions."""
+
+    async def update_users(self, db: AsyncSession, users: Iterable[User]) -> None:
+        """Propagate changes to several users."""
+        for user in users:
+            await self.update_user(db, user)
+
+    @abstractmethod
+    async def active_session_ids(
+        self,
+        db: AsyncSession,
+        user_ids: Iterable[str]
+    ) -> Dict[str, List[str]]:
+        """Get unexpired session IDs for the given users."""
+
+    @abstractmethod
+    async def cleanup_expired(self, db: AsyncSession) -> int:
+        """Remove expired sessions."""
+
+    async def users_with_sessions(
+        self,
+        db: AsyncSession,
+        query: Select,
+        order_by: Sequence[Any] = ()
+    ) -> List[Tuple[User, int, List[str]]]:
+        """Run a query for User rows and attach each user's unexpired sessions.
+
+        Returns (user, active session count, session IDs) in ``order_by``
+        order, which should be the query's own. Only the users the query
+        returns are looked up.
+        """
+        result = await db.execute(query)
+        users = list(result.scalars().all())
+        sessions_map = await self.active_session_ids(db, [user.id for user in users])
+        return [
+            (user, len(sessions_map.get(user.id, [])), sessions_map.get(user.id, []))
+            for user in users
+        ]
+
+    async def close(self) -> None:
+        """Release backend resources."""
+
+
+class SQLSessionStore(SessionStore):
+    """Session store backed by the SQL ``sessions`` table."""
+
+    async def create(
+        self,
+        db: AsyncSession,
+        user: User,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> Session:
+        """Stage a new session row in the caller's transaction."""
+        session = self.new_session(user, ip_address, user_agent)
+        session.user = user
+        db.add(session)
+        return session
+
+    _principal_columns = (
+        Session.id,
+        Session.user_id,
+        Session.csrf_token,
+        Session.expires_at,
+        Session.last_activity,
+        User.email,
+        User.name,
+        User.picture,
+        User.role,
+    )
+
+    async def get(
+        self,
+        db: AsyncSession,
+        session_id: str,
+        touch: bool = False
+    ) -> Optional[SessionPrincipal]:
+        """Resolve an unexpired session of an active user in one statement."""
+        now = datetime.utcnow()
+
+        if touch and is_postgresql():
+            # UPDATE ... FROM users ... RETURNING: validate and touch at once
+            stmt = (
+                update(Session.__table__)
+                .where(Session.id == session_id)
+                .where(Session.user_id == User.id)
+                .where(Session.expires_at > now)
+                .where(User.is_active.is_(True))
+                .values(last_activity=now)
+                .returning(*self._principal_columns)
+            )
+        else:
+            stmt = (
+                select(*self._principal_columns)
+                .join(User, User.id == Session.user_id)
+                .where(Session.id == session_id)
+                .where(Session.expires_at > now)
+                .where(User.is_active.is_(True))
+            )
+
+        row = (await db.execute(stmt)).first()
+        if row is None:
+            return None
+
+        if touch and not is_postgresql():
+            await self.touch_many(db, {session_id: (now, row.expires_at)})
+
+        return SessionPrincipal(
+            session_id=row.id,
+            user_id=row.user_id,
+            email=row.email,
+            name=row.name,
+            picture=row.picture,
+            role=row.role,
+            csrf_token=row.csrf_token,
+            expires_at=row.expires_at,
+            last_activity=now if touch else row.last_activity,
+        )
+
+    async def touch_many(
+        self,
+        db: AsyncSession,
+        updates: Dict[str, Tuple[datetime, datetime]]
+    ) -> None:
+        """Set last activity on sessions with one UPDATE per chunk."""
+        session_ids = list(updates)
+        for start in range(0, len(session_ids), 500):
+            chunk = {
+                session_id: updates[session_id][0]
+                for session_id in session_ids[start:start + 500]
+            }
+            await db.execute(
+                update(Session)
+                .where(Session.id.in_(list(chunk)))
+                .values(last_activity=case(chunk, value=Session.id))
+                .execution_options(synchronize_session=False)
+            )
+
+    async def delete(self, db: AsyncSession, session_id: str) -> bool:
+        """Delete a single session."""
+        result = await db.execute(
+            delete(Session).where(Session.id == session_id)
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+    async def delete_for_user(self, db: AsyncSession, user_id: str) -> int:
+        """Delete every session belonging to a user."""
+        result = await db.execute(
+            delete(Session).where(Session.user_id == user_id)
+        )
+        await db.commit()
+        return result.rowcount
+
+    async def delete_for_users(self, db: AsyncSession, user_ids: Iterable[str]) -> Dict[str, int]:
+        """Delete every session belonging to several users in one statement."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        result = await db.execute(
+            delete(Session)
+            .where(Session.user_id.in_(user_ids))
+            .returning(Session.user_id)
+        )
+        deleted: Dict[str, int] = {}
+        for user_id in result.scalars().all():
+            deleted[user_id] = deleted.get(user_id, 0) + 1
+        return deleted
+
+    async def update_user(self, db: AsyncSession, user: User) -> None:
+        """Sessions reference the users table directly; nothing to update."""
+
+    async def update_users(self, db: AsyncSession, users: Iterable[User]) -> None:
+        """Sessions reference the users table directly; nothing to update."""
+
+    async def active_session_ids(
+        self,
+        db: AsyncSession,
+        user_ids: Iterable[str]
+    ) -> Dict[str, List[str]]:
+        """Get unexpired session IDs for the given users."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+
+        result = await db.execute(
+            select(Session.id, Session.user_id)
+            .where(Session.user_id.in_(user_ids))
+            .where(Session.expires_at > datetime.utcnow())
+        )
+
+        sessions_map: Dict[str, List[str]] = {}
+        for session_id, user_id in result.all():
+            sessions_map.setdefault(user_id, []).append(session_id)
+        return sessions_map
+
+    async def users_with_sessions(
+        self,
+        db: AsyncSession,
+        query: Select,
+        order_by: Sequence[Any] = ()
+    ) -> List[Tuple[User, int, List[str]]]:
+        """Run a query for User rows and attach each user's unexpired sessions.
+
+        One statement: the query (with its filters and limit) becomes a
+        subquery, left-joined to its users' unexpired sessions through the
+        (user_id, expires_at) index and aggregated per user with array_agg
+        (PostgreSQL) or json_group_array (SQLite).
+        """
+        page = query.subquery()
+        user = aliased(User, page)
+        if is_postgresql():
+            session_ids = func.array_agg(Session.id)
+        else:
+            session_ids = func.json_group_array(Session.id)
+
+        adapter = ClauseAdapter(page)
+        result = await db.execute(
+            select(
+                user,
+                func.count(Session.id),
+                session_ids.filter(Session.id.is_not(None))
+            )
+            .outerjoin(Session, and_(
+                Session.user_id == user.id,
+                Session.expires_at > datetime.utcnow()
+            ))
+            .group_by(*page.c)
+            .order_by(*(adapter.traverse(clause) for clause in order_by))
+        )
+
+        rows = []
+        for row_user, count, ids in result.all():
+            if isinstance(ids, str):
+                ids = json.loads(ids)
+            rows.append((row_user, count, list(ids or [])))
+        return rows
+
+    async def cleanup_expired(self, db: AsyncSession) -> int:
+        """Remove expired sessions."""
+        result = await db.execute(
+            delete(Session).where(Session.expires_at < datetime.utcnow())
+        )
+        await db.commit()
+        return result.rowcount
+
+
+class RedisSessionStore(SessionStore):
+    """Session store backed by Redis.
+
+    Each session is a hash at ``{prefix}session:{id}`` that expires natively
+    at ``expires_at`` and carries a snapshot of the user fields needed to
+    authorize requests, so validation never touches the database. A set at
+    ``{prefix}user_sessions:{user_id}`` indexes a user's sessions so they can
+    be revoked without scanning.
+    """
+
+    def __init__(self, client: Any, prefix: str = "terralink:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.prefix}session:{session_id}"
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.prefix}user_sessions:{user_id}"
+
+    @staticmethod
+    def _epoch(value: datetime) -> int:
+        """Convert a naive UTC datetime to a Unix timestamp."""
+        return calendar.timegm(value.utctimetuple())
+
+    @staticmethod
+    def _serialize(session: Session, user: User) -> Dict[str, str]:
+        return {
+            "user_id": user.id,
+            "csrf_token": session.csrf_token,
+            "created_at": session.created_at.isoformat(),
+            "expires_at": session.expires_at.isoformat(),
+            "last_activity": session.last_activity.isoformat(),
+            "ip_address": session.ip_address or "",
+            "user_agent": session.user_agent or "",
+            "user_email": user.email,
+            "user_name": user.name,
+            "user_role": UserRole(user.role).value,
+            "user_picture": user.picture or "",
+            "user_is_active": "1" if user.is_active is not False else "0",
+        }
+
+    @staticmethod
+    def _deserialize(session_id: str, data: Dict[str, str]) -> SessionPrincipal:
+        return SessionPrincipal(
+            session_id=session_id,
+            user_id=data["user_id"],
+            email=data["user_email"],
+            name=data["user_name"],
+            picture=data.get("user_picture") or None,
+            role=UserRole(data["user_role"]),
+            csrf_token=data["csrf_token"],
+            expires_at=datetime.fromisoformat(data["expires_at"]),
+            last_activity=datetime.fromisoformat(data["last_activity"]),
+        )
+
+    async def create(
+        self,
+        db: AsyncSession,
+        user: User,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> Session:
+        """Create and persist a new session for the user."""
+        session = self.new_session(user, ip_address, user_agent)
+        session_key = self._session_key(session.id)
+        user_key = self._user_key(user.id)
+        expires_at = self._epoch(session.expires_at)
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(session_key, mapping=self._serialize(session, user))
+            pipe.expireat(session_key, expires_at)
+            pipe.sadd(user_key, session.id)
+            # New sessions always outlive older ones, so the index follows them
+            pipe.expireat(user_key, expires_at)
+            await pipe.execute()
+
+        return session
+
+    async def discard(self, db: AsyncSession, session: Session) -> None:
+        """Delete a session written before the caller's transaction failed."""
+        await self.delete(db, session.id)
+
+    async def get(
+        self,
+        db: AsyncSession,
+        session_id: str,
+        touch: bool = False
+    ) -> Optional[SessionPrincipal]:
+        """Resolve an unexpired session of an active user from its hash."""
+        data = await self.client.hgetall(self._session_key(session_id))
+        if not data or "user_id" not in data:
+            return None
+        if data.get("user_is_active", "1") != "1":
+            return None
+
+        principal = self._deserialize(session_id, data)
+        if datetime.utcnow() >= principal.expires_at:
+            return None
+
+        if touch:
+            now = datetime.utcnow()
+            await self.touch_many(db, {session_id: (now, principal.expires_at)})
+        return principal
+
+    async def touch_many(
+        self,
+        db: AsyncSession,
+        updates: Dict[str, Tuple[datetime, datetime]]
+    ) -> None:
+        """Set last activity on live sessions, preserving their expiry."""
+        session_ids = list(updates)
+        if not session_ids:
+            return
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.exists(self._session_key(session_id))
+            alive = await pipe.execute()
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for session_id, exists in zip(session_ids, alive):
+                if not exists:
+                    continue
+                last_activity, expires_at = updates[session_id]
+                session_key = self._session_key(session_id)
+                pipe.hset(session_key, "last_activity", last_activity.isoformat())
+                # Re-apply the expiry: if the key vanished in between, HSET
+                # recreated it and an expiry in the past removes it again
+                pipe.expireat(session_key, self._epoch(expires_at))
+            await pipe.execute()
+
+    async def delete(self, db: AsyncSession, session_id: str) -> bool:
+        """Delete a single session."""
+        session_key = self._session_key(session_id)
+        user_id = await self.client.hget(session_key, "user_id")
+        if user_id is None:
+            return False
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(session_key)
+            pipe.srem(self._user_key(user_id), session_id)
+            deleted, _ = await pipe.execute()
+        return deleted > 0
+
+    async def delete_for_user(self, db: AsyncSession, user_id: str) -> int:
+        """Delete every session belonging to a user."""
+        user_key = self._user_key(user_id)
+        session_ids = await self.client.smembers(user_key)
+        if not session_ids:
+            return 0
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(*[self._session_key(session_id) for session_id in session_ids])
+            pipe.delete(user_key)
+            deleted, _ = await pipe.execute()
+        return deleted
+
+    async def delete_for_users(self, db: AsyncSession, user_ids: Iterable[str]) -> Dict[str, int]:
+        """Delete every session belonging to several users in one transaction."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.smembers(self._user_key(user_id))
+            members = await pipe.execute()
+
+        owned = [(user_id, session_ids) for user_id, session_ids in zip(user_ids, members) if session_ids]
+        if not owned:
+            return {}
+        async with self.client.pipeline(transaction=True) as pipe:
+            for user_id, session_ids in owned:
+                pipe.delete(*[self._session_key(session_id) for session_id in session_ids])
+                pipe.delete(self._user_key(user_id))
+            results = await pipe.execute()
+        return {
+            user_id: deleted
+            for (user_id, _), deleted in zip(owned, results[::2])
+            if deleted
+        }
+
+    async def update_user(self, db: AsyncSession, user: User) -> None:
+        """Refresh the user snapshot stored in each of the user's sessions."""
+        session_ids = list(await self.client.smembers(self._user_key(user.id)))
+        if not session_ids:
+            return
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.hget(self._session_key(session_id), "expires_at")
+            expiries = await pipe.execute()
+
+        snapshot = {
+            "user_email": user.email,
+            "user_name": user.name,
+            "user_role": UserRole(user.role).value,
+            "user_picture": user.picture or "",
+            "user_is_active": "1" if user.is_active is not False else "0",
+        }
+        async with self.client.pipeline(transaction=False) as pipe:
+            for session_id, expires_at in zip(session_ids, expiries):
+                if expires_at is None:
+                    continue
+                session_key = self._session_key(session_id)
+                pipe.hset(session_key, mapping=snapshot)
+                pipe.expireat(session_key, self._epoch(datetime.fromisoformat(expires_at)))
+            await pipe.execute()
+
+    async def active_session_ids(
+        self,
+        db: AsyncSession,
+        user_ids: Iterable[str]
+    ) -> Dict[str, List[str]]:
+        """Get unexpired session IDs for the given users."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.smembers(self._user_key(user_id))
+            members = await pipe.execute()
+
+        candidates = [
+            (user_id, session_id)
+            for user_id, session_ids in zip(user_ids, members)
+            for session_id in session_ids
+        ]
+        if not candidates:
+            return {}
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for _, session_id in candidates:
+                pipe.exists(self._session_key(session_id))
+            alive = await pipe.execute()
+
+        sessions_map: Dict[str, List[str]] = {}
+        stale: Dict[str, List[str]] = {}
+        for (user_id, session_id), exists in zip(candidates, alive):
+            if exists:
+                sessions_map.setdefault(user_id, []).append(session_id)
+            else:
+                stale.setdefault(user_id, []).append(session_id)
+
+        # Prune index entries whose sessions expired
+        if stale:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for user_id, session_ids in stale.items():
+                    pipe.srem(self._user_key(user_id), *session_ids)
+                await pipe.execute()
+
+        return sessions_map
+
+    async def cleanup_expired(self, db: AsyncSession) -> int:
+        """Expiry is handled natively by Redis key TTLs."""
+        return 0
+
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        await self.client.aclose()
+
+
+_session_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """Get the configured session store (Redis when USE_REDIS_SESSIONS is set)."""
+    global _session_store
+    if _session_store is None:
+        if settings.USE_REDIS_SESSIONS:
+            # Optional dependency, only needed when Redis sessions are enabled
+            import redis.asyncio as redis
+
+            client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+            _session_store = RedisSessionStore(client)
+        else:
+            _session_store = SQLSessionStore()
+    return _session_store
+
+
+def set_session_store(store: Optional[SessionStore]) -> None:
+    """Override the session store (e.g. a RedisSessionStore over fakeredis)."""
+    global _session_store
+    _session_store = store
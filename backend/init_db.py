@@ -1,21 +1,77 @@
 """Initialize database tables."""
 
 import asyncio
-from app.db.base import Base, engine
-from app.models import User, Session, DomainWhitelist, ActivityLog
+import sys
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.db.base import AsyncSessionLocal, engine, is_postgresql, init_db as create_tables
+from app.services.activity_counters import rebuild_counters
+from app.models import (
+    User, Session, DomainWhitelist,
+    ActivityApp, ActivityAction, ActivityDomain,
+    ActivityLog, ActivityRollup, ActivityRollupUser, ActivityCounter
+)
+
+BACKEND_DIR = Path(__file__).parent
+
+
+def alembic_config() -> Config:
+    """Get the Alembic config, independent of the working directory."""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+async def has_schema() -> bool:
+    """Check whether the database already has the app's tables."""
+    async with engine.connect() as conn:
+        exists = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("users"))
+    await engine.dispose()
+    return exists
 
 
 async def init_db():
     """Create all database tables."""
-    async with engine.begin() as conn:
-        # Drop all tables (only for development)
-        # await conn.run_sync(Base.metadata.drop_all)
-
-        # Create all tables
-        await conn.run_sync(Base.metadata.create_all)
+    # Tables, plus the partitions PostgreSQL needs before inserts
+    await create_tables()
+    # Each step runs in its own event loop; don't keep its connections
+    await engine.dispose()
 
     print("Database tables created successfully!")
 
 
+async def seed_counters():
+    """Recompute the maintained activity counters (SQLite) from existing rows."""
+    if is_postgresql():
+        return
+    async with AsyncSessionLocal() as db:
+        await rebuild_counters(db)
+        await db.commit()
+
+    print("Activity counters rebuilt!")
+
+
+def main():
+    """Migrate an existing schema, or create a fresh one at the latest revision."""
+    config = alembic_config()
+    if asyncio.run(has_schema()):
+        # Upgrade first: create_all would add the newer tables beside the
+        # old ones, which the migrations then trip over
+        command.upgrade(config, "head")
+        asyncio.run(init_db())
+    else:
+        asyncio.run(init_db())
+        command.stamp(config, "head")
+
+    # Migration 0007 seeds the counters; rebuilding is a manual repair step
+    # and needs the schema at head, so it only runs on request
+    if "--rebuild-counters" in sys.argv[1:]:
+        asyncio.run(seed_counters())
+
+
 if __name__ == "__main__":
-    asyncio.run(init_db())
+    main()
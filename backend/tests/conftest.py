@@ -0,0 +1,54 @@
+"""Shared fixtures: a scratch SQLite database and an in-process API client."""
+
+import os
+import tempfile
+
+# Configure before the app (and its engine) is imported
+_db_dir = tempfile.mkdtemp(prefix="terralink-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/test.db"
+os.environ["DEBUG"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["ADMIN_EMAILS"] = '["admin@terralink.cl"]'
+os.environ["ALLOWED_DOMAINS"] = '["terralink.cl"]'
+os.environ["INVALIDATION_BACKEND"] = "local"
+os.environ["USE_REDIS_SESSIONS"] = "false"
+
+import httpx
+import pytest
+
+from app.db.base import Base, engine, AsyncSessionLocal
+from app.main import app
+from app.services.activity_coalesce import activity_coalescer
+from app.services.activity_counts import activity_counts
+from app.services.activity_dictionary import activity_dictionary
+from app.services.recent_activity import recent_activity
+from app.services.session_cache import session_cache
+from app.services.session_store import set_session_store
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """Fresh tables for each test, and a session on them."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    for cache in (session_cache, recent_activity, activity_counts, activity_coalescer, activity_dictionary):
+        cache.clear()
+    set_session_store(None)
+
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def client(db):
+    """API client calling the app in-process."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        yield api
+
@@ -0,0 +1,105 @@
+"""Each activity filter combination is served by the index ACCESS_PATHS picks."""
+
+import itertools
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Iterator, List
+
+import pytest
+from sqlalchemy import desc, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.models import ActivityLog
+from app.services import activity_query
+from app.services.activity_partitions import ActivityRetention
+from app.services.activity_query import ACCESS_PATHS, PRIMARY_KEY_PATH, ActivityQuery
+
+pytestmark = pytest.mark.anyio
+
+# Every combination of the equality filters, by ActivityQuery argument
+FILTERS = list(itertools.product(
+    [None, "bob@terralink.cl"],  # user_email
+    [None, [1]],  # app_keys
+    [None, 2],  # action_key
+    [None, 3],  # domain_key
+))
+
+
+def latest_page(query: ActivityQuery) -> Any:
+    return select(ActivityLog).where(*query.where()).order_by(desc(ActivityLog.id)).limit(10)
+
+
+@pytest.mark.parametrize("start", [None, datetime(2026, 1, 1)], ids=["all-time", "from"])
+@pytest.mark.parametrize("filters", FILTERS, ids=str)
+async def test_sqlite_uses_chosen_index(db: AsyncSession, filters, start):
+    query = ActivityQuery(*filters, start=start)
+    sql = latest_page(query).compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    plan = " | ".join(row[3] for row in (await db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all())
+
+    if query.access_path == PRIMARY_KEY_PATH:
+        assert "sqlite_autoindex_activity_logs_1" in plan, plan
+    else:
+        assert f"USING INDEX {query.access_path} " in plan, plan
+    # Rows come out of the index in order: no sort step
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def index_names(plan: Any) -> Iterator[str]:
+    """Get every index a PostgreSQL JSON plan reads."""
+    if isinstance(plan, dict):
+        if "Index Name" in plan:
+            yield plan["Index Name"]
+        for value in plan.values():
+            yield from index_names(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from index_names(value)
+
+
+def expected_indexes(path: str) -> List[str]:
+    """Get names an access path's index has on the table or its partitions."""
+    if path == PRIMARY_KEY_PATH:
+        return ["activity_logs_pkey", "_pkey"]
+    columns = dict(ACCESS_PATHS)[path]
+    # Partition indexes are named <partition>_<columns>_idx
+    return [path, "_" + "_".join(columns + ("id",)) + "_idx"]
+
+
+@pytest.fixture
+async def pg_db(monkeypatch):
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(activity_query, "is_postgresql", lambda: True)
+
+    async with AsyncSession(engine) as session:
+        await ActivityRetention(months_ahead=1).ensure_partitions(session, now=datetime.utcnow() - timedelta(days=40))
+        await session.commit()
+        # Tables are empty; make the planner show the index it would use
+        await session.execute(text("SET enable_seqscan = off"))
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("filters", FILTERS, ids=str)
+async def test_postgresql_uses_chosen_index(pg_db: AsyncSession, filters):
+    query = ActivityQuery(*filters)
+    sql = latest_page(query).compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await pg_db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar()
+    names = list(index_names(json.loads(plan) if isinstance(plan, str) else plan))
+
+    expected = expected_indexes(query.access_path)
+    assert names, plan
+    assert all(name == expected[0] or name.endswith(expected[1]) for name in names), names
@@ -0,0 +1,103 @@
+"""Activity coalescing and idempotent retries.
+
+Coalescing is opt-in: by default every event gets its own row.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models import ActivityLog, DomainWhitelist
+from app.services.activity_coalesce import LAST_REPEAT_KEY, REPEAT_COUNT_KEY, activity_coalescer
+from app.services.activity_ingest import activity_ingestor
+from app.services.auth import AuthService
+
+pytestmark = pytest.mark.anyio
+
+EVENT = {"appId": "maps", "appName": "Maps", "action": "open", "metadata": {"layer": "roads"}}
+
+
+@pytest.fixture
+async def headers(db):
+    db.add(DomainWhitelist(domain="terralink.cl", added_at=datetime.utcnow(), added_by="seed"))
+    await db.commit()
+    _, session = await AuthService.login(
+        db, {"id": "g-bob", "email": "bob@terralink.cl", "name": "Bob", "picture": None}
+    )
+    return {"Authorization": f"Bearer {session.id}"}
+
+
+@pytest.fixture
+def coalescing(monkeypatch):
+    """Turn coalescing on with a window longer than any test."""
+    monkeypatch.setattr(activity_coalescer, "window", timedelta(seconds=60))
+
+
+@pytest.fixture
+async def ingestor(monkeypatch):
+    """Run the background writer; rows stay pending for up to a second."""
+    monkeypatch.setattr(activity_ingestor, "flush_interval", 1.0)
+    activity_ingestor.start()
+    yield activity_ingestor
+    await activity_ingestor.stop()
+
+
+async def stored_rows(db):
+    result = await db.execute(select(ActivityLog).execution_options(populate_existing=True))
+    return result.scalars().all()
+
+
+async def test_identical_events_are_not_coalesced_by_default(db, client, headers):
+    assert not activity_coalescer.enabled
+    first = await client.post("/api/activity/track", json=EVENT, headers=headers)
+    second = await client.post("/api/activity/track", json=EVENT, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["activity"]["id"] != second.json()["activity"]["id"]
+    assert len(await stored_rows(db)) == 2
+
+
+async def test_repeats_in_a_batch_merge_into_one_row(db, client, headers, coalescing):
+    response = await client.post(
+        "/api/activity/track/batch", json={"events": [EVENT, EVENT, EVENT]}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert len({activity["id"] for activity in response.json()["activities"]}) == 1
+    row, = await stored_rows(db)
+    assert row.action_metadata[REPEAT_COUNT_KEY] == 3
+    assert LAST_REPEAT_KEY in row.action_metadata
+
+
+async def test_repeated_tracks_merge_into_the_pending_row(db, client, headers, coalescing, ingestor):
+    other = dict(EVENT, metadata={"layer": "rivers"})
+    first = await client.post("/api/activity/track", json=EVENT, headers=headers)
+    second = await client.post("/api/activity/track", json=EVENT, headers=headers)
+    different = await client.post("/api/activity/track", json=other, headers=headers)
+    await ingestor.stop()
+
+    assert first.json()["activity"]["id"] == second.json()["activity"]["id"]
+    assert different.json()["activity"]["id"] != first.json()["activity"]["id"]
+    rows = {row.id: row for row in await stored_rows(db)}
+    assert len(rows) == 2
+    merged = rows[first.json()["activity"]["id"]].action_metadata
+    assert merged["layer"] == "roads"
+    assert merged[REPEAT_COUNT_KEY] == 2
+    assert datetime.fromisoformat(merged[LAST_REPEAT_KEY])
+    assert REPEAT_COUNT_KEY not in rows[different.json()["activity"]["id"]].action_metadata
+
+
+async def test_repeated_idempotency_key_returns_the_original(db, client, headers):
+    event = dict(EVENT, idempotencyKey="retry-1")
+    first = await client.post("/api/activity/track", json=event, headers=headers)
+    retry = await client.post("/api/activity/track", json=event, headers=headers)
+    fresh = await client.post(
+        "/api/activity/track", json=dict(EVENT, idempotencyKey="retry-2"), headers=headers
+    )
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["activity"] == first.json()["activity"]
+    assert fresh.json()["activity"]["id"] != first.json()["activity"]["id"]
+    assert len(await stored_rows(db)) == 2
+    assert activity_coalescer.duplicates >= 1
@@ -0,0 +1,80 @@
+"""Activity dictionary: bounded input and a bounded key cache."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models import ActivityApp, Session, User, UserRole
+from app.services.activity_dictionary import ActivityDictionary, LRUMap
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def headers(db):
+    db.add(User(id="g-bob", email="bob@terralink.cl", name="Bob", role=UserRole.USUARIO))
+    db.add(Session(
+        id="s-bob", user_id="g-bob", csrf_token="csrf",
+        expires_at=datetime.utcnow() + timedelta(days=1), last_activity=datetime.utcnow()
+    ))
+    await db.commit()
+    return {"Authorization": "Bearer s-bob"}
+
+
+@pytest.mark.parametrize("event", [
+    {"appId": "a" * 65, "appName": "App", "action": "open"},
+    {"appId": "app", "appName": "A" * 129, "action": "open"},
+    {"appId": "app", "appName": "App", "action": "x" * 65},
+    {"appId": "app id", "appName": "App", "action": "open"},
+    {"appId": "app", "appName": "App\n", "action": "open"},
+    {"appId": "app", "appName": "App", "action": "<script>"},
+    {"appId": "", "appName": "App", "action": "open"},
+], ids=["long-app-id", "long-app-name", "long-action", "app-id-charset", "app-name-control", "action-charset", "empty"])
+async def test_track_rejects_unbounded_names(client, headers, event):
+    response = await client.post("/api/activity/track", json=event, headers=headers)
+    assert response.status_code == 422
+
+
+async def test_track_accepts_portal_names(client, headers, db):
+    event = {"appId": "gis-viewer_2", "appName": "Visor GIS (Producción)", "action": "app_access"}
+    response = await client.post("/api/activity/track", json=event, headers=headers)
+    assert response.status_code == 200
+    assert (await db.scalar(select(ActivityApp.app_name))) == "Visor GIS (Producción)"
+
+
+def test_lru_map_keeps_most_recently_used():
+    cache = LRUMap(2)
+    cache["a"], cache["b"] = 1, 2
+    assert cache["a"] == 1
+    cache["c"] = 3
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.evictions == 1
+
+
+async def test_dictionary_cache_is_bounded(db):
+    dictionary = ActivityDictionary(max_entries=3)
+    rows = [
+        {"app_id": f"app{i}", "app_name": "App", "action": f"action{i}", "user_domain": "terralink.cl"}
+        for i in range(5)
+    ]
+    encoded = []
+    for row in rows:
+        encoded += await dictionary.encode([row])
+
+    stats = dictionary.stats()
+    assert (stats["apps"], stats["actions"]) == (3, 3)
+    assert stats["evictions"] > 0
+
+    # Evicted keys are loaded again when read
+    class Row:
+        def __init__(self, values):
+            self.__dict__.update(values)
+
+    first = Row(encoded[0])
+    await dictionary.load(db, [first])
+    assert dictionary.names(first) == {
+        "app_id": "app0", "app_name": "App", "action": "action0", "user_domain": "terralink.cl"
+    }
+    # And re-encoding an evicted name reuses its key
+    assert (await dictionary.encode([rows[0]]))[0]["app_key"] == encoded[0]["app_key"]
@@ -0,0 +1,45 @@
+"""Activity export: gzip only when Accept-Encoding actually allows it."""
+
+import pytest
+from datetime import datetime
+
+from app.api.admin.export import _accepts_gzip
+from app.models import DomainWhitelist
+from app.services.auth import AuthService
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("GZIP; q=0.5", True),
+    ("x-gzip", True),
+    ("br, gzip, deflate", True),
+    ("*", True),
+    ("deflate, *;q=0.1", True),
+    ("", False),
+    ("identity", False),
+    ("gzip;q=0", False),
+    ("br, gzip; q=0.000", False),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("gzip;q=bogus", False),
+])
+def test_accepts_gzip(header, expected):
+    assert _accepts_gzip(header) is expected
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("header, encoding", [("gzip", "gzip"), ("gzip;q=0", None)])
+async def test_export_content_encoding(db, client, header, encoding):
+    db.add(DomainWhitelist(domain="terralink.cl", added_at=datetime.utcnow(), added_by="seed"))
+    await db.commit()
+    _, session = await AuthService.login(
+        db, {"id": "g-admin", "email": "admin@terralink.cl", "name": "Admin", "picture": None}
+    )
+
+    response = await client.get(
+        "/api/admin/activity/export",
+        headers={"Authorization": f"Bearer {session.id}", "Accept-Encoding": header},
+    )
+
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == encoding
@@ -0,0 +1,48 @@
+"""Analytics rollup rebuilds: ranges may mix aware and naive datetimes."""
+
+import pytest
+from datetime import datetime
+
+from app.models import DomainWhitelist
+from app.services.auth import AuthService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def admin_headers(db):
+    db.add(DomainWhitelist(domain="terralink.cl", added_at=datetime.utcnow(), added_by="seed"))
+    await db.commit()
+    _, session = await AuthService.login(
+        db, {"id": "g-admin", "email": "admin@terralink.cl", "name": "Admin", "picture": None}
+    )
+    return {"Authorization": f"Bearer {session.id}"}
+
+
+@pytest.mark.parametrize("start, end", [
+    ("2026-10-01T00:00:00", "2026-10-02T00:00:00-03:00"),
+    ("2026-10-01T00:00:00+02:00", "2026-10-02T00:00:00"),
+])
+async def test_rebuild_accepts_mixed_awareness(client, admin_headers, start, end):
+    response = await client.post(
+        "/api/admin/analytics/rebuild", json={"from": start, "to": end}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["events"] == 0
+
+
+async def test_rebuild_compares_mixed_awareness_in_utc(client, admin_headers):
+    # 02:00+03:00 is 23:00 UTC the day before: before 23:30, after 20:00
+    response = await client.post(
+        "/api/admin/analytics/rebuild",
+        json={"from": "2026-10-02T02:00:00+03:00", "to": "2026-10-01T23:30:00"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/api/admin/analytics/rebuild",
+        json={"from": "2026-10-02T00:00:00+03:00", "to": "2026-10-01T20:00:00"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 400
@@ -0,0 +1,146 @@
+"""GoogleTokenVerifier against a locally generated key set."""
+
+import time
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt as google_jwt
+
+from app.services import google_verifier
+from app.services.google_verifier import GoogleTokenVerifier, StaticCertSource
+
+pytestmark = pytest.mark.anyio
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+
+
+class CountingSource(StaticCertSource):
+    """Static key set that counts fetches."""
+
+    def __init__(self, certs):
+        super().__init__(certs)
+        self.fetches = 0
+
+    async def fetch(self):
+        self.fetches += 1
+        return await super().fetch()
+
+
+def make_key(key_id: str):
+    """Get a signer and its PEM certificate."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, key_id)])
+    now = datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    signer = crypt.RSASigner.from_string(private_pem, key_id=key_id)
+    return signer, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return {key_id: make_key(key_id) for key_id in ("k1", "k2")}
+
+
+def token(signer, **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "g-bob",
+        "email": "bob@terralink.cl",
+        "iat": now,
+        "exp": now + 3600,
+        **claims,
+    }
+    return google_jwt.encode(signer, payload).decode()
+
+
+def verifier_for(source, **options) -> GoogleTokenVerifier:
+    return GoogleTokenVerifier(CLIENT_ID, source=source, clock_skew_seconds=0, **options)
+
+
+async def test_valid_token(keys):
+    source = CountingSource({"k1": keys["k1"][1]})
+    verifier = verifier_for(source)
+
+    claims = await verifier.verify(token(keys["k1"][0]))
+    assert claims["sub"] == "g-bob"
+    assert claims["email"] == "bob@terralink.cl"
+
+    # Certificates are cached
+    await verifier.verify(token(keys["k1"][0]))
+    assert source.fetches == 1
+
+
+@pytest.mark.parametrize("claims", [
+    {"aud": "someone-else"},
+    {"iss": "https://evil.example.com"},
+    {"iat": int(time.time()) - 7200, "exp": int(time.time()) - 3600},
+], ids=["audience", "issuer", "expired"])
+async def test_rejected_claims(keys, claims):
+    verifier = verifier_for(CountingSource({"k1": keys["k1"][1]}))
+    with pytest.raises(ValueError):
+        await verifier.verify(token(keys["k1"][0], **claims))
+    assert verifier.failures == 1
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Control the verifier's monotonic clock."""
+    now = [1000.0]
+    monkeypatch.setattr(google_verifier, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+async def test_unknown_key_refetches_once(keys, clock):
+    source = CountingSource({"k1": keys["k1"][1]})
+    verifier = verifier_for(source, min_refetch_interval=30)
+    await verifier.get_certs()
+
+    # Within min_refetch_interval of the last fetch, unknown keys don't hit the source
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await verifier.verify(token(keys["k2"][0]))
+    assert source.fetches == 1
+
+    # After it, an unknown key refetches exactly once
+    clock[0] += 31
+    with pytest.raises(ValueError):
+        await verifier.verify(token(keys["k2"][0]))
+    assert source.fetches == 2
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await verifier.verify(token(keys["k2"][0]))
+    assert source.fetches == 2
+
+
+async def test_rotated_key_is_picked_up(keys, clock):
+    source = CountingSource({"k1": keys["k1"][1]})
+    verifier = verifier_for(source, min_refetch_interval=30)
+    await verifier.get_certs()
+    clock[0] += 31
+
+    # Google rotates keys before our cached set expires
+    source.certs = {"k1": keys["k1"][1], "k2": keys["k2"][1]}
+    claims = await verifier.verify(token(keys["k2"][0]))
+    assert claims["sub"] == "g-bob"
+    assert source.fetches == 2
@@ -0,0 +1,52 @@
+"""init_db and activity partitions: what the database needs before the first insert."""
+
+import importlib.util
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from app.db import base
+from app.services import activity_partitions
+
+pytestmark = pytest.mark.anyio
+
+_spec = importlib.util.spec_from_file_location(
+    "migration_0004",
+    Path(__file__).parent.parent / "alembic" / "versions" / "0004_partition_activity_logs.py",
+)
+migration_0004 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(migration_0004)
+
+
+async def test_init_db_skips_partitions_on_plain_tables(db, monkeypatch):
+    calls = []
+
+    async def ensure_partitions(session, now=None):
+        calls.append(session)
+
+    monkeypatch.setattr(activity_partitions.activity_retention, "ensure_partitions", ensure_partitions)
+    await base.init_db()
+    assert calls == []
+
+
+async def test_init_db_creates_partitions_on_partitioned_tables(db, monkeypatch):
+    calls = []
+
+    async def is_partitioned(session):
+        return True
+
+    async def ensure_partitions(session, now=None):
+        calls.append(session)
+
+    monkeypatch.setattr(activity_partitions, "is_partitioned", is_partitioned)
+    monkeypatch.setattr(activity_partitions.activity_retention, "ensure_partitions", ensure_partitions)
+    await base.init_db()
+    assert len(calls) == 1
+
+
+def test_month_start_converts_to_utc():
+    # 21:00 on Sept 30 at UTC-3 is already October in UTC
+    value = datetime(2026, 9, 30, 21, 0, tzinfo=timezone(timedelta(hours=-3)))
+    assert activity_partitions.month_start(value) == datetime(2026, 10, 1)
+    assert migration_0004.month_start(value) == datetime(2026, 10, 1)
@@ -0,0 +1,84 @@
+"""Invalidation bus handlers: what each kind drops from this worker's caches."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import UserRole
+from app.services.invalidation import KINDS, LocalInvalidationBus, SESSION, USER, _register_handlers
+from app.services.principal import SessionPrincipal
+from app.services.session_activity import session_activity
+from app.services.session_cache import session_cache
+
+pytestmark = pytest.mark.anyio
+
+
+def principal(session_id: str, user_id: str) -> SessionPrincipal:
+    return SessionPrincipal(
+        session_id=session_id,
+        user_id=user_id,
+        email=f"{user_id}@terralink.cl",
+        name=user_id,
+        role=UserRole.USUARIO,
+        csrf_token="csrf",
+        expires_at=datetime.utcnow() + timedelta(days=1),
+    )
+
+
+@pytest.fixture
+def bus():
+    bus = LocalInvalidationBus()
+    _register_handlers(bus)
+    session_cache.clear()
+    session_activity.forget_user("alice")
+    session_activity.forget_user("bob")
+    yield bus
+    session_cache.clear()
+
+
+def cache(*principals: SessionPrincipal) -> None:
+    for p in principals:
+        session_cache.set(p.session_id, p.user_id, p.expires_at, p)
+        session_activity.record(p)
+
+
+async def test_session_invalidation_drops_cache_and_pending_activity(bus):
+    alice1, alice2 = principal("s-a1", "alice"), principal("s-a2", "alice")
+    cache(alice1, alice2)
+
+    await bus.publish(SESSION, ["s-a1"])
+
+    assert session_cache.get("s-a1") is None
+    assert session_cache.get("s-a2") is alice2
+    assert "s-a1" not in session_activity._pending
+    assert "s-a2" in session_activity._pending
+
+
+async def test_user_invalidation_drops_cache_and_pending_activity(bus):
+    alice1, alice2, bob = principal("s-a1", "alice"), principal("s-a2", "alice"), principal("s-b", "bob")
+    cache(alice1, alice2, bob)
+
+    await bus.publish(USER, ["alice"])
+
+    assert session_cache.get("s-a1") is None
+    assert session_cache.get("s-a2") is None
+    assert session_cache.get("s-b") is bob
+    assert set(session_activity._pending) & {"s-a1", "s-a2"} == set()
+    assert "s-b" in session_activity._pending
+    assert session_activity.forget_user("alice") == 0
+
+
+async def test_remote_invalidation_applies_handlers(bus):
+    cache(principal("s-a1", "alice"))
+    other = LocalInvalidationBus()
+
+    bus._receive(other._encode(USER, ["alice"]))
+
+    assert session_cache.get("s-a1") is None
+    assert "s-a1" not in session_activity._pending
+
+
+def test_every_kind_has_a_handler():
+    bus = LocalInvalidationBus()
+    _register_handlers(bus)
+    assert all(bus._handlers[kind] for kind in KINDS)
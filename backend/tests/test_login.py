@@ -0,0 +1,46 @@
+"""Login pipeline: the user upsert keeps derived columns and domain counts."""
+
+import pytest
+from datetime import datetime
+
+from app.models import DomainWhitelist, User
+from app.services.auth import AuthService
+
+pytestmark = pytest.mark.anyio
+
+
+def google_user(user_id: str, email: str, name: str = "Someone") -> dict:
+    return {"id": user_id, "email": email, "name": name, "picture": None}
+
+
+async def test_login_sets_email_domain_and_counts_new_users(db, client):
+    db.add(DomainWhitelist(domain="terralink.cl", added_at=datetime.utcnow(), added_by="seed"))
+    await db.commit()
+
+    _, admin_session = await AuthService.login(db, google_user("g-admin", "Admin@Terralink.cl", "Admin"))
+    user, _ = await AuthService.login(db, google_user("g-bob", "bob@terralink.cl", "Bob"))
+    assert user.email_domain == "terralink.cl"
+    assert user.domain == "terralink.cl"
+
+    headers = {"Authorization": f"Bearer {admin_session.id}"}
+    response = await client.get("/api/admin/users", params={"domain": "terralink.cl"}, headers=headers)
+    assert response.status_code == 200
+    users = response.json()["users"]
+    assert sorted(u["email"] for u in users) == ["admin@terralink.cl", "bob@terralink.cl"]
+    assert all(u["domain"] == "terralink.cl" for u in users)
+
+    response = await client.get("/api/admin/domains", headers=headers)
+    assert [(d["domain"], d["userCount"]) for d in response.json()["domains"]] == [("terralink.cl", 2)]
+
+
+async def test_returning_login_does_not_count_twice(db):
+    db.add(DomainWhitelist(domain="terralink.cl", added_at=datetime.utcnow(), added_by="seed"))
+    await db.commit()
+
+    await AuthService.login(db, google_user("g-bob", "bob@terralink.cl", "Bob"))
+    await AuthService.login(db, google_user("g-bob", "bob@terralink.cl", "Robert"))
+
+    domain = await db.get(DomainWhitelist, "terralink.cl", populate_existing=True)
+    assert domain.user_count == 1
+    user = await db.get(User, "g-bob", populate_existing=True)
+    assert (user.name, user.email_domain) == ("Robert", "terralink.cl")
@@ -0,0 +1,137 @@
+"""RedisSessionStore against fakeredis: create, get, touch, revoke and TTLs."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.models import User, UserRole
+from app.services.auth import AuthService
+from app.services.session_store import RedisSessionStore, set_session_store
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def redis_client():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def store(redis_client):
+    return RedisSessionStore(redis_client, prefix="test:")
+
+
+def make_user(user_id: str = "g-bob", email: str = "bob@terralink.cl") -> User:
+    return User(id=user_id, email=email, name="Bob", role=UserRole.USUARIO, is_active=True)
+
+
+async def test_create_and_get(db, store, redis_client):
+    user = make_user()
+    session = await store.create(db, user, "10.0.0.1", "pytest")
+
+    principal = await store.get(db, session.id)
+    assert principal.user_id == user.id
+    assert principal.email == user.email
+    assert principal.role == UserRole.USUARIO
+    assert principal.csrf_token == session.csrf_token
+    assert await store.get(db, "missing") is None
+
+    # Session and user index expire natively with the session
+    ttl = await redis_client.ttl(f"test:session:{session.id}")
+    assert settings.COOKIE_MAX_AGE - 5 <= ttl <= settings.COOKIE_MAX_AGE
+    assert await redis_client.ttl(f"test:user_sessions:{user.id}") == ttl
+    assert await redis_client.smembers(f"test:user_sessions:{user.id}") == {session.id}
+
+
+async def test_touch_keeps_expiry(db, store, redis_client):
+    session = await store.create(db, make_user())
+    ttl = await redis_client.ttl(f"test:session:{session.id}")
+
+    later = datetime.utcnow() + timedelta(minutes=5)
+    await store.touch_many(db, {session.id: (later, session.expires_at), "gone": (later, session.expires_at)})
+
+    principal = await store.get(db, session.id)
+    assert principal.last_activity == later
+    assert abs(await redis_client.ttl(f"test:session:{session.id}") - ttl) <= 1
+    assert not await redis_client.exists("test:session:gone")
+
+    # get(touch=True) records activity in the same call
+    fresh = await store.create(db, make_user())
+    await asyncio.sleep(0.01)
+    await store.get(db, fresh.id, touch=True)
+    assert (await store.get(db, fresh.id)).last_activity > fresh.last_activity
+
+
+async def test_expired_session_is_gone(db, store, redis_client):
+    user = make_user()
+    session = await store.create(db, user)
+    await redis_client.pexpire(f"test:session:{session.id}", 10)
+    await asyncio.sleep(0.05)
+
+    assert await store.get(db, session.id) is None
+    # Stale index entries are pruned when listed
+    assert await store.active_session_ids(db, [user.id]) == {}
+    assert not await redis_client.smembers(f"test:user_sessions:{user.id}")
+
+
+async def test_delete_and_revoke(db, store):
+    bob, carl = make_user(), make_user("g-carl", "carl@terralink.cl")
+    first, second = await store.create(db, bob), await store.create(db, bob)
+    other = await store.create(db, carl)
+
+    assert await store.delete(db, first.id) is True
+    assert await store.delete(db, first.id) is False
+    assert await store.get(db, first.id) is None
+    assert await store.active_session_ids(db, [bob.id]) == {bob.id: [second.id]}
+
+    assert await store.delete_for_user(db, bob.id) == 1
+    assert await store.get(db, second.id) is None
+    assert await store.delete_for_users(db, [bob.id, carl.id]) == {carl.id: 1}
+    assert await store.get(db, other.id) is None
+
+
+async def test_update_user_refreshes_snapshot(db, store):
+    user = make_user()
+    session = await store.create(db, user)
+
+    user.role = UserRole.ADMIN
+    await store.update_user(db, user)
+    assert (await store.get(db, session.id)).role == UserRole.ADMIN
+
+    user.is_active = False
+    await store.update_user(db, user)
+    assert await store.get(db, session.id) is None
+
+
+async def test_api_login_and_logout(db, client, store):
+    set_session_store(store)
+    _, session = await AuthService.login(db, {"id": "g-bob", "email": "bob@terralink.cl", "name": "Bob"})
+    headers = {"Authorization": f"Bearer {session.id}"}
+
+    response = await client.get("/api/auth/session", headers=headers)
+    assert response.status_code == 200
+
+    response = await client.post("/api/auth/logout", headers=headers)
+    assert response.status_code == 200
+    assert await store.get(db, session.id) is None
+    response = await client.get("/api/auth/session", headers=headers)
+    assert response.status_code == 401
+
+
+async def test_failed_login_commit_leaves_no_session(db, store, redis_client, monkeypatch):
+    set_session_store(store)
+
+    async def failing_commit():
+        raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(db, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        await AuthService.login(db, {"id": "g-bob", "email": "bob@terralink.cl", "name": "Bob"})
+
+    assert await redis_client.keys("test:session:*") == []
+    assert await redis_client.smembers("test:user_sessions:g-bob") == set()